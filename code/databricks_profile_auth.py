@@ -7,13 +7,27 @@ to use OAuth tokens from your configured Databricks profiles.
 """
 
 import os
+import re
 import json
+import time
 import subprocess
-import requests
-from typing import Dict, Optional, Any
+from datetime import datetime
+from typing import Dict, Optional, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
+from mcp_cache import get_cache_dir, atomic_write_json, file_lock
+from mcp_config import ProfilesSnapshot, load_config, load_databricks_profiles
+from mcp_env import getenv
+from mcp_pool import WorkspaceSessionPool, normalize_host
+from mcp_tracing import span
+
+# Refresh CLI tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+# Assumed lifetime for CLI tokens that do not report an expiry
+DEFAULT_TOKEN_LIFETIME = 600
+
 
 @dataclass
 class DatabricksProfile:
@@ -25,55 +39,176 @@ class DatabricksProfile:
     password: Optional[str] = None
 
 
+def _parse_token_expiry(expiry: Optional[str]) -> float:
+    """
+    Parse the expiry timestamp reported by `databricks auth token`.
+    
+    Args:
+        expiry: ISO 8601 timestamp, possibly with nanosecond precision
+        
+    Returns:
+        Expiry as a Unix timestamp
+    """
+    if not expiry:
+        return time.time() + DEFAULT_TOKEN_LIFETIME
+    
+    # datetime only supports microseconds; the CLI may report nanoseconds
+    normalized = re.sub(r'(\.\d{6})\d+', r'\1', expiry.strip()).replace('Z', '+00:00')
+    try:
+        parsed = datetime.fromisoformat(normalized)
+    except ValueError:
+        return time.time() + DEFAULT_TOKEN_LIFETIME
+    
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.timestamp()
+
+
+class TokenCache:
+    """
+    File-backed cache of CLI access tokens shared across processes.
+    
+    Tokens are stored with their expiry in a single JSON file. Refreshes are
+    serialized through a lock file so concurrent CLI invocations spawn at most
+    one `databricks auth token` process per profile.
+    """
+    
+    def __init__(self, cache_path: Optional[Path] = None, refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        """
+        Initialize the token cache.
+        
+        Args:
+            cache_path: Path of the token cache file (defaults to get_cache_dir()/tokens.json)
+            refresh_margin: Seconds before expiry at which a token is considered stale
+        """
+        self.cache_path = Path(cache_path) if cache_path else get_cache_dir() / 'tokens.json'
+        self.lock_path = self.cache_path.with_name(self.cache_path.name + '.lock')
+        self.refresh_margin = refresh_margin
+    
+    def _read(self) -> Dict[str, Any]:
+        """Read all cache entries."""
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached token if it is not close to expiring.
+        
+        Args:
+            key: Cache key (see DatabricksProfileAuth._token_cache_key)
+            
+        Returns:
+            Access token if valid, None otherwise
+        """
+        entry = self._read().get(key)
+        if not entry or not entry.get('access_token'):
+            return None
+        if entry.get('expires_at', 0) - self.refresh_margin <= time.time():
+            return None
+        return entry['access_token']
+    
+    def get_or_refresh(self, key: str, fetch) -> Optional[str]:
+        """
+        Get a cached token, refreshing it under the lock when needed.
+        
+        Args:
+            key: Cache key
+            fetch: Callable returning (access_token, expires_at) or (None, None)
+            
+        Returns:
+            Access token, or None if the refresh failed
+        """
+        token = self.get(key)
+        if token:
+            return token
+        
+        with file_lock(self.lock_path):
+            # Another process may have refreshed while we waited for the lock
+            token = self.get(key)
+            if token:
+                return token
+            
+            token, expires_at = fetch()
+            if token:
+                entries = self._read()
+                now = time.time()
+                entries = {k: v for k, v in entries.items() if v.get('expires_at', 0) > now}
+                entries[key] = {'access_token': token, 'expires_at': expires_at}
+                try:
+                    atomic_write_json(self.cache_path, entries)
+                except OSError as e:
+                    print(f"⚠️  Could not write token cache: {e}")
+            return token
+    
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Remove cached tokens.
+        
+        Args:
+            key: Cache key to remove, or None to clear the whole cache
+        """
+        with file_lock(self.lock_path):
+            if key is None:
+                entries = {}
+            else:
+                entries = self._read()
+                entries.pop(key, None)
+            atomic_write_json(self.cache_path, entries)
+
+
 class DatabricksProfileAuth:
     """Authentication using Databricks CLI profiles."""
     
-    def __init__(self, profile_name: Optional[str] = None):
-        self.profile_name = profile_name or os.getenv('DATABRICKS_CONFIG_PROFILE', 'DEFAULT')
+    def __init__(self, profile_name: Optional[str] = None, use_token_cache: bool = True):
+        self.profile_name = profile_name or getenv('DATABRICKS_CONFIG_PROFILE', 'DEFAULT')
         self.profiles_dir = Path.home() / '.databrickscfg'
         self.profiles: Dict[str, DatabricksProfile] = {}
+        self.token_cache = TokenCache() if use_token_cache else None
+        self._snapshot: Optional[ProfilesSnapshot] = None
+        self._session_pool: Optional[WorkspaceSessionPool] = None
         self._load_profiles()
     
     def _load_profiles(self):
-        """Load all Databricks profiles from ~/.databrickscfg."""
+        """Load all Databricks profiles from the shared ~/.databrickscfg snapshot."""
         if not self.profiles_dir.exists():
             print(f"⚠️  Databricks config file not found: {self.profiles_dir}")
             return
         
         try:
-            # Parse the .databrickscfg file
-            current_profile = None
-            with open(self.profiles_dir, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('[') and line.endswith(']'):
-                        current_profile = line[1:-1]
-                        self.profiles[current_profile] = DatabricksProfile(name=current_profile, host='')
-                    elif '=' in line and current_profile:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        if key == 'host':
-                            self.profiles[current_profile].host = value
-                        elif key == 'token':
-                            self.profiles[current_profile].token = value
-                        elif key == 'username':
-                            self.profiles[current_profile].username = value
-                        elif key == 'password':
-                            self.profiles[current_profile].password = value
-                        elif key == 'auth_type':
-                            # Handle auth_type = databricks-cli (newer authentication)
-                            if value == 'databricks-cli':
-                                print(f"🔐 Profile '{current_profile}' uses databricks-cli authentication")
+            snapshot = load_databricks_profiles(self.profiles_dir)
+            if self._snapshot is not None and snapshot.digest == self._snapshot.digest:
+                # Unchanged content (possibly a touched file)
+                self._snapshot = snapshot
+                return
             
+            profiles = {}
+            for name, settings in snapshot.profiles.items():
+                profiles[name] = DatabricksProfile(
+                    name=name,
+                    host=settings.get('host', ''),
+                    token=settings.get('token'),
+                    username=settings.get('username'),
+                    password=settings.get('password')
+                )
+                # Handle auth_type = databricks-cli (newer authentication)
+                if settings.get('auth_type') == 'databricks-cli':
+                    print(f"🔐 Profile '{name}' uses databricks-cli authentication")
+            
+            self.profiles = profiles
+            self._snapshot = snapshot
             print(f"📋 Loaded {len(self.profiles)} Databricks profiles")
             
         except Exception as e:
             print(f"❌ Error loading Databricks profiles: {e}")
     
     def get_profile(self, profile_name: Optional[str] = None) -> Optional[DatabricksProfile]:
-        """Get a specific profile by name."""
+        """Get a specific profile by name (reloading profiles if the file changed)."""
+        if self._snapshot is not None and self._snapshot.is_stale():
+            self._load_profiles()
         name = profile_name or self.profile_name
         return self.profiles.get(name)
     
@@ -94,31 +229,53 @@ class DatabricksProfileAuth:
         # For profiles with auth_type = databricks-cli, always use CLI
         return self._get_token_via_cli(profile_name or self.profile_name)
     
+    def _token_cache_key(self, profile_name: str) -> str:
+        """Build the token cache key for a profile."""
+        profile = self.profiles.get(profile_name)
+        host = profile.host if profile else ''
+        return f"{profile_name}@{host}"
+    
     def _get_token_via_cli(self, profile_name: str) -> Optional[str]:
-        """Get token using databricks CLI command."""
+        """Get token using databricks CLI command, reusing cached tokens until near expiry."""
+        if not self.token_cache:
+            return self._fetch_token_via_cli(profile_name)[0]
+        
+        return self.token_cache.get_or_refresh(
+            self._token_cache_key(profile_name),
+            lambda: self._fetch_token_via_cli(profile_name)
+        )
+    
+    def _fetch_token_via_cli(self, profile_name: str) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Run `databricks auth token` for a profile.
+        
+        Returns:
+            Tuple of (access_token, expires_at) or (None, None) on failure
+        """
         try:
             # Use the newer databricks auth token command
-            result = subprocess.run(
-                ['databricks', 'auth', 'token', '--profile', profile_name, '--output', 'JSON'],
-                capture_output=True, text=True, timeout=30
-            )
+            with span("auth.cli_token", profile=profile_name):
+                result = subprocess.run(
+                    ['databricks', 'auth', 'token', '--profile', profile_name, '--output', 'JSON'],
+                    capture_output=True, text=True, timeout=30
+                )
             
             if result.returncode == 0:
                 token_data = json.loads(result.stdout)
-                return token_data.get('access_token')
+                return token_data.get('access_token'), _parse_token_expiry(token_data.get('expiry'))
             
             print(f"⚠️  No token found for profile '{profile_name}': {result.stderr}")
-            return None
+            return None, None
             
         except subprocess.TimeoutExpired:
             print(f"⏰ Timeout getting token for profile '{profile_name}'")
-            return None
+            return None, None
         except subprocess.CalledProcessError as e:
             print(f"❌ Error getting token for profile '{profile_name}': {e}")
-            return None
+            return None, None
         except Exception as e:
             print(f"❌ Unexpected error getting token: {e}")
-            return None
+            return None, None
     
     def get_workspace_hostname(self, profile_name: Optional[str] = None) -> Optional[str]:
         """Get workspace hostname from profile."""
@@ -158,8 +315,16 @@ class DatabricksProfileAuth:
         
         return True
     
-    def test_connection(self, profile_name: Optional[str] = None) -> bool:
-        """Test connection to Databricks workspace using profile."""
+    def test_connection(self, profile_name: Optional[str] = None,
+                        session_pool: Optional[WorkspaceSessionPool] = None) -> bool:
+        """
+        Test connection to Databricks workspace using profile.
+        
+        Args:
+            profile_name: Profile to test (default profile if None)
+            session_pool: Pool whose keep-alive session for the workspace is used
+                (default: one kept by this instance, shared by its tests)
+        """
         profile = self.get_profile(profile_name)
         if not profile:
             return False
@@ -169,8 +334,12 @@ class DatabricksProfileAuth:
             return False
         
         try:
-            headers = {'Authorization': f'Bearer {token}'}
-            response = requests.get(f'https://{profile.host}/api/2.0/clusters/list', headers=headers)
+            if session_pool is None:
+                if self._session_pool is None:
+                    self._session_pool = WorkspaceSessionPool()
+                session_pool = self._session_pool
+            http = session_pool.get_http_session(profile.host, token)
+            response = http.get(f'https://{normalize_host(profile.host)}/api/2.0/clusters/list')
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Connection test failed: {e}")
@@ -187,17 +356,13 @@ class MCPDatabricksProfileAuth:
         self._load_server_profiles()
     
     def _load_server_profiles(self):
-        """Load profile mappings from MCP configuration."""
+        """Load profile mappings from the shared MCP configuration snapshot."""
         try:
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
+            config = load_config(self.config_path)
             
-            for server_name, server_config in config.get('mcpServers', {}).items():
-                # Check if server has a profile mapping
-                profile_name = server_config.get('profile')
-                if profile_name:
-                    self.server_profiles[server_name] = profile_name
-                    print(f"🔗 Mapped server '{server_name}' to profile '{profile_name}'")
+            for server_name, profile_name in config.server_profiles.items():
+                self.server_profiles[server_name] = profile_name
+                print(f"🔗 Mapped server '{server_name}' to profile '{profile_name}'")
                 
         except FileNotFoundError:
             print(f"⚠️  MCP config file not found: {self.config_path}")
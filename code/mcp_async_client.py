@@ -0,0 +1,523 @@
+"""
+Asyncio MCP Client for Databricks
+
+This module provides AsyncMCPClient, a native asyncio counterpart of MCPClient.
+It keeps a single MCP session open per server so that many concurrent tool
+calls can share one event loop without a thread per request.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from mcp_cache import ToolCatalogCache, ResultCache
+from mcp_registry import ToolRegistry, WIKIPEDIA_SEARCH_KEYWORDS
+from mcp_tracing import span, set_attributes
+from mcp_client import (
+    MCPClientManager,
+    ToolInfo,
+    TOOL_CACHE_TTL,
+    TOOL_CACHE_MODES,
+    is_error_result,
+    load_cached_tools,
+    store_cached_tools,
+)
+
+# mcp 2.x replaced the transport + ClientSession layering with a single Client
+try:
+    import httpx2
+    from mcp import Client as _MCPSessionClient
+    from mcp.client.streamable_http import streamable_http_client
+    MCP_V2 = True
+except ImportError:
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+    MCP_V2 = False
+
+# Transport timeouts (seconds); reads stay open while the server streams a response
+CONNECT_TIMEOUT = 30.0
+READ_TIMEOUT = 300.0
+
+
+def create_http_client(token: str, pool_size: Optional[int] = None,
+                       keepalive: Optional[float] = None) -> Optional[Any]:
+    """
+    Create an authenticated HTTP client that several MCP sessions can share.
+    
+    Args:
+        token: Bearer token
+        pool_size: Idle connections kept open for reuse (None for the httpx default)
+        keepalive: Seconds an idle connection is kept open (None for the httpx default)
+    
+    Returns:
+        httpx2.AsyncClient, or None with mcp 1.x, whose transport opens its own
+        connections for every session
+    """
+    if not MCP_V2:
+        return None
+    
+    options: Dict[str, Any] = {}
+    if pool_size is not None or keepalive is not None:
+        # Only idle connections are capped, so a small pool never makes a call wait
+        options['limits'] = httpx2.Limits(max_connections=None, max_keepalive_connections=pool_size,
+                                          keepalive_expiry=keepalive)
+    return httpx2.AsyncClient(headers={"Authorization": f"Bearer {token}"},
+                              timeout=httpx2.Timeout(CONNECT_TIMEOUT, read=READ_TIMEOUT),
+                              follow_redirects=True, **options)
+
+
+@asynccontextmanager
+async def open_mcp_session(server_url: str, token: str, http_client: Optional[Any] = None) -> AsyncIterator[Any]:
+    """
+    Open an authenticated MCP session against a streamable-http server.
+    
+    Yields an object exposing list_tools() and call_tool() for both mcp 1.x
+    (transport + ClientSession) and mcp 2.x (Client).
+    
+    Args:
+        server_url: MCP server URL
+        token: Bearer token
+        http_client: Shared client from create_http_client(), left open when
+            the session closes (None for a private one)
+    """
+    if MCP_V2:
+        if http_client is not None:
+            async with _MCPSessionClient(streamable_http_client(server_url, http_client=http_client)) as session:
+                yield session
+            return
+        async with create_http_client(token) as http_client:
+            async with _MCPSessionClient(streamable_http_client(server_url, http_client=http_client)) as session:
+                yield session
+    else:
+        headers = {"Authorization": f"Bearer {token}"}
+        async with streamablehttp_client(url=server_url, headers=headers, timeout=CONNECT_TIMEOUT,
+                                         sse_read_timeout=READ_TIMEOUT) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                yield session
+
+
+class AsyncMCPClient:
+    """
+    Asyncio interface for interacting with Databricks MCP servers.
+    
+    The MCP session is owned by a background task, so initialize(), call_tool()
+    and aclose() may be awaited from any task on the same event loop. Calls
+    are multiplexed over the one session and can be cancelled individually.
+    If the session drops, the next call reconnects.
+    
+    Usage:
+        async with AsyncMCPClient(hostname, token, url) as client:
+            results = await asyncio.gather(*(client.call_tool(name, p) for p in params))
+    """
+    
+    def __init__(self, workspace_hostname: str, token: str, server_url: str,
+                 tool_cache: Optional[ToolCatalogCache] = None,
+                 tool_cache_mode: str = TOOL_CACHE_TTL,
+                 max_concurrency: Optional[int] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 registry: Optional[ToolRegistry] = None,
+                 server_name: Optional[str] = None,
+                 validate: bool = True):
+        """
+        Initialize the async MCP client.
+        
+        Args:
+            workspace_hostname: Databricks workspace hostname
+            token: Authentication token
+            server_url: MCP server URL
+            tool_cache: Optional on-disk tool catalog cache
+            tool_cache_mode: One of TOOL_CACHE_MODES (ignored without tool_cache)
+            max_concurrency: Maximum outstanding tool calls (None for unbounded)
+            result_cache: Optional cache for tool call results
+            registry: Tool registry to publish the catalog to (a private one if None)
+            server_name: Name the tools are registered under (defaults to server_url)
+            validate: Check parameters against the tool's input schema before sending a call
+        """
+        if tool_cache_mode not in TOOL_CACHE_MODES:
+            raise ValueError(f"Invalid tool cache mode: {tool_cache_mode}")
+        
+        self.workspace_hostname = workspace_hostname
+        self.token = token
+        self.server_url = server_url
+        self.tool_cache = tool_cache
+        self.tool_cache_mode = tool_cache_mode
+        self.max_concurrency = max_concurrency
+        self.result_cache = result_cache
+        self.registry = registry if registry is not None else ToolRegistry()
+        self.server_name = server_name or server_url
+        self.validate = validate
+        self.tools: List[ToolInfo] = []
+        self._initialized = False
+        self._session: Optional[Any] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._session_error: Optional[BaseException] = None
+        self._reconnect_lock: Optional[asyncio.Lock] = None
+        self._revalidation_task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> "AsyncMCPClient":
+        if not await self.initialize():
+            raise RuntimeError(f"Failed to initialize MCP client for {self.server_url}")
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def _run_session(self, ready: asyncio.Future):
+        """Own the MCP session for the lifetime of the client."""
+        try:
+            async with open_mcp_session(self.server_url, self.token) as session:
+                self._session = session
+                ready.set_result(None)
+                await self._closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self._session_error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self._session = None
+    
+    async def _connect(self):
+        """Open the MCP session in a background task and wait until it is ready."""
+        if self._session is not None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        self._closing = asyncio.Event()
+        self._session_error = None
+        self._session_task = loop.create_task(self._run_session(ready), name=f"mcp-session-{self.server_url}")
+        await ready
+    
+    @property
+    def tools(self) -> List[ToolInfo]:
+        """Tools offered by the server, in server order."""
+        return self._tools
+    
+    @tools.setter
+    def tools(self, tools: List[ToolInfo]):
+        # Keep the registry index in step with the catalog
+        self._tools = list(tools)
+        self.registry.replace_server(self.server_name, self._tools)
+    
+    async def initialize(self) -> bool:
+        """
+        Open the MCP session and discover available tools.
+        
+        When a tool cache is configured, a cached catalog is used instead of
+        calling list_tools() on the server (see TOOL_CACHE_MODES).
+        
+        Returns:
+            True if initialization successful, False otherwise
+        """
+        with span("client.initialize", server=self.server_name):
+            return await self._initialize()
+    
+    async def _initialize(self) -> bool:
+        try:
+            print(f"🔗 Connecting to MCP server: {self.server_url}")
+            with span("client.connect", server=self.server_name):
+                await self._connect()
+            
+            if self.max_concurrency:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            tools, revalidate = load_cached_tools(self.tool_cache, self.tool_cache_mode, self.server_url)
+            if tools is not None:
+                self.tools = tools
+                if revalidate:
+                    self._revalidation_task = asyncio.create_task(self._revalidate())
+            else:
+                print("🔍 Discovering available tools...")
+                self.tools = await self._fetch_tools()
+                print(f"✅ Successfully discovered {len(self.tools)} tools")
+            
+            self._initialized = True
+            return True
+        
+        except Exception as e:
+            print(f"❌ Failed to initialize MCP client: {e}")
+            await self.aclose()
+            return False
+    
+    async def _fetch_tools(self) -> List[ToolInfo]:
+        """Fetch every page of the tool catalog and update the tool cache."""
+        session = await self._require_session()
+        tools: List[ToolInfo] = []
+        cursor = None
+        with span("client.list_tools", server=self.server_name):
+            while True:
+                result = await session.list_tools(cursor=cursor) if cursor else await session.list_tools()
+                tools.extend(ToolInfo.from_mcp_tool(tool) for tool in result.tools)
+                cursor = getattr(result, 'next_cursor', None) or getattr(result, 'nextCursor', None)
+                if not cursor:
+                    break
+            set_attributes(tools=len(tools))
+        
+        store_cached_tools(self.tool_cache, self.tool_cache_mode, self.server_url, tools)
+        return tools
+    
+    async def _revalidate(self):
+        """Refresh a stale cached tool catalog in the background."""
+        try:
+            self.tools = await self._fetch_tools()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Background tool revalidation failed for {self.server_url}: {e}")
+    
+    async def _require_session(self) -> Any:
+        """
+        Get the open session, reconnecting if the session task has ended.
+        
+        A dropped connection ends the session task; the next call opens a
+        new session instead of failing until the client is recreated.
+        Concurrent callers wait for the same reconnect.
+        """
+        if self._session is not None:
+            return self._session
+        if self._session_task is None:
+            raise RuntimeError("MCP client not initialized. Call initialize() first.")
+        
+        if self._reconnect_lock is None:
+            self._reconnect_lock = asyncio.Lock()
+        async with self._reconnect_lock:
+            if self._session is None:
+                error = self._session_error or "connection ended"
+                print(f"🔄 MCP session to {self.server_url} closed ({error}); reconnecting")
+                try:
+                    await self._connect()
+                except Exception as e:
+                    raise RuntimeError(f"MCP session closed ({error}) and reconnecting failed: {e}") from e
+        return self._session
+    
+    async def list_tools(self, refresh: bool = False) -> List[ToolInfo]:
+        """
+        Get list of available tools.
+        
+        Args:
+            refresh: If True, fetch the catalog from the server again
+        
+        Returns:
+            List of ToolInfo objects
+        """
+        if not self._initialized:
+            raise RuntimeError("MCP client not initialized. Call initialize() first.")
+        if refresh:
+            self.tools = await self._fetch_tools()
+        return self.tools
+    
+    def get_tool_info(self, tool_name: str) -> Optional[ToolInfo]:
+        """
+        Get information about a specific tool.
+        
+        Args:
+            tool_name: Name of the tool
+        
+        Returns:
+            ToolInfo object if found, None otherwise
+        """
+        if not self._initialized:
+            raise RuntimeError("MCP client not initialized. Call initialize() first.")
+        
+        return self.registry.get(self.server_name, tool_name)
+    
+    async def call_tool(self, tool_name: str, parameters: Dict[str, Any],
+                        timeout: Optional[float] = None) -> Any:
+        """
+        Call a specific tool with given parameters.
+        
+        Cancelling the awaiting task cancels the request; other outstanding
+        calls on the session are unaffected.
+        
+        Args:
+            tool_name: Name of the tool to call
+            parameters: Parameters to pass to the tool
+            timeout: Optional timeout in seconds (raises asyncio.TimeoutError)
+        
+        Returns:
+            Tool execution result
+            
+        Raises:
+            ToolValidationError: If validation is on and the parameters do not
+                match the tool's input schema (nothing is sent)
+        """
+        if not self._initialized:
+            raise RuntimeError("MCP client not initialized. Call initialize() first.")
+        
+        with span("tool.call", server=self.server_name, tool=tool_name):
+            tool = self.registry.get(self.server_name, tool_name) if self.validate else None
+            if tool is not None:
+                with span("tool.validate"):
+                    parameters = tool.validate(parameters)
+            return await self._call_tool(tool_name, parameters, timeout)
+    
+    async def _call_tool(self, tool_name: str, parameters: Dict[str, Any], timeout: Optional[float]) -> Any:
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.make_key(self.server_url, tool_name, parameters)
+            hit, cached_result = self.result_cache.get(cache_key)
+            set_attributes(cache_hit=hit)
+            if hit:
+                return cached_result
+        
+        session = await self._require_session()
+        if self._semaphore:
+            async with self._semaphore:
+                result = await asyncio.wait_for(session.call_tool(tool_name, parameters), timeout)
+        else:
+            result = await asyncio.wait_for(session.call_tool(tool_name, parameters), timeout)
+        
+        if cache_key is not None and not is_error_result(result):
+            self.result_cache.put(cache_key, tool_name, result)
+        return result
+    
+    async def search_wikipedia(self, query: str) -> Any:
+        """
+        Convenience method to search Wikipedia using the vector search tool.
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Search results
+        """
+        match = self.registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, self.server_name)
+        if not match:
+            raise ValueError("Wikipedia search tool not found")
+        
+        return await self.call_tool(match.tool.name, {"query": query})
+    
+    async def aclose(self):
+        """Close the MCP session and cancel background work."""
+        if self._revalidation_task and not self._revalidation_task.done():
+            self._revalidation_task.cancel()
+        self._revalidation_task = None
+        
+        if self._session_task:
+            self._closing.set()
+            try:
+                await self._session_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._session_task = None
+        
+        # The lock belongs to this event loop; initialize() may run on another
+        self._reconnect_lock = None
+        self._initialized = False
+
+
+class AsyncMCPClientManager(MCPClientManager):
+    """
+    Manager for AsyncMCPClient instances, sharing MCPClientManager's config
+    loading and lazy credential resolution.
+    
+    Servers with several endpoints are not routed between: the async client
+    connects to the first endpoint only (a warning is printed), without
+    failover, health tracking or retries on the other endpoints.
+    """
+    
+    def __init__(self, config_path: str = ".cursor/mcp.json",
+                 tool_cache_mode: str = TOOL_CACHE_TTL,
+                 max_concurrency: Optional[int] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 validate_parameters: bool = True):
+        """
+        Initialize the async MCP client manager.
+        
+        Args:
+            config_path: Path to MCP configuration file
+            tool_cache_mode: Tool catalog cache mode for created clients
+            max_concurrency: Maximum outstanding tool calls per client
+            result_cache: Optional result cache shared by all clients (opt-in)
+            validate_parameters: Validate tool parameters against input schemas before sending calls
+        """
+        self.max_concurrency = max_concurrency
+        # Clients replaced by get_client, closed on the event loop by the next aget_client
+        self._evicted: List[AsyncMCPClient] = []
+        super().__init__(config_path, tool_cache_mode=tool_cache_mode, result_cache=result_cache,
+                         validate_parameters=validate_parameters)
+    
+    def _create_client(self, server_name: str, workspace_hostname: str, token: str, url: str) -> AsyncMCPClient:
+        """Create an AsyncMCPClient for a server."""
+        return AsyncMCPClient(
+            workspace_hostname, token, url,
+            tool_cache=self.tool_cache,
+            tool_cache_mode=self.tool_cache_mode,
+            max_concurrency=self.max_concurrency,
+            result_cache=self.result_cache,
+            registry=self.registry,
+            server_name=server_name,
+            validate=self.validate_parameters
+        )
+    
+    def _create_multi_endpoint_client(self, server_name: str,
+                                      endpoints: List[Dict[str, Any]]) -> Optional[AsyncMCPClient]:
+        """Async clients do not route between endpoints yet; the first endpoint is used."""
+        print(f"⚠️  {server_name} has {len(endpoints)} endpoints; the async client only uses the first")
+        token = self._resolve_endpoint_token(server_name, endpoints[0])
+        if not token:
+            return None
+        url = endpoints[0]['url']
+        return self._create_client(server_name, url.split('/')[2], token, url)
+    
+    def _close_client(self, client: AsyncMCPClient):
+        """Queue a replaced client; its session can only be closed from the event loop."""
+        with self._lock:
+            self._evicted.append(client)
+    
+    async def _aclose_evicted(self):
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+        await asyncio.gather(*(client.aclose() for client in evicted), return_exceptions=True)
+    
+    async def aget_client(self, server_name: str) -> Optional[AsyncMCPClient]:
+        """
+        Get a client by server name without blocking the event loop.
+        
+        Credential resolution may run the Databricks CLI, so it happens in a
+        worker thread. A client replaced after a token change is closed here.
+        
+        Args:
+            server_name: Name of the server from config
+        
+        Returns:
+            AsyncMCPClient instance if found, None otherwise
+        """
+        client = await asyncio.to_thread(self.get_client, server_name)
+        await self._aclose_evicted()
+        return client
+    
+    async def initialize_client(self, server_name: str) -> bool:
+        """
+        Initialize a specific MCP client.
+        
+        Args:
+            server_name: Name of the server to initialize
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        client = await self.aget_client(server_name)
+        if not client:
+            print(f"❌ Server '{server_name}' not found")
+            return False
+        
+        return await client.initialize()
+    
+    async def aclose(self):
+        """Close every client session."""
+        await self._aclose_evicted()
+        await asyncio.gather(*(client.aclose() for client in self.clients.values()))
+        self.close()
+    
+    async def __aenter__(self) -> "AsyncMCPClientManager":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
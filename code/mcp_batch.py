@@ -0,0 +1,267 @@
+"""
+Checkpointed batch searches
+
+Runs a long list of queries against one MCP tool with bounded concurrency,
+streams every result to an NDJSON file as soon as it completes, and records
+progress in a checkpoint file so that an interrupted run resumes where it
+stopped instead of starting over.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from mcp_cache import atomic_write_json
+from mcp_render import iter_result_rows, project_fields
+
+# Write a checkpoint after this many completed queries (or CHECKPOINT_INTERVAL seconds)
+DEFAULT_CHECKPOINT_EVERY = 100
+CHECKPOINT_INTERVAL = 10.0
+
+# Bump whenever the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointMismatchError(ValueError):
+    """Raised when a checkpoint belongs to a different batch run."""
+
+
+def read_queries(source: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    Read one query per line.
+    
+    Args:
+        source: Text stream (file or stdin)
+    
+    Yields:
+        (line index, query) pairs; blank lines yield an empty query
+    """
+    for index, line in enumerate(source):
+        yield index, line.strip()
+
+
+class BatchCheckpoint:
+    """
+    Progress of a batch run.
+    
+    Completed work is stored as a watermark (every index below it is done)
+    plus the set of indices above the watermark that completed out of order,
+    so the checkpoint stays small however long the input is. The output
+    file offset recorded with it lets a resumed run drop any result lines
+    written after the last checkpoint.
+    """
+    
+    def __init__(self, path: Path, run_key: Dict[str, Any]):
+        """
+        Initialize an empty checkpoint.
+        
+        Args:
+            path: Checkpoint file
+            run_key: Settings identifying the run (input, tool, parameters)
+        """
+        self.path = Path(path)
+        self.run_key = run_key
+        self.watermark = 0
+        self.done: Set[int] = set()
+        self.output_offset = 0
+    
+    @classmethod
+    def load(cls, path: Path, run_key: Dict[str, Any]) -> "BatchCheckpoint":
+        """
+        Load a checkpoint, or start a new one if the file does not exist.
+        
+        Raises:
+            CheckpointMismatchError: If the checkpoint was written for different settings
+        """
+        checkpoint = cls(path, run_key)
+        if not checkpoint.path.exists():
+            return checkpoint
+        
+        with open(checkpoint.path, 'r') as f:
+            data = json.load(f)
+        
+        if data.get('version') != CHECKPOINT_VERSION or data.get('run') != run_key:
+            raise CheckpointMismatchError(
+                f"Checkpoint {checkpoint.path} belongs to a different run; "
+                f"delete it or pass --restart to start over"
+            )
+        
+        checkpoint.watermark = data['watermark']
+        checkpoint.done = set(data['done'])
+        checkpoint.output_offset = data['output_offset']
+        return checkpoint
+    
+    @property
+    def completed(self) -> int:
+        """Number of completed indices."""
+        return self.watermark + len(self.done)
+    
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+    
+    def mark_done(self, index: int):
+        """Record a completed index, advancing the watermark over contiguous work."""
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+    
+    def save(self, output_offset: int):
+        """Atomically write the checkpoint."""
+        self.output_offset = output_offset
+        atomic_write_json(self.path, {
+            'version': CHECKPOINT_VERSION,
+            'run': self.run_key,
+            'watermark': self.watermark,
+            'done': sorted(self.done),
+            'output_offset': output_offset,
+            'updated_at': time.time(),
+        })
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of a batch run."""
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+    interrupted: bool = False
+    
+    @property
+    def rate(self) -> float:
+        return self.completed / self.duration if self.duration > 0 else 0.0
+
+
+def _result_record(index: int, query: str, item: Any, fields: Optional[List[str]],
+                   max_rows: Optional[int], max_bytes: Optional[int]) -> Dict[str, Any]:
+    """Build the output line for one completed query."""
+    from mcp_client import is_error_result
+    
+    record = {'index': index, 'query': query, 'duration': round(item.duration, 4)}
+    if not item.success:
+        record.update(ok=False, error=str(item.error))
+        return record
+    
+    stream = iter_result_rows(item.result, max_rows, max_bytes)
+    rows = [project_fields(row, fields) for row in stream]
+    record.update(ok=not is_error_result(item.result), results=rows)
+    if stream.malformed:
+        record['malformed'] = True
+    return record
+
+
+def run_batch_search(client: Any, tool_name: str, queries: Iterable[Tuple[int, str]],
+                     output: TextIO, checkpoint: Optional[BatchCheckpoint] = None,
+                     max_concurrency: int = 8, query_param: str = 'query',
+                     base_parameters: Optional[Dict[str, Any]] = None,
+                     fields: Optional[List[str]] = None,
+                     max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                     checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY) -> BatchSummary:
+    """
+    Run queries against a tool concurrently, streaming results to output.
+    
+    Each result is written as one NDJSON line (index, query, ok, duration and
+    results or error) in completion order. A query is only marked done after
+    its line has been flushed, and checkpoints record the output offset, so
+    resumed runs neither repeat nor lose results.
+    
+    Args:
+        client: Initialized MCPClient
+        tool_name: Tool to call for each query
+        queries: (index, query) pairs, e.g. from read_queries()
+        output: Stream receiving NDJSON result lines
+        checkpoint: Checkpoint to resume from and update (None to disable)
+        max_concurrency: Maximum calls in flight
+        query_param: Name of the tool parameter receiving the query
+        base_parameters: Extra parameters sent with every call
+        fields: Optional projection applied to each result row
+        max_rows: Maximum rows kept per result
+        max_bytes: Maximum bytes of each result payload to read
+        checkpoint_every: Save the checkpoint after this many completions
+    
+    Returns:
+        BatchSummary
+    
+    Raises:
+        ValueError: If checkpoint_every is below 1
+    """
+    if checkpoint_every < 1:
+        raise ValueError(f"checkpoint_every must be at least 1, got {checkpoint_every}")
+    
+    summary = BatchSummary()
+    start = time.monotonic()
+    in_flight: Dict[int, Tuple[int, str]] = {}
+    
+    def requests():
+        # Consumed lazily by iter_tools_batch, so only in-flight queries are held in memory
+        for batch_index, (index, query) in enumerate(pending()):
+            in_flight[batch_index] = (index, query)
+            yield tool_name, {**(base_parameters or {}), query_param: query}
+    
+    def pending():
+        for index, query in queries:
+            if checkpoint and checkpoint.is_done(index):
+                summary.skipped += 1
+                continue
+            if not query:
+                # Blank lines count as done so the watermark can move past them
+                if checkpoint:
+                    checkpoint.mark_done(index)
+                continue
+            yield index, query
+    
+    def save_checkpoint():
+        if checkpoint:
+            output.flush()
+            checkpoint.save(output.tell())
+    
+    last_save = time.monotonic()
+    try:
+        for item in client.iter_tools_batch(requests(), max_concurrency):
+            index, query = in_flight.pop(item.index)
+            record = _result_record(index, query, item, fields, max_rows, max_bytes)
+            output.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+            output.flush()
+            
+            summary.completed += 1
+            if not record['ok']:
+                summary.failed += 1
+            if checkpoint:
+                checkpoint.mark_done(index)
+            
+            if summary.completed % checkpoint_every == 0 or time.monotonic() - last_save > CHECKPOINT_INTERVAL:
+                save_checkpoint()
+                last_save = time.monotonic()
+                elapsed = time.monotonic() - start
+                print(f"⏳ {summary.completed} queries done, {summary.failed} failed "
+                      f"({summary.completed / elapsed:.1f}/s)")
+    except KeyboardInterrupt:
+        summary.interrupted = True
+    finally:
+        save_checkpoint()
+        summary.duration = time.monotonic() - start
+    
+    return summary
+
+
+def open_output(path: str, checkpoint: Optional[BatchCheckpoint]) -> TextIO:
+    """
+    Open the result file, truncating lines written after the last checkpoint.
+    
+    Args:
+        path: Output file path
+        checkpoint: Loaded checkpoint (None to start a new file)
+    
+    Returns:
+        Text stream positioned at the end of the checkpointed results
+    """
+    if checkpoint and checkpoint.completed and os.path.exists(path):
+        output = open(path, 'r+', encoding='utf-8')
+        output.truncate(checkpoint.output_offset)
+        output.seek(checkpoint.output_offset)
+        return output
+    return open(path, 'w', encoding='utf-8')
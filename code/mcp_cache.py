@@ -0,0 +1,471 @@
+"""
+Local caches for the MCP client
+
+This module provides small on-disk caches that let short-lived CLI processes
+reuse work done by previous invocations, such as the tool catalog returned by
+an MCP server's list_tools() call.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from mcp_env import getenv
+
+# File locking is only available on POSIX systems
+try:
+    import fcntl
+    FILE_LOCKING_AVAILABLE = True
+except ImportError:
+    FILE_LOCKING_AVAILABLE = False
+
+# Bump whenever the on-disk layout changes; older entries are ignored
+CACHE_VERSION = 1
+
+# Tool catalogs rarely change, so an hour keeps CLI calls off the network
+DEFAULT_TOOL_CACHE_TTL = 3600.0
+
+# Tool catalog cache modes
+TOOL_CACHE_OFF = "off"                # Always discover tools from the server
+TOOL_CACHE_TTL = "ttl"                # Use cached tools while fresh, rediscover when stale
+TOOL_CACHE_BACKGROUND = "background"  # Use cached tools even when stale, revalidate in background
+TOOL_CACHE_REFRESH = "refresh"        # Always discover tools and update the cache
+TOOL_CACHE_MODES = (TOOL_CACHE_OFF, TOOL_CACHE_TTL, TOOL_CACHE_BACKGROUND, TOOL_CACHE_REFRESH)
+
+# Result cache bounds
+DEFAULT_RESULT_CACHE_ENTRIES = 1024
+DEFAULT_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_RESULT_CACHE_TTL = 300.0
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory used for local MCP client caches.
+    
+    Honors the MCP_CACHE_DIR environment variable and defaults to
+    ~/.cache/mcp-unity-catalog. The directory is created if needed.
+    
+    Returns:
+        Path to the cache directory
+    """
+    cache_dir = Path(getenv('MCP_CACHE_DIR') or Path.home() / '.cache' / 'mcp-unity-catalog')
+    cache_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return cache_dir
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = None, mode: Optional[int] = None):
+    """
+    Write JSON to a file atomically (temp file in the same directory + rename).
+    
+    Args:
+        path: Destination file
+        data: JSON-serializable data
+        indent: Optional indentation for human-readable files
+        mode: Permission bits of the new file (default: 0o600 from mkstemp)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        if mode is not None:
+            os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def ensure_private_dir(path: Path) -> bool:
+    """
+    Create a directory that only the current user can write to.
+    
+    An existing directory owned by the current user is tightened to 0700;
+    one owned by someone else is rejected.
+    
+    Args:
+        path: Directory to create or check
+    
+    Returns:
+        True if the directory exists, is owned by the current user and is not
+        writable by group or others (always True where ownership is not available)
+    """
+    path.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if not hasattr(os, 'getuid'):
+        return True
+    
+    info = os.stat(path)
+    if info.st_uid != os.getuid():
+        return False
+    if info.st_mode & 0o077:
+        try:
+            os.chmod(path, 0o700)
+        except OSError:
+            return False
+    return True
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive inter-process lock on a lock file.
+    
+    On platforms without fcntl this is a no-op, so callers must still only
+    rely on atomic writes for consistency.
+    
+    Args:
+        lock_path: Path of the lock file (created if needed)
+    """
+    if not FILE_LOCKING_AVAILABLE:
+        yield
+        return
+    
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+@dataclass
+class CachedToolCatalog:
+    """A tool catalog loaded from the on-disk cache."""
+    server_url: str
+    fetched_at: float
+    tools: List[Dict[str, Any]]
+    
+    @property
+    def age(self) -> float:
+        """Seconds since the catalog was fetched from the server."""
+        return max(0.0, time.time() - self.fetched_at)
+
+
+class ToolCatalogCache:
+    """
+    Versioned on-disk cache of MCP tool catalogs, keyed by server URL.
+    
+    Each server URL is stored in its own JSON file so that concurrent
+    processes only ever replace whole entries.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: Optional[float] = None):
+        """
+        Initialize the tool catalog cache.
+        
+        Args:
+            cache_dir: Directory for cache files (defaults to get_cache_dir()/tools)
+            ttl: Seconds a catalog stays fresh (defaults to MCP_TOOL_CACHE_TTL or 1 hour)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir() / 'tools'
+        self.cache_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if ttl is None:
+            ttl = float(getenv('MCP_TOOL_CACHE_TTL', DEFAULT_TOOL_CACHE_TTL))
+        self.ttl = ttl
+    
+    def _path_for(self, server_url: str) -> Path:
+        """Get the cache file path for a server URL."""
+        digest = hashlib.sha256(server_url.encode('utf-8')).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.json"
+    
+    def load(self, server_url: str) -> Optional[CachedToolCatalog]:
+        """
+        Load the cached tool catalog for a server, fresh or not.
+        
+        Args:
+            server_url: MCP server URL
+        
+        Returns:
+            CachedToolCatalog if a valid entry exists, None otherwise
+        """
+        path = self._path_for(server_url)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        
+        if entry.get('version') != CACHE_VERSION or entry.get('server_url') != server_url:
+            return None
+        
+        return CachedToolCatalog(
+            server_url=server_url,
+            fetched_at=float(entry.get('fetched_at', 0)),
+            tools=entry.get('tools', [])
+        )
+    
+    def is_fresh(self, catalog: CachedToolCatalog) -> bool:
+        """Check whether a cached catalog is still within its TTL."""
+        return catalog.age < self.ttl
+    
+    def store(self, server_url: str, tools: List[Dict[str, Any]]):
+        """
+        Store the tool catalog for a server.
+        
+        Args:
+            server_url: MCP server URL
+            tools: Tool dictionaries (see ToolInfo.to_dict)
+        """
+        entry = {
+            'version': CACHE_VERSION,
+            'server_url': server_url,
+            'fetched_at': time.time(),
+            'tools': tools
+        }
+        try:
+            atomic_write_json(self._path_for(server_url), entry)
+        except OSError as e:
+            print(f"⚠️  Could not write tool cache for {server_url}: {e}")
+    
+    def invalidate(self, server_url: Optional[str] = None) -> int:
+        """
+        Remove cached catalogs.
+        
+        Args:
+            server_url: Server URL to invalidate, or None to clear every entry
+        
+        Returns:
+            Number of cache entries removed
+        """
+        paths = [self._path_for(server_url)] if server_url else list(self.cache_dir.glob('*.json'))
+        removed = 0
+        for path in paths:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a ResultCache."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.disk_hits} from disk), {self.misses} misses, "
+                f"{self.hit_rate:.0%} hit rate, {self.evictions} evictions, {self.expirations} expired")
+
+
+class ResultCache:
+    """
+    LRU + TTL cache for tool call results.
+    
+    Entries are keyed by server URL, tool name and canonicalized JSON
+    parameters. The in-memory tier is bounded by entry count and by the
+    pickled size of the results; an optional on-disk tier keeps results
+    across processes. Disk entries are pickles, so the disk tier is only
+    enabled for a directory owned by the current user; it is tightened to
+    0700 (see ensure_private_dir).
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_RESULT_CACHE_ENTRIES,
+                 max_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+                 default_ttl: float = DEFAULT_RESULT_CACHE_TTL,
+                 tool_ttls: Optional[Dict[str, float]] = None,
+                 disk_dir: Optional[Path] = None):
+        """
+        Initialize the result cache.
+        
+        Args:
+            max_entries: Maximum number of results kept in memory
+            max_bytes: Maximum total pickled size of results kept in memory
+            default_ttl: Seconds a result stays valid
+            tool_ttls: Per-tool TTL overrides; a TTL of 0 disables caching for that tool
+            disk_dir: Directory for the persistent tier (None for memory only)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.tool_ttls = dict(tool_ttls or {})
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir and not ensure_private_dir(self.disk_dir):
+            # Anyone who can write there could make us unpickle arbitrary objects
+            print(f"⚠️  Result cache directory {self.disk_dir} is not private to this user; caching in memory only")
+            self.disk_dir = None
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(server_url: str, tool_name: str, parameters: Dict[str, Any]) -> str:
+        """
+        Build a cache key from the server, tool and canonicalized parameters.
+        
+        Args:
+            server_url: MCP server URL
+            tool_name: Name of the tool
+            parameters: Tool parameters
+        
+        Returns:
+            Hex digest identifying the call
+        """
+        canonical = json.dumps([server_url, tool_name, parameters], sort_keys=True,
+                               separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def ttl_for(self, tool_name: str) -> float:
+        """Get the TTL in seconds for a tool."""
+        return self.tool_ttls.get(tool_name, self.default_ttl)
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Tuple of (hit, result)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, size, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return True, value
+                self._remove(key)
+                self.stats.expirations += 1
+        
+        hit, expires_at, value, size = self._disk_get(key, now)
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                self._insert(key, expires_at, size, value)
+                return True, value
+            self.stats.misses += 1
+            return False, None
+    
+    def put(self, key: str, tool_name: str, value: Any):
+        """
+        Store a result.
+        
+        Args:
+            key: Cache key from make_key()
+            tool_name: Name of the tool (selects the TTL)
+            value: Result to cache (must be picklable)
+        """
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return
+        
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._insert(key, expires_at, len(payload), value)
+            self.stats.stores += 1
+        self._disk_put(key, expires_at, payload)
+    
+    def clear(self):
+        """Remove every entry from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_dir:
+            for path in self.disk_dir.glob('*.pkl'):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _insert(self, key: str, expires_at: float, size: int, value: Any):
+        """Insert into the memory tier and evict least recently used entries (lock held)."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+    
+    def _remove(self, key: str):
+        """Remove an entry from the memory tier (lock held)."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+    
+    def _disk_get(self, key: str, now: float) -> Tuple[bool, float, Any, int]:
+        """Read an entry from the disk tier."""
+        if not self.disk_dir:
+            return False, 0.0, None, 0
+        
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                version, expires_at, payload = pickle.load(f)
+            value = pickle.loads(payload)
+        except FileNotFoundError:
+            return False, 0.0, None, 0
+        except Exception:
+            version, expires_at, value, payload = None, 0.0, None, b''
+        
+        if version != CACHE_VERSION or expires_at <= now:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return False, 0.0, None, 0
+        return True, expires_at, value, len(payload)
+    
+    def _disk_put(self, key: str, expires_at: float, payload: bytes):
+        """Write an entry to the disk tier atomically."""
+        if not self.disk_dir:
+            return
+        
+        record = pickle.dumps((CACHE_VERSION, expires_at, payload), protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._disk_path(key)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.disk_dir), prefix=f".{key}.", suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(record)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError as e:
+            print(f"⚠️  Could not write result cache entry: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
@@ -7,44 +7,98 @@ Provides easy access to tool discovery, schema viewing, and tool execution.
 """
 
 import argparse
+import os
 import sys
-from mcp_client import MCPClientManager, display_results
+import threading
+from contextlib import contextmanager, redirect_stdout
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from mcp_batch import DEFAULT_CHECKPOINT_EVERY
+from mcp_cache import ResultCache, get_cache_dir, DEFAULT_RESULT_CACHE_TTL, TOOL_CACHE_MODES, TOOL_CACHE_TTL
+from mcp_daemon import MCPDaemon, DEFAULT_IDLE_TIMEOUT, ThreadLocalStream, run_via_daemon, send_control
+from mcp_env import env_overlay
+from mcp_health import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+from mcp_registry import COLLISION_POLICIES, COLLISION_QUALIFY
+from mcp_render import (
+    MachineWriter,
+    iter_result_rows,
+    parse_fields,
+    DEFAULT_MAX_ROWS,
+    DEFAULT_MAX_BYTES,
+    OUTPUT_FORMATS,
+    OUTPUT_TEXT,
+)
+from mcp_resilience import RetryPolicy, HedgePolicy, DEFAULT_IDEMPOTENT_TOOLS
+from mcp_routing import endpoint_configs
+from mcp_schema import ToolValidationError
+from mcp_tracing import tracing, span, record_span, display_timings, default_trace_file, TRACE_FILE_ENV
 
+# mcp_client pulls in the Databricks SDK; it is imported on first use so that
+# commands forwarded to the daemon never pay for it
+if TYPE_CHECKING:
+    from mcp_client import MCPClientManager
+    from mcp_jobs import Job, JobManager
 
-def list_servers(manager: MCPClientManager):
+DEFAULT_CONFIG_PATH = ".cursor/mcp.json"
+
+# Commands that need the caller's terminal or working directory
+LOCAL_ONLY_COMMANDS = {'daemon', 'interactive', 'discover', 'batch-search'}
+
+
+def list_servers(manager: "MCPClientManager", out: Optional[MachineWriter] = None):
     """List all available MCP servers."""
+    if out:
+        for server_name in manager.list_servers():
+            urls = [endpoint['url'] for endpoint in endpoint_configs(manager.server_configs[server_name])]
+            record = {"server": server_name, "url": urls[0] if urls else None}
+            if len(urls) > 1:
+                record["endpoints"] = urls
+            out.write(record)
+        return
+    
     manager.display_servers()
 
 
-def list_tools(manager: MCPClientManager, server_name: str, detailed: bool = False):
+def list_tools(manager: "MCPClientManager", server_name: str, detailed: bool = False,
+               out: Optional[MachineWriter] = None) -> int:
     """List tools for a specific server."""
     client = manager.get_client(server_name)
     if not client:
         print(f"❌ Server '{server_name}' not found")
-        return
+        return 1
     
-    if not client.initialize():
+    if not client.ensure_initialized():
         print(f"❌ Failed to initialize server '{server_name}'")
-        return
+        return 1
+    
+    if out:
+        for tool in client.list_tools():
+            out.write({"server": server_name, **tool.to_dict()})
+        return 0
     
     client.display_tools(detailed=detailed)
+    return 0
 
 
-def show_tool_info(manager: MCPClientManager, server_name: str, tool_name: str):
+def show_tool_info(manager: "MCPClientManager", server_name: str, tool_name: str,
+                   out: Optional[MachineWriter] = None) -> int:
     """Show detailed information about a specific tool."""
     client = manager.get_client(server_name)
     if not client:
         print(f"❌ Server '{server_name}' not found")
-        return
+        return 1
     
-    if not client.initialize():
+    if not client.ensure_initialized():
         print(f"❌ Failed to initialize server '{server_name}'")
-        return
+        return 1
     
     tool_info = client.get_tool_info(tool_name)
     if not tool_info:
         print(f"❌ Tool '{tool_name}' not found")
-        return
+        return 1
+    
+    if out:
+        out.write({"server": server_name, **tool_info.to_dict()})
+        return 0
     
     print(f"\n🔧 Tool Information")
     print("=" * 50)
@@ -54,133 +108,434 @@ def show_tool_info(manager: MCPClientManager, server_name: str, tool_name: str):
         print(f"Input Schema:")
         import json
         print(json.dumps(tool_info.input_schema, indent=2))
+    return 0
+
+
+def emit_result(result: Any, out: Optional[MachineWriter] = None,
+                max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> int:
+    """
+    Print a tool result, or stream its rows to a machine-readable writer.
+    
+    Args:
+        result: Tool call result
+        out: Writer for json/ndjson output (None for text)
+        max_rows: Row limit (None: 20 rows in text mode, unlimited otherwise)
+        max_bytes: Byte limit per payload (None: 1 MB in text mode, unlimited otherwise)
+    
+    Returns:
+        1 if the server reported a tool error, 0 otherwise
+    """
+    from mcp_client import display_results, is_error_result
+    
+    if out:
+        rows = iter_result_rows(result, max_rows=max_rows, max_bytes=max_bytes)
+        with span("result.emit", output=out.output):
+            for row in rows:
+                out.write(row)
+            record_span("result.decode", rows.decode_time, rows=rows.rows, bytes=rows.bytes_read)
+        if rows.malformed:
+            print(f"⚠️  Result is not valid JSON past the first {rows.rows} rows; the rest was skipped")
+    else:
+        display_results(
+            result,
+            max_rows=max_rows if max_rows is not None else DEFAULT_MAX_ROWS,
+            max_bytes=max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES
+        )
+    return 1 if is_error_result(result) else 0
 
 
-def search_wikipedia(manager: MCPClientManager, query: str):
+def search_wikipedia(manager: "MCPClientManager", query: str, out: Optional[MachineWriter] = None,
+                     max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> int:
     """Search Wikipedia using the vector search tool."""
     client = manager.get_client("wikipedia-search")
     if not client:
         print("❌ Wikipedia search server not found")
-        return
+        return 1
     
-    if not client.initialize():
+    if not client.ensure_initialized():
         print("❌ Failed to initialize Wikipedia search server")
-        return
+        return 1
     
     try:
         result = client.search_wikipedia(query)
-        display_results(result)
+        return emit_result(result, out, max_rows, max_bytes)
     except Exception as e:
         print(f"❌ Search failed: {e}")
+        return 1
 
 
-def call_tool(manager: MCPClientManager, server_name: str, tool_name: str, parameters: str):
+def call_tool(manager: "MCPClientManager", server_name: str, tool_name: str, parameters: str,
+              out: Optional[MachineWriter] = None,
+              max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> int:
     """Call a specific tool with parameters."""
     client = manager.get_client(server_name)
     if not client:
         print(f"❌ Server '{server_name}' not found")
-        return
+        return 1
     
-    if not client.initialize():
+    if not client.ensure_initialized():
         print(f"❌ Failed to initialize server '{server_name}'")
-        return
+        return 1
     
     try:
         import json
         params = json.loads(parameters)
         result = client.call_tool(tool_name, params)
-        display_results(result)
+        return emit_result(result, out, max_rows, max_bytes)
     except json.JSONDecodeError:
         print("❌ Invalid JSON parameters")
+        return 1
     except Exception as e:
         print(f"❌ Tool call failed: {e}")
+        return 1
+
+
+def show_health(manager: "MCPClientManager", probe: bool = False,
+                out: Optional[MachineWriter] = None) -> int:
+    """Show circuit state, error rate and latency of every server."""
+    if probe:
+        print("🩺 Probing servers...")
+        manager.probe_servers()
+    
+    summaries = manager.health_summary()
+    if out:
+        for summary in summaries:
+            out.write(summary)
+        return 0
+    
+    icons = {CIRCUIT_CLOSED: "🟢", CIRCUIT_HALF_OPEN: "🟡", CIRCUIT_OPEN: "🔴"}
+    print(f"\n🩺 Server Health ({len(summaries)} servers)")
+    print("=" * 50)
+    for summary in summaries:
+        print(f"{icons[summary['state']]} {summary['server']}: {summary['state']}")
+        if not summary['calls']:
+            print("   No calls yet")
+            continue
+        latency = ""
+        if summary['p50_ms'] is not None:
+            latency = f", p50 {summary['p50_ms']:.0f} ms, p95 {summary['p95_ms']:.0f} ms"
+        print(f"   Calls: {summary['calls']}, failures: {summary['failures']}, "
+              f"error rate: {summary['error_rate']:.0%}{latency}")
+        if summary['rejected']:
+            print(f"   Rejected while open: {summary['rejected']}")
+        routing = summary.get('routing')
+        if routing and routing['ewma_ms'] is not None:
+            print(f"   Routing: EWMA {routing['ewma_ms']:.0f} ms, {routing['outstanding']} in flight")
+        if summary['state'] == CIRCUIT_OPEN:
+            print(f"   Next attempt in {summary['retry_in']:.0f}s")
+        if summary['last_error']:
+            print(f"   Last error: {summary['last_error']}")
+    
+    # Unhealthy servers make the command fail, so it can gate scripts
+    return 1 if any(summary['state'] == CIRCUIT_OPEN for summary in summaries) else 0
 
 
-def interactive_mode(manager: MCPClientManager, server_name: str):
-    """Start interactive mode for a specific server."""
+def batch_search(manager: "MCPClientManager", args: argparse.Namespace) -> int:
+    """Run queries from a file or stdin concurrently, with resumable checkpoints."""
+    import json
+    from mcp_batch import (
+        BatchCheckpoint, CheckpointMismatchError, open_output, read_queries, run_batch_search
+    )
+    from mcp_registry import WIKIPEDIA_SEARCH_KEYWORDS
+    
+    client = manager.get_client(args.server)
+    if not client:
+        print(f"❌ Server '{args.server}' not found")
+        return 1
+    
+    if not client.ensure_initialized():
+        print(f"❌ Failed to initialize server '{args.server}'")
+        return 1
+    
+    tool_name = args.tool
+    if not tool_name:
+        match = client.registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, client.server_name)
+        if not match:
+            print("❌ Wikipedia search tool not found; pass --tool")
+            return 1
+        tool_name = match.tool.name
+    
+    try:
+        base_parameters = json.loads(args.params) if args.params else {}
+    except json.JSONDecodeError:
+        print("❌ Invalid JSON parameters")
+        return 1
+    
+    # Catch a bad parameter template before it fails every query of the batch
+    if client.validate:
+        try:
+            client.validate_parameters(tool_name, {**base_parameters, args.query_param: "query"})
+        except ToolValidationError as e:
+            print(f"❌ {e}")
+            return 1
+    
+    # Checkpoints need a seekable output file
+    checkpoint = None
+    checkpoint_path = args.checkpoint or (f"{args.output_file}.checkpoint" if args.output_file else None)
+    if checkpoint_path:
+        if not args.output_file:
+            print("❌ --checkpoint requires --output-file")
+            return 1
+        run_key = {
+            'input': os.path.abspath(args.input) if args.input != '-' else '-',
+            'server': args.server,
+            'tool': tool_name,
+            'query_param': args.query_param,
+            'params': base_parameters,
+        }
+        if args.restart and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        try:
+            checkpoint = BatchCheckpoint.load(checkpoint_path, run_key)
+        except CheckpointMismatchError as e:
+            print(f"❌ {e}")
+            return 1
+        if checkpoint.completed:
+            print(f"↩️  Resuming from checkpoint: {checkpoint.completed} queries already done")
+    
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output = open_output(args.output_file, checkpoint) if args.output_file else sys.stdout
+    
+    print(f"📦 Running batch search with '{tool_name}' ({args.concurrency} concurrent calls)")
+    try:
+        # Keep stdout for results when no output file is given
+        with redirect_stdout(sys.stderr if output is sys.stdout else sys.stdout):
+            summary = run_batch_search(
+                client, tool_name, read_queries(source), output, checkpoint,
+                max_concurrency=args.concurrency,
+                query_param=args.query_param,
+                base_parameters=base_parameters,
+                fields=parse_fields(args.fields),
+                max_rows=args.max_rows,
+                max_bytes=args.max_bytes,
+                checkpoint_every=args.checkpoint_every
+            )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    print(f"✅ {summary.completed} queries in {summary.duration:.1f}s ({summary.rate:.1f}/s), "
+          f"{summary.failed} failed, {summary.skipped} skipped from checkpoint", file=sys.stderr)
+    if summary.interrupted:
+        print("⏸️  Interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+    return 1 if summary.failed else 0
+
+
+def _parse_job_id(jobs: "JobManager", argument: Optional[str]) -> Optional["Job"]:
+    """Resolve a job number (optionally written %N); None means the latest job."""
+    if argument is None:
+        job = jobs.last()
+        if job is None:
+            print("❌ No jobs yet")
+        return job
+    try:
+        job = jobs.get(int(argument.lstrip('%')))
+    except ValueError:
+        job = None
+    if job is None:
+        print(f"❌ No job {argument}")
+    return job
+
+
+def _show_jobs(jobs: List["Job"]):
+    """Print the job table of interactive mode."""
+    if not jobs:
+        print("No jobs")
+        return
+    for job in jobs:
+        print(f"  [{job.job_id}] {job.state:<9} {job.elapsed:6.1f}s  {job.label}")
+
+
+def _report_finished(jobs: List["Job"]):
+    """Announce jobs that finished since the last prompt."""
+    for job in jobs:
+        status = "✅" if job.error is None else "❌"
+        print(f"{status} [{job.job_id}] {job.state} in {job.elapsed:.1f}s: {job.label}")
+
+
+def _show_job_result(job: "Job"):
+    """Print the result (or error) of a finished job."""
+    from mcp_client import display_results
+    
+    if not job.finished:
+        print(f"⏳ [{job.job_id}] still {job.state}; use 'wait {job.job_id}'")
+    elif job.cancelled:
+        print(f"🚫 [{job.job_id}] was cancelled")
+    elif job.error is not None:
+        print(f"❌ [{job.job_id}] {job.label}: {job.error}")
+    else:
+        print(f"📋 [{job.job_id}] {job.label}")
+        display_results(job.result)
+
+
+def interactive_mode(manager: "MCPClientManager", server_name: str):
+    """
+    Start interactive mode for a specific server.
+    
+    call and search run as background jobs on the session's client, so the
+    prompt returns immediately and several calls can be outstanding at once.
+    Finished jobs are announced before the next prompt; jobs, wait, cancel
+    and result manage them.
+    """
     client = manager.get_client(server_name)
     if not client:
         print(f"❌ Server '{server_name}' not found")
         return
     
-    if not client.initialize():
+    if not client.ensure_initialized():
         print(f"❌ Failed to initialize server '{server_name}'")
         return
     
+    import json
+    from mcp_jobs import JobManager
+    from mcp_registry import WIKIPEDIA_SEARCH_KEYWORDS
+    
     print(f"\n🎯 Interactive Mode for '{server_name}'")
     print("Available commands:")
     print("  list - List all tools")
     print("  info <tool_name> - Show tool information")
-    print("  call <tool_name> <json_params> - Call a tool")
-    print("  search <query> - Search Wikipedia (if available)")
+    print("  call <tool_name> <json_params> - Call a tool in the background")
+    print("  search <query> - Search Wikipedia in the background (if available)")
+    print("  jobs - List background jobs")
+    print("  wait [job_id|all] - Wait for a job (default: all running jobs)")
+    print("  result [job_id] - Show a job's result (default: the latest job)")
+    print("  cancel <job_id> - Cancel a job")
     print("  quit - Exit interactive mode")
     print("-" * 50)
     
-    while True:
-        try:
-            command = input(f"\n[{server_name}]> ").strip()
-            
-            if command.lower() in ['quit', 'exit', 'q']:
-                print("👋 Goodbye!")
-                break
-            
-            if not command:
-                continue
-            
-            parts = command.split()
-            if not parts:
-                continue
-            
-            cmd = parts[0].lower()
-            
-            if cmd == 'list':
-                client.display_tools(detailed=True)
-            
-            elif cmd == 'info' and len(parts) > 1:
-                tool_name = parts[1]
-                tool_info = client.get_tool_info(tool_name)
-                if tool_info:
-                    print(f"\n🔧 Tool: {tool_info.name}")
-                    print(f"Description: {tool_info.description}")
-                    if tool_info.input_schema:
-                        import json
-                        print(f"Schema: {json.dumps(tool_info.input_schema, indent=2)}")
+    jobs = JobManager()
+    try:
+        while True:
+            try:
+                _report_finished(jobs.take_finished())
+                command = input(f"\n[{server_name}]> ").strip()
+                
+                if command.lower() in ['quit', 'exit', 'q']:
+                    running = jobs.running()
+                    if running:
+                        print(f"🚫 Abandoning {len(running)} running job(s)")
+                    print("👋 Goodbye!")
+                    break
+                
+                if not command:
+                    continue
+                
+                # Pick up edits to mcp.json; the client is only replaced if this server's entry changed
+                if manager.refresh_config():
+                    client = manager.get_client(server_name) or client
+                    if not client.ensure_initialized():
+                        print(f"❌ Failed to initialize server '{server_name}'")
+                        continue
+                
+                parts = command.split()
+                if not parts:
+                    continue
+                
+                cmd = parts[0].lower()
+                
+                if cmd == 'list':
+                    client.display_tools(detailed=True)
+                
+                elif cmd == 'info' and len(parts) > 1:
+                    tool_name = parts[1]
+                    tool_info = client.get_tool_info(tool_name)
+                    if tool_info:
+                        print(f"\n🔧 Tool: {tool_info.name}")
+                        print(f"Description: {tool_info.description}")
+                        if tool_info.input_schema:
+                            print(f"Schema: {json.dumps(tool_info.input_schema, indent=2)}")
+                    else:
+                        print(f"❌ Tool '{tool_name}' not found")
+                
+                elif cmd == 'call' and len(parts) > 2:
+                    tool_name = parts[1]
+                    params_str = ' '.join(parts[2:])
+                    try:
+                        params = json.loads(params_str)
+                        # Bad parameters are reported now rather than as a failed job
+                        params = client.validate_parameters(tool_name, params)
+                    except json.JSONDecodeError:
+                        print("❌ Invalid JSON parameters")
+                        continue
+                    except ToolValidationError as e:
+                        print(f"❌ {e}")
+                        continue
+                    job = jobs.submit(command, lambda c=client, t=tool_name, p=params: c.call_tool(t, p, verbose=False))
+                    print(f"🚀 [{job.job_id}] started")
+                
+                elif cmd == 'search' and len(parts) > 1:
+                    query = ' '.join(parts[1:])
+                    if not client.registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, server_name):
+                        print("❌ Search failed: Wikipedia search tool not found")
+                        continue
+                    job = jobs.submit(command, lambda c=client, q=query: c.search_wikipedia(q, verbose=False))
+                    print(f"🚀 [{job.job_id}] started")
+                
+                elif cmd == 'jobs':
+                    _show_jobs(jobs.jobs())
+                
+                elif cmd == 'wait':
+                    if len(parts) > 1 and parts[1].lower() != 'all':
+                        job = _parse_job_id(jobs, parts[1])
+                        waiting = [job] if job else []
+                    else:
+                        waiting = jobs.running()
+                    if waiting:
+                        print(f"⏳ Waiting for {len(waiting)} job(s) (Ctrl-C to stop waiting)")
+                        try:
+                            jobs.wait(waiting)
+                        except KeyboardInterrupt:
+                            print("\n⏸️  Stopped waiting; jobs keep running")
+                            continue
+                        if len(waiting) == 1:
+                            waiting[0].reported = True
+                            _show_job_result(waiting[0])
+                    elif len(parts) == 1:
+                        print("No running jobs")
+                
+                elif cmd == 'result':
+                    job = _parse_job_id(jobs, parts[1] if len(parts) > 1 else None)
+                    if job:
+                        if job.finished:
+                            job.reported = True
+                        _show_job_result(job)
+                
+                elif cmd == 'cancel' and len(parts) > 1:
+                    job = _parse_job_id(jobs, parts[1])
+                    if job:
+                        if jobs.cancel(job.job_id):
+                            print(f"🚫 [{job.job_id}] cancelled")
+                        else:
+                            print(f"❌ [{job.job_id}] already {job.state}")
+                
                 else:
-                    print(f"❌ Tool '{tool_name}' not found")
+                    print("❌ Unknown command. Type 'list' for available commands.")
             
-            elif cmd == 'call' and len(parts) > 2:
-                tool_name = parts[1]
-                params_str = ' '.join(parts[2:])
-                try:
-                    import json
-                    params = json.loads(params_str)
-                    result = client.call_tool(tool_name, params)
-                    display_results(result)
-                except json.JSONDecodeError:
-                    print("❌ Invalid JSON parameters")
-                except Exception as e:
-                    print(f"❌ Tool call failed: {e}")
-            
-            elif cmd == 'search' and len(parts) > 1:
-                query = ' '.join(parts[1:])
-                try:
-                    result = client.search_wikipedia(query)
-                    display_results(result)
-                except Exception as e:
-                    print(f"❌ Search failed: {e}")
-            
-            else:
-                print("❌ Unknown command. Type 'list' for available commands.")
-        
-        except KeyboardInterrupt:
-            print("\n👋 Goodbye!")
-            break
-        except Exception as e:
-            print(f"❌ Error: {e}")
+            except (KeyboardInterrupt, EOFError):
+                print("\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"❌ Error: {e}")
+    finally:
+        jobs.close()
 
 
-def main():
-    """Main CLI function."""
+def positive_int(value: str) -> int:
+    """Argparse type for options that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
     parser = argparse.ArgumentParser(
         description="MCP CLI Tool - Interact with Databricks MCP servers",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -191,12 +546,53 @@ def main():
    %(prog)s tool-info wikipedia-search rohit_dashora__docsearch__wikipedia_vi
    %(prog)s search "artificial intelligence"
    %(prog)s call-tool wikipedia-search rohit_dashora__docsearch__wikipedia_vi '{"query": "python"}'
+   %(prog)s --output ndjson --fields title,url search "python"
+   %(prog)s batch-search --input queries.txt --output-file results.ndjson --concurrency 16
    %(prog)s interactive wikipedia-search
    %(prog)s discover --backup
    %(prog)s discover --display-only
+   %(prog)s discover --full
+   %(prog)s --tool-cache refresh list-tools wikipedia-search
+   %(prog)s --timings call-tool wikipedia-search rohit_dashora__docsearch__wikipedia_vi '{"query": "python"}'
+   %(prog)s --trace trace.jsonl search "python"
+   %(prog)s --retries 2 --hedge search "python"
+   %(prog)s health --probe
+   %(prog)s clear-cache
+   %(prog)s daemon &
+   %(prog)s daemon status
         """
     )
     
+    parser.add_argument('--tool-cache', choices=TOOL_CACHE_MODES, default=TOOL_CACHE_TTL,
+                        help='Tool catalog cache mode (default: ttl)')
+    parser.add_argument('--result-cache', action='store_true',
+                        help='Cache tool call results on disk and reuse them for repeated calls')
+    parser.add_argument('--result-cache-ttl', type=float, default=DEFAULT_RESULT_CACHE_TTL,
+                        help=f'Seconds cached results stay valid (default: {DEFAULT_RESULT_CACHE_TTL:.0f})')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='Run in-process even if the background daemon is running')
+    parser.add_argument('--output', choices=OUTPUT_FORMATS, default=OUTPUT_TEXT,
+                        help='Output format; json/ndjson write only data to stdout (default: text)')
+    parser.add_argument('--fields',
+                        help='Comma-separated fields to keep in each result row (dotted paths allowed)')
+    parser.add_argument('--max-rows', type=int,
+                        help=f'Maximum result rows to output (default: {DEFAULT_MAX_ROWS} for text, unlimited otherwise)')
+    parser.add_argument('--max-bytes', type=int,
+                        help='Maximum bytes of each result payload to read (default: 1 MB for text, unlimited otherwise)')
+    parser.add_argument('--retries', type=int, default=0,
+                        help='Retry transient failures of idempotent tools up to N times (default: 0)')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Send a second copy of idempotent tool calls slower than the recent p95')
+    parser.add_argument('--idempotent-tools',
+                        help=f'Comma-separated glob patterns of tools safe to retry or hedge '
+                             f'(default: {",".join(DEFAULT_IDEMPOTENT_TOOLS)})')
+    parser.add_argument('--no-validate', action='store_true',
+                        help="Send tool parameters without checking them against the tool's input schema")
+    parser.add_argument('--trace', metavar='FILE',
+                        help=f'Append timing spans for this command to a JSONL trace file (default: ${TRACE_FILE_ENV})')
+    parser.add_argument('--timings', action='store_true',
+                        help='Print a per-phase timing summary to stderr when the command finishes')
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # List servers command
@@ -230,67 +626,336 @@ def main():
     discover_parser = subparsers.add_parser('discover', help='Discover tools and update configuration')
     discover_parser.add_argument('--display-only', action='store_true', help='Display tools without updating config')
     discover_parser.add_argument('--backup', action='store_true', help='Create backup before updating')
+    discover_parser.add_argument('--workers', type=int,
+                                 help='Maximum number of servers discovered concurrently')
+    discover_parser.add_argument('--timeout', type=float,
+                                 help='Per-server discovery timeout in seconds')
+    discover_parser.add_argument('--full', action='store_true',
+                                 help='Query every server, ignoring previous discoveries')
+    discover_parser.add_argument('--max-age', type=float,
+                                 help='Seconds before an unchanged server is queried again (default: 1 day)')
+    discover_parser.add_argument('--on-collision', choices=COLLISION_POLICIES, default=COLLISION_QUALIFY,
+                                 help='How to handle a tool name offered by several servers (default: qualify)')
     
-    args = parser.parse_args()
+    # Batch search command
+    batch_parser = subparsers.add_parser('batch-search', help='Run many queries concurrently with resumable checkpoints')
+    batch_parser.add_argument('--input', required=True, help="File with one query per line ('-' for stdin)")
+    batch_parser.add_argument('--output-file', help='NDJSON file receiving one line per query (default: stdout)')
+    batch_parser.add_argument('--checkpoint', help='Checkpoint file (default: <output-file>.checkpoint)')
+    batch_parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+    batch_parser.add_argument('--checkpoint-every', type=positive_int, default=DEFAULT_CHECKPOINT_EVERY,
+                              help=f'Save progress every N completed queries (default: {DEFAULT_CHECKPOINT_EVERY})')
+    batch_parser.add_argument('--concurrency', type=positive_int, default=8, help='Maximum calls in flight (default: 8)')
+    batch_parser.add_argument('--server', default='wikipedia-search', help='Server name (default: wikipedia-search)')
+    batch_parser.add_argument('--tool', help='Tool to call (default: the Wikipedia search tool)')
+    batch_parser.add_argument('--query-param', default='query', help='Tool parameter receiving each query (default: query)')
+    batch_parser.add_argument('--params', help='Extra JSON parameters sent with every call')
     
-    if not args.command:
-        parser.print_help()
+    # Health command
+    health_parser = subparsers.add_parser('health', help='Show circuit breaker state and latency per server')
+    health_parser.add_argument('--probe', action='store_true',
+                               help='Contact every server first instead of reporting past calls only')
+    
+    # Clear cache command
+    clear_cache_parser = subparsers.add_parser('clear-cache', help='Clear cached tool catalogs and results')
+    clear_cache_parser.add_argument('server', nargs='?', help='Server name (default: all servers)')
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser('daemon', help='Run or control the background daemon')
+    daemon_parser.add_argument('action', nargs='?', choices=['start', 'stop', 'status'], default='start',
+                               help='start runs the daemon in the foreground (default: start)')
+    daemon_parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                               help=f'Exit after this many idle seconds, 0 to never exit (default: {DEFAULT_IDLE_TIMEOUT:.0f})')
+    
+    return parser
+
+
+def create_manager(args: argparse.Namespace, config_path: str = DEFAULT_CONFIG_PATH) -> "MCPClientManager":
+    """Create a client manager configured from the global CLI options."""
+    from mcp_client import MCPClientManager
+    
+    result_cache = None
+    if args.result_cache:
+        result_cache = ResultCache(default_ttl=args.result_cache_ttl, disk_dir=get_cache_dir() / 'results')
+    
+    idempotent_tools = DEFAULT_IDEMPOTENT_TOOLS
+    if args.idempotent_tools:
+        idempotent_tools = tuple(p.strip() for p in args.idempotent_tools.split(',') if p.strip())
+    retry_policy = None
+    if args.retries > 0:
+        retry_policy = RetryPolicy(max_attempts=args.retries + 1, idempotent_tools=idempotent_tools)
+    hedge_policy = HedgePolicy(idempotent_tools=idempotent_tools) if args.hedge else None
+    
+    return MCPClientManager(config_path, tool_cache_mode=args.tool_cache, result_cache=result_cache,
+                            retry_policy=retry_policy, hedge_policy=hedge_policy,
+                            validate_parameters=not args.no_validate)
+
+
+@contextmanager
+def command_output(args: argparse.Namespace) -> Iterator[Optional[MachineWriter]]:
+    """
+    Set up output for a command.
+    
+    In json/ndjson mode, yields a MachineWriter bound to the real stdout and
+    sends every other print (progress, emoji status lines) to stderr so that
+    stdout only carries data. In the daemon, stdout is a per-thread proxy, so
+    only the current request's output is redirected.
+    
+    Yields:
+        MachineWriter, or None in text mode
+    """
+    # batch-search always writes NDJSON and manages its own streams
+    if args.output == OUTPUT_TEXT or args.command == 'batch-search':
+        yield None
         return
     
-    try:
-        # Create client manager
-        manager = MCPClientManager()
+    if isinstance(sys.stdout, ThreadLocalStream):
+        data_stream = sys.stdout.current()
+        sys.stdout.redirect(sys.stderr.current())
+        out = MachineWriter(args.output, data_stream, parse_fields(args.fields))
+        try:
+            yield out
+        finally:
+            out.close()
+            sys.stdout.redirect(data_stream)
+        return
+    
+    data_stream = sys.stdout
+    out = MachineWriter(args.output, data_stream, parse_fields(args.fields))
+    with redirect_stdout(sys.stderr):
+        try:
+            yield out
+        finally:
+            out.close()
+
+
+def run_command(args: argparse.Namespace, manager: Optional["MCPClientManager"] = None) -> int:
+    """
+    Execute a parsed CLI command.
+    
+    Args:
+        args: Parsed arguments
+        manager: Warm client manager to reuse (created from args if None)
+    
+    Returns:
+        Process exit code
+    """
+    with tracing(args.trace, collect=args.timings) as tracer:
+        try:
+            with span(f"cli.{args.command}") as command_span, command_output(args) as out:
+                try:
+                    exit_code = _dispatch(args, manager, out)
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+                    exit_code = 1
+                if command_span is not None:
+                    command_span.set_attribute('exit_code', exit_code)
+                return exit_code
+        finally:
+            if args.timings and tracer is not None:
+                display_timings(tracer.spans)
+
+
+def _dispatch(args: argparse.Namespace, manager: Optional["MCPClientManager"],
+              out: Optional[MachineWriter]) -> int:
+    # Create client manager
+    if manager is None:
+        manager = create_manager(args)
+    
+    exit_code = 0
+    limits = {'max_rows': args.max_rows, 'max_bytes': args.max_bytes}
+    
+    # Execute command
+    if args.command == 'list-servers':
+        list_servers(manager, out)
+    
+    elif args.command == 'list-tools':
+        exit_code = list_tools(manager, args.server, args.detailed, out)
+    
+    elif args.command == 'tool-info':
+        exit_code = show_tool_info(manager, args.server, args.tool, out)
+    
+    elif args.command == 'search':
+        exit_code = search_wikipedia(manager, args.query, out, **limits)
+    
+    elif args.command == 'call-tool':
+        exit_code = call_tool(manager, args.server, args.tool, args.parameters, out, **limits)
+    
+    elif args.command == 'batch-search':
+        exit_code = batch_search(manager, args)
+    
+    elif args.command == 'health':
+        exit_code = show_health(manager, args.probe, out)
+    
+    elif args.command == 'interactive':
+        if out:
+            print("❌ Interactive mode only supports --output text")
+            return 2
+        interactive_mode(manager, args.server)
+    
+    elif args.command == 'clear-cache':
+        removed = manager.invalidate_tool_cache(args.server)
+        print(f"🧹 Removed {removed} cached tool catalog(s)")
+        if not args.server:
+            ResultCache(disk_dir=get_cache_dir() / 'results').clear()
+            print("🧹 Cleared cached tool results")
+        if out:
+            out.write({"tool_catalogs_removed": removed, "results_cleared": not args.server})
+    
+    elif args.command == 'discover':
+        from mcp_discovery import discover_tools_incremental, display_discovered_tools, update_mcp_config
         
-        # Execute command
-        if args.command == 'list-servers':
-            list_servers(manager)
+        # Create backup if requested
+        if args.backup:
+            import shutil
+            backup_path = ".cursor/mcp.json.backup"
+            shutil.copy2(".cursor/mcp.json", backup_path)
+            print(f"📋 Created backup: {backup_path}")
         
-        elif args.command == 'list-tools':
-            list_tools(manager, args.server, args.detailed)
+        # Discover tools
+        discover_options = {'collision_policy': args.on_collision}
+        if args.workers is not None:
+            discover_options['max_workers'] = args.workers
+        if args.timeout is not None:
+            discover_options['server_timeout'] = args.timeout
+        if args.full:
+            discover_options['max_age'] = 0
+        elif args.max_age is not None:
+            discover_options['max_age'] = args.max_age
+        run = discover_tools_incremental(**discover_options)
+        discovered_tools = run.catalog if run else {}
         
-        elif args.command == 'tool-info':
-            show_tool_info(manager, args.server, args.tool)
+        if not discovered_tools:
+            print("❌ No tools discovered")
+            return 1
         
-        elif args.command == 'search':
-            search_wikipedia(manager, args.query)
+        # Display discovered tools
+        if out:
+            for tool_name, tool_info in discovered_tools.items():
+                out.write({"name": tool_name, **tool_info})
+        else:
+            display_discovered_tools(discovered_tools)
         
-        elif args.command == 'call-tool':
-            call_tool(manager, args.server, args.tool, args.parameters)
+        # Update configuration if not display-only
+        if not args.display_only:
+            updated = update_mcp_config(".cursor/mcp.json", discovered_tools, run.state, args.on_collision)
+            if updated is None:
+                exit_code = 1
+            elif updated:
+                print(f"\n✅ Tool discovery complete! Updated .cursor/mcp.json")
+            else:
+                print(f"\n✅ Tool discovery complete! .cursor/mcp.json was already up to date")
+        else:
+            print(f"\n✅ Tool discovery complete! (Display only mode)")
+    
+    if manager.result_cache is not None:
+        print(f"📊 Result cache: {manager.result_cache.stats}")
+    return exit_code
+
+
+class DaemonCommandHandler:
+    """Runs forwarded CLI invocations against warm, per-config client managers."""
+    
+    def __init__(self):
+        self.parser = build_parser()
+        self.managers: Dict[tuple, "MCPClientManager"] = {}
+        self._lock = threading.Lock()
+    
+    def _get_manager(self, args: argparse.Namespace, cwd: str,
+                     env: Optional[Dict[str, str]]) -> "MCPClientManager":
+        config_path = os.path.abspath(os.path.join(cwd, DEFAULT_CONFIG_PATH))
+        # Callers with different credentials or cache directories get separate managers
+        key = (config_path, args.tool_cache, args.result_cache, args.result_cache_ttl,
+               args.retries, args.hedge, args.idempotent_tools, args.no_validate,
+               tuple(sorted(env.items())) if env is not None else None)
         
-        elif args.command == 'interactive':
-            interactive_mode(manager, args.server)
+        with self._lock:
+            manager = self.managers.get(key)
+            if manager is None:
+                manager = create_manager(args, config_path)
+                self.managers[key] = manager
+                return manager
         
-        elif args.command == 'discover':
-            from mcp_discovery import discover_all_tools, display_discovered_tools, update_mcp_config
-            
-            # Create backup if requested
-            if args.backup:
-                import shutil
-                backup_path = ".cursor/mcp.json.backup"
-                shutil.copy2(".cursor/mcp.json", backup_path)
-                print(f"📋 Created backup: {backup_path}")
-            
-            # Discover tools
-            discovered_tools = discover_all_tools()
-            
-            if not discovered_tools:
-                print("❌ No tools discovered")
-                return
-            
-            # Display discovered tools
-            display_discovered_tools(discovered_tools)
+        # Edits to the config file are picked up without dropping warm clients of unchanged servers
+        manager.refresh_config()
+        return manager
+    
+    def reset(self):
+        """Drop every warm manager so the next command starts from the caches on disk."""
+        with self._lock:
+            for manager in self.managers.values():
+                manager.close()
+            self.managers.clear()
+    
+    def __call__(self, argv: List[str], cwd: str, env: Optional[Dict[str, str]] = None) -> int:
+        # The command sees the caller's MCP_* variables instead of the daemon's
+        with env_overlay(env):
+            args = self.parser.parse_args(argv)
+            if args.trace:
+                args.trace = os.path.join(cwd, args.trace)
+            try:
+                manager = self._get_manager(args, cwd, env)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                return 1
             
-            # Update configuration if not display-only
-            if not args.display_only:
-                update_mcp_config(".cursor/mcp.json", discovered_tools)
-                print(f"\n✅ Tool discovery complete! Updated .cursor/mcp.json")
-            else:
-                print(f"\n✅ Tool discovery complete! (Display only mode)")
+            exit_code = run_command(args, manager)
+            if args.command == 'clear-cache':
+                self.reset()
+            return exit_code
+
+
+def daemon_command(args: argparse.Namespace) -> int:
+    """Start, stop or query the background daemon."""
+    if args.action == 'stop':
+        if send_control('stop') is None:
+            print("⚠️  MCP daemon is not running")
+            return 1
+        print("🛑 Stop requested")
+        return 0
     
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        sys.exit(1)
+    if args.action == 'status':
+        reply = send_control('status')
+        if not reply:
+            print("⚪ MCP daemon is not running")
+            return 1
+        status = reply['status']
+        print(f"🟢 MCP daemon running (pid {status['pid']}) on {status['socket']}")
+        print(f"   Uptime: {status['uptime']:.0f}s, requests served: {status['requests_served']}, "
+              f"active: {status['active_requests']}")
+        return 0
+    
+    return MCPDaemon(DaemonCommandHandler(), idle_timeout=args.idle_timeout).serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main CLI function."""
+    parser = build_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+    
+    if not args.command:
+        parser.print_help()
+        return
+    
+    if args.command == 'daemon':
+        sys.exit(daemon_command(args))
+    
+    if not args.trace and default_trace_file():
+        args.trace = os.path.abspath(default_trace_file())
+        argv = ['--trace', args.trace] + argv
+    
+    # Use the warm daemon when one is running
+    if not args.no_daemon and args.command not in LOCAL_ONLY_COMMANDS:
+        exit_code = run_via_daemon(argv, os.getcwd())
+        if exit_code is not None:
+            sys.exit(exit_code)
+    
+    exit_code = run_command(args)
+    if exit_code:
+        sys.exit(exit_code)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
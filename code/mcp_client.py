@@ -5,12 +5,39 @@ This module provides a clean interface to interact with Databricks MCP servers,
 allowing you to discover tools, view their schemas, and execute tool calls.
 """
 
-from databricks_mcp import DatabricksMCPClient
-from databricks.sdk import WorkspaceClient
 import json
 import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Optional, Any, Tuple, Union
+from dataclasses import dataclass, field
+
+from mcp_cache import (
+    ToolCatalogCache,
+    ResultCache,
+    TOOL_CACHE_OFF,
+    TOOL_CACHE_TTL,
+    TOOL_CACHE_BACKGROUND,
+    TOOL_CACHE_REFRESH,
+    TOOL_CACHE_MODES,
+)
+from mcp_config import ConfigSnapshot, load_config
+from mcp_env import getenv
+from mcp_health import ServerHealth, CircuitBreakerSettings, CircuitOpenError
+from mcp_pool import PooledMCPSession, WorkspaceSessionPool
+from mcp_registry import ToolRegistry, ToolMatch, WIKIPEDIA_SEARCH_KEYWORDS, qualify_tool_name
+from mcp_render import iter_result_rows, render_row, DEFAULT_MAX_ROWS, DEFAULT_MAX_BYTES
+from mcp_resilience import RetryPolicy, HedgePolicy, HedgeExecutor
+from mcp_routing import EndpointStats, endpoint_configs, endpoint_label, pick_two_choices
+from mcp_schema import ToolValidator, ToolValidationError
+from mcp_tracing import span, set_attributes, record_span, propagate_context
+
+# databricks_mcp and the Databricks SDK take seconds to import; they are loaded
+# when the first client connects (see _initialize) so that commands which never
+# contact a server start quickly
+if TYPE_CHECKING:
+    from databricks_mcp import DatabricksMCPClient
 
 # Import profile authentication
 try:
@@ -26,9 +53,165 @@ class ToolInfo:
     name: str
     description: str
     input_schema: Optional[Dict[str, Any]] = None
+    _validator: Optional[ToolValidator] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def validator(self) -> ToolValidator:
+        """Validator compiled from input_schema on first use."""
+        if self._validator is None:
+            self._validator = ToolValidator(self.name, self.input_schema)
+        return self._validator
+    
+    def validate(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate parameters against the tool's input schema.
+        
+        Args:
+            parameters: Parameters for a call of this tool
+            
+        Returns:
+            A copy of the parameters with schema defaults applied
+            
+        Raises:
+            ToolValidationError: If the parameters do not match the schema
+        """
+        return self.validator.validate(parameters)
     
     def __str__(self) -> str:
         return f"Tool: {self.name}\nDescription: {self.description}\nSchema: {json.dumps(self.input_schema, indent=2) if self.input_schema else 'None'}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema
+        }
+    
+    @classmethod
+    def from_mcp_tool(cls, tool: Any) -> "ToolInfo":
+        """Create a ToolInfo from an mcp.types.Tool (mcp 1.x or 2.x field names)."""
+        input_schema = getattr(tool, 'input_schema', None)
+        if input_schema is None:
+            input_schema = getattr(tool, 'inputSchema', None)
+        return cls(
+            name=tool.name,
+            description=tool.description,
+            input_schema=input_schema
+        )
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ToolInfo":
+        """Create a ToolInfo from a dictionary produced by to_dict()."""
+        return cls(
+            name=data['name'],
+            description=data.get('description', ''),
+            input_schema=data.get('input_schema')
+        )
+
+
+@dataclass
+class ToolCallResult:
+    """Outcome of one tool call in a batch."""
+    index: int
+    tool_name: str
+    parameters: Dict[str, Any]
+    result: Any = None
+    error: Optional[Exception] = None
+    duration: float = 0.0
+    skipped: bool = False
+    
+    @property
+    def success(self) -> bool:
+        """True if the call completed without raising."""
+        return self.error is None and not self.skipped
+
+
+# Batch error policies
+BATCH_CONTINUE = "continue"  # Keep calling after a failed item
+BATCH_STOP = "stop"          # Stop submitting new calls after the first failure
+BATCH_ERROR_POLICIES = (BATCH_CONTINUE, BATCH_STOP)
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# A batch request is a (tool_name, parameters) pair
+ToolCallRequest = Tuple[str, Dict[str, Any]]
+
+# Seconds between checks of a profile (OAuth) token; the token cache refreshes
+# tokens well before they expire, so clients switch to the new one in time
+PROFILE_TOKEN_RECHECK = 60.0
+
+DEFAULT_SEARCH_PAGE_SIZE = 10
+
+# Result-count and offset parameters recognized in a search tool's input schema;
+# only parameters the schema declares are sent
+SEARCH_SIZE_PARAMS = ('num_results', 'top_k', 'k', 'limit')
+SEARCH_OFFSET_PARAMS = ('offset', 'start')
+
+
+def load_cached_tools(tool_cache: Optional[ToolCatalogCache], tool_cache_mode: str,
+                      server_url: str) -> Tuple[Optional[List[ToolInfo]], bool]:
+    """
+    Load a server's tools from the tool cache according to the cache mode.
+    
+    Args:
+        tool_cache: Tool catalog cache, or None
+        tool_cache_mode: One of TOOL_CACHE_MODES
+        server_url: MCP server URL
+        
+    Returns:
+        Tuple of (tools or None if discovery is needed, whether revalidation is needed)
+    """
+    if not tool_cache or tool_cache_mode in (TOOL_CACHE_OFF, TOOL_CACHE_REFRESH):
+        return None, False
+    
+    cached = tool_cache.load(server_url)
+    if not cached:
+        return None, False
+    
+    fresh = tool_cache.is_fresh(cached)
+    if not fresh and tool_cache_mode != TOOL_CACHE_BACKGROUND:
+        return None, False
+    
+    try:
+        tools = [ToolInfo.from_dict(tool) for tool in cached.tools]
+    except (KeyError, TypeError):
+        return None, False
+    
+    print(f"⚡ Loaded {len(tools)} tools from cache ({cached.age:.0f}s old)")
+    return tools, not fresh
+
+
+def is_error_result(result: Any) -> bool:
+    """Check whether a CallToolResult reports a tool error (mcp 1.x or 2.x field names)."""
+    return bool(getattr(result, 'is_error', None) or getattr(result, 'isError', None))
+
+
+def search_paging_params(tool: Optional[ToolInfo]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Pick the parameters used to page through a search tool's results.
+    
+    Args:
+        tool: The search tool (its input_schema may be missing)
+        
+    Returns:
+        Tuple of (result-count parameter, offset parameter); each is None if
+        the tool's schema does not declare one (or the schema is unknown)
+    """
+    schema = tool.input_schema if tool else None
+    properties = schema.get('properties') if isinstance(schema, dict) else None
+    if not isinstance(properties, dict):
+        return None, None
+    size_param = next((name for name in SEARCH_SIZE_PARAMS if name in properties), None)
+    offset_param = next((name for name in SEARCH_OFFSET_PARAMS if name in properties), None)
+    return size_param, offset_param
+
+
+def store_cached_tools(tool_cache: Optional[ToolCatalogCache], tool_cache_mode: str,
+                       server_url: str, tools: List[ToolInfo]):
+    """Store a freshly discovered tool catalog unless caching is off."""
+    if tool_cache and tool_cache_mode != TOOL_CACHE_OFF:
+        tool_cache.store(server_url, [tool.to_dict() for tool in tools])
 
 
 class MCPClient:
@@ -42,7 +225,17 @@ class MCPClient:
     - Execute tool calls
     """
     
-    def __init__(self, workspace_hostname: str, token: str, server_url: str):
+    def __init__(self, workspace_hostname: str, token: str, server_url: str,
+                 tool_cache: Optional[ToolCatalogCache] = None,
+                 tool_cache_mode: str = TOOL_CACHE_TTL,
+                 result_cache: Optional[ResultCache] = None,
+                 session_pool: Optional[WorkspaceSessionPool] = None,
+                 registry: Optional[ToolRegistry] = None,
+                 server_name: Optional[str] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 hedger: Optional[HedgeExecutor] = None,
+                 health: Optional[ServerHealth] = None,
+                 validate: bool = True):
         """
         Initialize the MCP client.
         
@@ -50,58 +243,229 @@ class MCPClient:
             workspace_hostname: Databricks workspace hostname
             token: Authentication token
             server_url: MCP server URL
+            tool_cache: Optional on-disk tool catalog cache
+            tool_cache_mode: One of TOOL_CACHE_MODES (ignored without tool_cache)
+            result_cache: Optional cache for tool call results
+            session_pool: Pool keeping one open MCP session per server over connections
+                shared per workspace (None opens a new session for every call)
+            registry: Tool registry to publish the catalog to (a private one if None)
+            server_name: Name the tools are registered under (defaults to server_url)
+            retry_policy: Retry transient failures of idempotent tools (None for a single attempt)
+            hedger: Send a second copy of slow idempotent calls (None to disable hedging)
+            health: Health record whose circuit breaker guards calls to this server
+            validate: Check parameters against the tool's input schema before sending a call
         """
+        if tool_cache_mode not in TOOL_CACHE_MODES:
+            raise ValueError(f"Invalid tool cache mode: {tool_cache_mode}")
+        
         self.workspace_hostname = workspace_hostname
         self.token = token
         self.server_url = server_url
-        self.mcp_client: Optional[DatabricksMCPClient] = None
+        self.tool_cache = tool_cache
+        self.tool_cache_mode = tool_cache_mode
+        self.result_cache = result_cache
+        self.session_pool = session_pool
+        self.registry = registry if registry is not None else ToolRegistry()
+        self.server_name = server_name or server_url
+        self.retry_policy = retry_policy
+        self.hedger = hedger
+        self.health = health
+        self.validate = validate
+        self.mcp_client: Optional[Union["DatabricksMCPClient", PooledMCPSession]] = None
         self.tools: List[ToolInfo] = []
         self._initialized = False
+        self._revalidation_thread: Optional[threading.Thread] = None
+        self._init_lock = threading.Lock()
+    
+    @property
+    def tools(self) -> List[ToolInfo]:
+        """Tools offered by the server, in server order."""
+        return self._tools
+    
+    @tools.setter
+    def tools(self, tools: List[ToolInfo]):
+        # Keep the registry index in step with the catalog
+        self._tools = list(tools)
+        self.registry.replace_server(self.server_name, self._tools)
     
     def initialize(self) -> bool:
         """
         Initialize the MCP client and discover available tools.
         
+        When a tool cache is configured, a cached catalog is used instead of
+        calling list_tools() on the server (see TOOL_CACHE_MODES).
+        
         Returns:
             True if initialization successful, False otherwise
         """
+        if self.health is not None:
+            try:
+                self.health.check()
+            except CircuitOpenError as e:
+                print(f"⛔ {e}")
+                return False
+        
+        with span("client.initialize", server=self.server_name):
+            return self._initialize()
+    
+    def _initialize(self) -> bool:
         try:
             print(f"🔗 Connecting to MCP server: {self.server_url}")
             
-            # Create workspace client for authentication
-            workspace_client = WorkspaceClient(
-                host=self.workspace_hostname,
-                token=self.token
-            )
+            if self.session_pool is not None:
+                # One persistent session per server, over connections shared by the workspace
+                self.mcp_client = self.session_pool.get_mcp_session(self.workspace_hostname, self.token,
+                                                                    self.server_url)
+            else:
+                with span("client.import_sdk"):
+                    from databricks_mcp import DatabricksMCPClient
+                    from databricks.sdk import WorkspaceClient
+                
+                # Opens a new transport and MCP session for every call
+                with span("client.workspace_client"):
+                    workspace_client = WorkspaceClient(
+                        host=self.workspace_hostname,
+                        token=self.token
+                    )
+                self.mcp_client = DatabricksMCPClient(
+                    server_url=self.server_url,
+                    workspace_client=workspace_client
+                )
             
-            # Create MCP client
-            self.mcp_client = DatabricksMCPClient(
-                server_url=self.server_url,
-                workspace_client=workspace_client
-            )
+            # Use cached tools if allowed
+            if self._load_cached_tools():
+                if self.health is not None:
+                    self.health.release()
+                self._initialized = True
+                return True
             
             # Discover tools
             print("🔍 Discovering available tools...")
-            raw_tools = self.mcp_client.list_tools()
-            
-            # Convert to ToolInfo objects
-            self.tools = []
-            for tool in raw_tools:
-                tool_info = ToolInfo(
-                    name=tool.name,
-                    description=tool.description,
-                    input_schema=getattr(tool, 'input_schema', None)
-                )
-                self.tools.append(tool_info)
+            start = time.monotonic()
+            self.tools = self._fetch_tools()
+            if self.health is not None:
+                self.health.record_success(time.monotonic() - start)
             
             self._initialized = True
             print(f"✅ Successfully discovered {len(self.tools)} tools")
             return True
             
         except Exception as e:
+            if self.health is not None:
+                self.health.record_error(e)
             print(f"❌ Failed to initialize MCP client: {e}")
             return False
     
+    def _fetch_tools(self) -> List[ToolInfo]:
+        """
+        Fetch the tool catalog from the server and update the tool cache.
+        
+        Returns:
+            List of ToolInfo objects
+        """
+        with span("client.list_tools", server=self.server_name):
+            raw_tools = self.mcp_client.list_tools()
+            
+            # Convert to ToolInfo objects
+            tools = [ToolInfo.from_mcp_tool(tool) for tool in raw_tools]
+            set_attributes(tools=len(tools))
+        
+        store_cached_tools(self.tool_cache, self.tool_cache_mode, self.server_url, tools)
+        return tools
+    
+    def _load_cached_tools(self) -> bool:
+        """
+        Load tools from the tool cache according to the cache mode.
+        
+        Returns:
+            True if tools were loaded from the cache, False if discovery is needed
+        """
+        with span("client.tool_cache", server=self.server_name, mode=self.tool_cache_mode):
+            tools, revalidate = load_cached_tools(self.tool_cache, self.tool_cache_mode, self.server_url)
+            set_attributes(hit=tools is not None, stale=revalidate)
+        if tools is None:
+            return False
+        
+        self.tools = tools
+        if revalidate:
+            self._start_revalidation()
+        return True
+    
+    def _start_revalidation(self):
+        """Refresh the tool catalog in a background thread."""
+        if self._revalidation_thread and self._revalidation_thread.is_alive():
+            return
+        
+        def revalidate():
+            try:
+                self.tools = self._fetch_tools()
+            except Exception as e:
+                print(f"⚠️  Background tool revalidation failed for {self.server_url}: {e}")
+        
+        self._revalidation_thread = threading.Thread(
+            target=revalidate, name="mcp-tool-revalidation", daemon=True
+        )
+        self._revalidation_thread.start()
+    
+    def ensure_initialized(self) -> bool:
+        """
+        Initialize the client unless it already is.
+        
+        Long-lived callers (the daemon, interactive mode) use this to reuse a
+        warm client instead of reconnecting on every command.
+        
+        Returns:
+            True if the client is ready, False otherwise
+        """
+        with self._init_lock:
+            if self._initialized:
+                return True
+            return self.initialize()
+    
+    def probe(self) -> bool:
+        """
+        Check that the server answers by fetching its tool catalog.
+        
+        The outcome and latency are recorded in the server's health record,
+        so a probe can close (or open) its circuit.
+        
+        Returns:
+            True if the server answered, False otherwise
+        """
+        if not self.ensure_initialized():
+            return False
+        
+        if self.health is not None:
+            try:
+                self.health.check()
+            except CircuitOpenError as e:
+                print(f"⛔ {e}")
+                return False
+        
+        start = time.monotonic()
+        try:
+            self.tools = self._fetch_tools()
+        except Exception as e:
+            if self.health is not None:
+                self.health.record_error(e, time.monotonic() - start)
+            print(f"❌ Probe of {self.server_name} failed: {e}")
+            return False
+        
+        if self.health is not None:
+            self.health.record_success(time.monotonic() - start)
+        return True
+    
+    def invalidate_tool_cache(self):
+        """Drop the cached tool catalog for this server."""
+        if self.tool_cache:
+            self.tool_cache.invalidate(self.server_url)
+    
+    def close(self):
+        """Close the client's pooled MCP session; a client without a pool holds none open."""
+        close = getattr(self.mcp_client, 'close', None)
+        if close is not None:
+            close()
+    
     def list_tools(self) -> List[ToolInfo]:
         """
         Get list of available tools.
@@ -126,21 +490,43 @@ class MCPClient:
         if not self._initialized:
             raise RuntimeError("MCP client not initialized. Call initialize() first.")
         
-        for tool in self.tools:
-            if tool.name == tool_name:
-                return tool
-        return None
+        return self.registry.get(self.server_name, tool_name)
+    
+    def validate_parameters(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check parameters against a tool's input schema without calling it.
+        
+        Args:
+            tool_name: Name of the tool
+            parameters: Parameters for the call
+            
+        Returns:
+            A copy of the parameters with schema defaults applied (unchanged
+            if the tool is unknown, which the server reports on the call)
+            
+        Raises:
+            ToolValidationError: If the parameters do not match the schema
+        """
+        tool = self.registry.get(self.server_name, tool_name)
+        if tool is None:
+            return parameters
+        return tool.validate(parameters)
     
-    def call_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
+    def call_tool(self, tool_name: str, parameters: Dict[str, Any], verbose: bool = True) -> Any:
         """
         Call a specific tool with given parameters.
         
         Args:
             tool_name: Name of the tool to call
             parameters: Parameters to pass to the tool
+            verbose: If True, print the call and its outcome
             
         Returns:
             Tool execution result
+            
+        Raises:
+            ToolValidationError: If validation is on and the parameters do not
+                match the tool's input schema (nothing is sent)
         """
         if not self._initialized:
             raise RuntimeError("MCP client not initialized. Call initialize() first.")
@@ -148,15 +534,172 @@ class MCPClient:
         if not self.mcp_client:
             raise RuntimeError("MCP client not available")
         
+        with span("tool.call", server=self.server_name, tool=tool_name):
+            if self.validate:
+                try:
+                    with span("tool.validate"):
+                        parameters = self.validate_parameters(tool_name, parameters)
+                except ToolValidationError as e:
+                    if verbose:
+                        print(f"❌ {e}")
+                    raise
+            return self._call_tool(tool_name, parameters, verbose)
+    
+    def _call_tool(self, tool_name: str, parameters: Dict[str, Any], verbose: bool) -> Any:
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.make_key(self.server_url, tool_name, parameters)
+            hit, cached_result = self.result_cache.get(cache_key)
+            set_attributes(cache_hit=hit)
+            if hit:
+                if verbose:
+                    print(f"⚡ Using cached result for tool '{tool_name}'")
+                return cached_result
+        
         try:
-            print(f"🚀 Calling tool '{tool_name}' with parameters: {parameters}")
-            result = self.mcp_client.call_tool(tool_name, parameters)
-            print("✅ Tool call successful")
+            if verbose:
+                print(f"🚀 Calling tool '{tool_name}' with parameters: {parameters}")
+            result = self._send_with_retries(tool_name, parameters, verbose)
+            set_attributes(error_result=is_error_result(result))
+            if verbose:
+                print("✅ Tool call successful")
+            if cache_key is not None and not is_error_result(result):
+                self.result_cache.put(cache_key, tool_name, result)
             return result
         except Exception as e:
-            print(f"❌ Tool call failed: {e}")
+            if verbose:
+                print(f"❌ Tool call failed: {e}")
             raise
     
+    def _send_with_retries(self, tool_name: str, parameters: Dict[str, Any], verbose: bool) -> Any:
+        """Send a tool call, retrying transient failures according to the retry policy."""
+        policy = self.retry_policy
+        if policy is not None and policy.budget is not None:
+            policy.budget.deposit()
+        
+        attempt = 1
+        while True:
+            # Fails fast with CircuitOpenError while the server is known to be failing
+            if self.health is not None:
+                self.health.check()
+            start = time.monotonic()
+            try:
+                result = self._send(tool_name, parameters)
+                if self.health is not None:
+                    self.health.record_success(time.monotonic() - start)
+                set_attributes(attempts=attempt)
+                return result
+            except Exception as e:
+                if self.health is not None:
+                    self.health.record_error(e, time.monotonic() - start)
+                if policy is None or not policy.should_retry(tool_name, e, attempt):
+                    set_attributes(attempts=attempt)
+                    raise
+                delay = policy.backoff(attempt)
+                if verbose:
+                    print(f"⚠️  Attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                with span("tool.backoff", attempt=attempt, error=type(e).__name__):
+                    time.sleep(delay)
+                attempt += 1
+    
+    def _send(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
+        """Make one attempt, hedged when the tool is idempotent and hedging is on."""
+        if self.hedger is not None and self.hedger.policy.is_idempotent(tool_name):
+            return self.hedger.call(qualify_tool_name(self.server_name, tool_name),
+                                    lambda: self.mcp_client.call_tool(tool_name, parameters))
+        return self.mcp_client.call_tool(tool_name, parameters)
+    
+    def _call_tool_for_batch(self, index: int, tool_name: str, parameters: Dict[str, Any]) -> ToolCallResult:
+        """Call a tool quietly, capturing the result or error."""
+        start = time.monotonic()
+        try:
+            result = self.call_tool(tool_name, parameters, verbose=False)
+            return ToolCallResult(index, tool_name, parameters, result=result,
+                                  duration=time.monotonic() - start)
+        except Exception as e:
+            return ToolCallResult(index, tool_name, parameters, error=e,
+                                  duration=time.monotonic() - start)
+    
+    def iter_tools_batch(self, requests: Iterable[ToolCallRequest],
+                         max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                         on_error: str = BATCH_CONTINUE) -> Iterator[ToolCallResult]:
+        """
+        Call many tools concurrently, yielding each result as it completes.
+        
+        Requests are consumed lazily, so at most max_concurrency calls are in
+        flight and arbitrarily long (or streaming) request iterables are fine.
+        
+        Args:
+            requests: Iterable of (tool_name, parameters) pairs
+            max_concurrency: Maximum number of calls in flight
+            on_error: BATCH_CONTINUE to keep going after failures, BATCH_STOP to
+                stop submitting new calls after the first failure (calls already
+                in flight still complete and are yielded)
+            
+        Yields:
+            ToolCallResult objects in completion order (see ToolCallResult.index)
+        """
+        if not self._initialized:
+            raise RuntimeError("MCP client not initialized. Call initialize() first.")
+        if on_error not in BATCH_ERROR_POLICIES:
+            raise ValueError(f"Invalid batch error policy: {on_error}")
+        
+        max_concurrency = max(1, max_concurrency)
+        pending_requests = enumerate(requests)
+        stopped = False
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="mcp-batch") as executor:
+            in_flight = set()
+            
+            def fill():
+                while not stopped and len(in_flight) < max_concurrency:
+                    try:
+                        index, (tool_name, parameters) = next(pending_requests)
+                    except StopIteration:
+                        return
+                    call = propagate_context(self._call_tool_for_batch)
+                    in_flight.add(executor.submit(call, index, tool_name, parameters))
+            
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    item = future.result()
+                    if not item.success and on_error == BATCH_STOP:
+                        stopped = True
+                    yield item
+                fill()
+    
+    def call_tools_batch(self, requests: Iterable[ToolCallRequest],
+                         max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                         on_error: str = BATCH_CONTINUE) -> List[ToolCallResult]:
+        """
+        Call many tools concurrently and return the results in input order.
+        
+        Args:
+            requests: Iterable of (tool_name, parameters) pairs
+            max_concurrency: Maximum number of calls in flight
+            on_error: BATCH_CONTINUE or BATCH_STOP (see iter_tools_batch)
+            
+        Returns:
+            One ToolCallResult per request, in input order. With BATCH_STOP,
+            requests that were never sent are returned with skipped=True.
+        """
+        requests = list(requests)
+        results: List[Optional[ToolCallResult]] = [None] * len(requests)
+        
+        for item in self.iter_tools_batch(requests, max_concurrency, on_error):
+            results[item.index] = item
+        
+        for index, (tool_name, parameters) in enumerate(requests):
+            if results[index] is None:
+                results[index] = ToolCallResult(index, tool_name, parameters, skipped=True)
+        
+        failed = sum(1 for item in results if not item.success)
+        print(f"📦 Batch complete: {len(results) - failed}/{len(results)} calls succeeded")
+        return results
+    
     def display_tools(self, detailed: bool = False):
         """
         Display available tools in a formatted way.
@@ -181,27 +724,246 @@ class MCPClient:
             
             print("-" * 40)
     
-    def search_wikipedia(self, query: str) -> Any:
+    def search_wikipedia(self, query: str, verbose: bool = True) -> Any:
         """
         Convenience method to search Wikipedia using the vector search tool.
         
         Args:
             query: Search query
+            verbose: If True, print the call and its outcome
             
         Returns:
             Search results
         """
-        # Find the Wikipedia search tool
-        wikipedia_tool = None
-        for tool in self.tools:
-            if 'wikipedia' in tool.name.lower() or 'docsearch' in tool.name.lower():
-                wikipedia_tool = tool
-                break
-        
-        if not wikipedia_tool:
+        # Find the Wikipedia search tool (resolved once per catalog)
+        match = self.registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, self.server_name)
+        if not match:
             raise ValueError("Wikipedia search tool not found")
         
-        return self.call_tool(wikipedia_tool.name, {"query": query})
+        return self.call_tool(match.tool.name, {"query": query}, verbose=verbose)
+    
+    def iter_search(self, query: str, page_size: int = DEFAULT_SEARCH_PAGE_SIZE,
+                    max_results: Optional[int] = None, prefetch: bool = True,
+                    tool_name: Optional[str] = None,
+                    parameters: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Lazily iterate over search results, one page per tool call.
+        
+        Tools whose schema declares an offset parameter are paged with it.
+        Pages are only requested as the caller consumes rows, so stopping
+        after the first few rows costs a single small call. With prefetch,
+        the next page is requested in the background while the current one
+        is consumed; at most two pages are held at a time.
+        
+        Vector search tools usually only take a result count (num_results).
+        For them a single call asks for max_results rows (page_size if
+        max_results is None), and a warning is printed when that call comes
+        back full, as further results cannot be requested. A count parameter
+        is only sent if the schema declares one.
+        
+        Args:
+            query: Search query
+            page_size: Rows requested per page
+            max_results: Stop after this many rows (None for all the server returns)
+            prefetch: If True, fetch the next page while the current one is consumed
+            tool_name: Search tool to call (default: the server's Wikipedia search tool)
+            parameters: Extra parameters sent with every page (e.g. filters)
+            
+        Yields:
+            Result rows in rank order
+            
+        Raises:
+            ValueError: If page_size is not positive or no search tool is found
+            RuntimeError: If the tool returns an error result
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        
+        if tool_name is None:
+            match = self.registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, self.server_name)
+            if not match:
+                raise ValueError("Wikipedia search tool not found")
+            tool_name = match.tool.name
+        
+        size_param, offset_param = search_paging_params(self.get_tool_info(tool_name))
+        base_parameters = {**(parameters or {}), "query": query}
+        
+        def fetch(start: int, count: int) -> List[Any]:
+            """Rows of one call asking for count rows from rank start."""
+            page_parameters = dict(base_parameters)
+            if size_param:
+                page_parameters[size_param] = count
+            if offset_param:
+                page_parameters[offset_param] = start
+            with span("search.page", tool=tool_name, start=start, rows=count):
+                result = self.call_tool(tool_name, page_parameters, verbose=False)
+            if is_error_result(result):
+                message = next(iter(iter_result_rows(result, max_rows=1)), "")
+                raise RuntimeError(f"Search tool '{tool_name}' returned an error: {message}")
+            rows = iter_result_rows(result, max_rows=None, max_bytes=None)
+            page = list(rows)
+            if rows.malformed:
+                raise RuntimeError(f"Search tool '{tool_name}' returned malformed JSON after {len(page)} results")
+            return page
+        
+        if max_results is not None and max_results <= 0:
+            return
+        
+        if not offset_param:
+            # No way to ask for the next page: one call for everything wanted
+            count = max_results if max_results is not None else page_size
+            rows = fetch(0, count)
+            limit = count if size_param else max_results
+            yield from rows[:limit]
+            if size_param and max_results is None and len(rows) >= count:
+                print(f"⚠️  {tool_name} has no offset parameter; stopped after {count} results "
+                      f"(pass max_results to request more)")
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-search") if prefetch else None
+        pending = None
+        try:
+            start = 0
+            count = page_size if max_results is None else min(page_size, max_results)
+            rows = fetch(start, count)
+            while True:
+                if max_results is not None:
+                    rows = rows[:max_results - start]
+                next_start = start + len(rows)
+                # A short (or, without a count parameter, empty) page means there are no more results
+                more = len(rows) >= count if size_param else bool(rows)
+                if max_results is not None and next_start >= max_results:
+                    more = False
+                next_count = page_size if max_results is None else min(page_size, max_results - next_start)
+                if executor and more:
+                    pending = executor.submit(propagate_context(fetch), next_start, next_count)
+                
+                yield from rows
+                rows = []
+                
+                if not more:
+                    return
+                start, count = next_start, next_count
+                rows = pending.result() if pending else fetch(start, count)
+                pending = None
+        finally:
+            if pending:
+                pending.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+
+
+class MultiEndpointClient(MCPClient):
+    """
+    One logical server backed by several equivalent endpoints.
+    
+    Every endpoint has its own MCPClient (session, hedging, health). Result
+    caching and retries apply once per logical call, and each attempt is
+    routed to an endpoint picked by power of two choices over EWMA latency
+    and in-flight calls, skipping endpoints whose circuit is open, so a
+    retry usually lands on another endpoint.
+    """
+    
+    def __init__(self, endpoints: List[MCPClient], server_name: str,
+                 stats: Optional[List[EndpointStats]] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 registry: Optional[ToolRegistry] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 validate: bool = True):
+        """
+        Initialize the client.
+        
+        Args:
+            endpoints: One client per endpoint, all serving the same tools
+            server_name: Logical server name the tools are registered under
+            stats: Routing stats per endpoint (new ones if None)
+            result_cache: Optional cache for tool call results
+            registry: Tool registry to publish the catalog to (a private one if None)
+            retry_policy: Retry policy applied across endpoints
+            validate: Check parameters against the tool's input schema before sending a call
+        """
+        if not endpoints:
+            raise ValueError("MultiEndpointClient needs at least one endpoint")
+        
+        first = endpoints[0]
+        super().__init__(first.workspace_hostname, first.token, first.server_url,
+                         result_cache=result_cache, registry=registry,
+                         server_name=server_name, retry_policy=retry_policy, validate=validate)
+        self.endpoints = endpoints
+        self.stats = stats or [EndpointStats() for _ in endpoints]
+        
+        # Endpoints serve the same catalog; only the logical server publishes it
+        for endpoint in endpoints:
+            endpoint.registry = ToolRegistry()
+    
+    def _initialize(self) -> bool:
+        # The server is usable as soon as one endpoint is
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            ready = list(executor.map(propagate_context(MCPClient.ensure_initialized), self.endpoints))
+        
+        if not any(ready):
+            print(f"❌ No endpoint of {self.server_name} could be initialized")
+            return False
+        
+        first_ready = self.endpoints[ready.index(True)]
+        self.mcp_client = first_ready.mcp_client
+        self.tools = first_ready.tools
+        self._initialized = True
+        print(f"✅ {sum(ready)}/{len(ready)} endpoints of {self.server_name} ready")
+        return True
+    
+    def _choose_endpoint(self) -> int:
+        """Pick the endpoint for the next attempt."""
+        ready = [i for i, endpoint in enumerate(self.endpoints) if endpoint._initialized]
+        if not ready:
+            raise RuntimeError(f"No endpoint of {self.server_name} is initialized")
+        
+        available = [i for i in ready
+                     if self.endpoints[i].health is None or self.endpoints[i].health.available()]
+        # With every circuit open, the chosen endpoint's check() fails fast
+        candidates = available or ready
+        return candidates[pick_two_choices([self.stats[i] for i in candidates])]
+    
+    def _send(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
+        index = self._choose_endpoint()
+        endpoint, stats = self.endpoints[index], self.stats[index]
+        set_attributes(endpoint=endpoint.server_name)
+        
+        if endpoint.health is not None:
+            endpoint.health.check()
+        
+        stats.start()
+        start = time.monotonic()
+        try:
+            result = endpoint._send(tool_name, parameters)
+        except Exception as e:
+            latency = time.monotonic() - start
+            stats.finish(latency, failed=True)
+            if endpoint.health is not None:
+                endpoint.health.record_error(e, latency)
+            raise
+        
+        latency = time.monotonic() - start
+        stats.finish(latency)
+        if endpoint.health is not None:
+            endpoint.health.record_success(latency)
+        return result
+    
+    def probe(self) -> bool:
+        """Probe every endpoint concurrently; True if at least one answered."""
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            answered = list(executor.map(propagate_context(MCPClient.probe), self.endpoints))
+        if any(answered) and not self._initialized:
+            return self.ensure_initialized()
+        return any(answered)
+    
+    def invalidate_tool_cache(self):
+        for endpoint in self.endpoints:
+            endpoint.invalidate_tool_cache()
+    
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.close()
 
 
 class MCPClientManager:
@@ -209,95 +971,381 @@ class MCPClientManager:
     Manager class for handling multiple MCP clients and configurations.
     """
     
-    def __init__(self, config_path: str = ".cursor/mcp.json"):
+    def __init__(self, config_path: str = ".cursor/mcp.json",
+                 tool_cache_mode: str = TOOL_CACHE_TTL,
+                 result_cache: Optional[ResultCache] = None,
+                 session_pool: Optional[WorkspaceSessionPool] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 hedge_policy: Optional[HedgePolicy] = None,
+                 breaker_settings: Optional[CircuitBreakerSettings] = None,
+                 validate_parameters: bool = True):
         """
         Initialize the MCP client manager.
         
         Args:
             config_path: Path to MCP configuration file
+            tool_cache_mode: Tool catalog cache mode for created clients (see TOOL_CACHE_MODES)
+            result_cache: Optional result cache shared by all clients (opt-in)
+            session_pool: Pool of MCP sessions and connections shared by servers on the same workspace
+            retry_policy: Retry policy for tool calls of every client (None for a single attempt)
+            hedge_policy: Hedging policy for tool calls of every client (None to disable hedging)
+            breaker_settings: Circuit breaker settings applied to every server
+            validate_parameters: Validate tool parameters against input schemas before sending calls
+        
+        Tools of every initialized client are indexed in ``self.registry``, and
+        the health of every configured server is tracked in ``self.health``.
         """
         self.config_path = config_path
+        self.tool_cache_mode = tool_cache_mode
+        self.result_cache = result_cache
+        self.session_pool = session_pool if session_pool is not None else WorkspaceSessionPool()
+        self.retry_policy = retry_policy
+        self.hedger = HedgeExecutor(hedge_policy) if hedge_policy is not None else None
+        self.breaker_settings = breaker_settings
+        self.validate_parameters = validate_parameters
+        self.health: Dict[str, ServerHealth] = {}
+        self.endpoint_stats: Dict[str, EndpointStats] = {}
+        self.registry = ToolRegistry()
+        self.tool_cache = ToolCatalogCache() if tool_cache_mode != TOOL_CACHE_OFF else None
+        self.config: Optional[ConfigSnapshot] = None
+        self.server_configs: Mapping[str, Mapping[str, Any]] = {}
         self.clients: Dict[str, MCPClient] = {}
+        # Resolved token and when to look it up again (monotonic), per server
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        # Tokens each client was created with and when to check them again
+        self._client_tokens: Dict[str, Tuple[Tuple[Optional[str], ...], float]] = {}
+        self._profile_auth = None
+        self._profile_auth_loaded = False
+        self._lock = threading.Lock()
+        self._server_locks: Dict[str, threading.Lock] = {}
         self._load_config()
     
     def _load_config(self):
-        """Load MCP configuration from file."""
+        """
+        Load MCP configuration from the shared config snapshot (see mcp_config).
+        
+        Only the server definitions are read here; credentials are resolved
+        lazily when a client is first requested (see get_client).
+        """
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"MCP config file not found: {self.config_path}")
         
         try:
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
+            snapshot = load_config(self.config_path)
+        except Exception as e:
+            raise Exception(f"Error loading MCP config: {e}")
+        self._apply_config(snapshot)
+    
+    def _apply_config(self, snapshot: ConfigSnapshot):
+        """Switch to a config snapshot, keeping the warm state of unchanged servers."""
+        evicted = []
+        with self._lock:
+            previous = self.server_configs
+            changed = {name for name in previous if snapshot.servers.get(name) != previous[name]}
+            for name in changed:
+                client = self.clients.pop(name, None)
+                if client is not None:
+                    evicted.append(client)
+                self._tokens.pop(name, None)
+                self._client_tokens.pop(name, None)
+                self.registry.remove_server(name)
             
-            mcp_servers = config.get('mcpServers', {})
+            if self.config is None or snapshot.server_profiles != self.config.server_profiles:
+                # Re-read profile mappings on next use
+                self._profile_auth = None
+                self._profile_auth_loaded = False
             
-            # Check if profile authentication is available and configured
-            profile_auth = None
-            if PROFILE_AUTH_AVAILABLE:
-                profile_auth = MCPDatabricksProfileAuth(self.config_path)
-                if profile_auth.list_configured_servers():
-                    print("🔐 Using Databricks profile authentication")
+            # Health is tracked per endpoint: "server", or "server[i]" when a server has several
+            health, endpoint_stats = {}, {}
+            for name, server_config in snapshot.servers.items():
+                keep = name in previous and name not in changed
+                endpoints = endpoint_configs(server_config)
+                for index in range(len(endpoints)):
+                    label = endpoint_label(name, index, len(endpoints))
+                    health[label] = (self.health[label] if keep and label in self.health
+                                     else ServerHealth(label, self.breaker_settings))
+                    if len(endpoints) > 1:
+                        endpoint_stats[label] = (self.endpoint_stats[label] if keep and label in self.endpoint_stats
+                                                 else EndpointStats())
             
-            for server_name, server_config in mcp_servers.items():
-                url = server_config['url']
-                
-                # Try profile authentication first
-                token = None
-                if profile_auth and server_name in profile_auth.list_configured_servers():
-                    token = profile_auth.get_token_for_server(server_name)
-                    if token:
-                        print(f"🔐 Using profile authentication for: {server_name}")
-                
-                # Fall back to environment variable
-                if not token:
-                    env_token_name = f"MCP_{server_name.upper().replace('-', '_')}_TOKEN"
-                    token = os.getenv(env_token_name)
-                    if token:
-                        print(f"🔐 Using token from environment variable: {env_token_name}")
-                
-                # Fall back to config file
+            self.config = snapshot
+            self.server_configs = snapshot.servers
+            self._server_locks = {name: self._server_locks.get(name) or threading.Lock()
+                                  for name in snapshot.servers}
+            self.health = health
+            self.endpoint_stats = endpoint_stats
+        
+        # Closed outside the lock, which _close_client may take
+        for client in evicted:
+            self._close_client(client)
+    
+    def refresh_config(self) -> bool:
+        """
+        Reload the config file if it changed since it was loaded.
+        
+        Long-running callers (the daemon, interactive mode) call this before
+        each command. Servers whose definition changed or that were removed
+        lose their client (which is closed), token and health; other servers
+        stay warm.
+        
+        Returns:
+            True if a new version of the file was applied
+        """
+        if self.config is not None and not self.config.is_stale():
+            return False
+        
+        try:
+            snapshot = load_config(self.config_path)
+        except Exception as e:
+            # Keep serving the last good configuration
+            print(f"⚠️  Keeping previous MCP config: {e}")
+            return False
+        
+        if self.config is not None and snapshot.digest == self.config.digest:
+            # Touched or rewritten with identical content
+            self.config = snapshot
+            return False
+        
+        self._apply_config(snapshot)
+        print(f"🔄 Reloaded MCP config: {self.config_path}")
+        return True
+    
+    def _get_profile_auth(self):
+        """Create the profile authentication helper on first use."""
+        with self._lock:
+            if not self._profile_auth_loaded:
+                self._profile_auth_loaded = True
+                if PROFILE_AUTH_AVAILABLE:
+                    with span("auth.load_profiles"):
+                        self._profile_auth = MCPDatabricksProfileAuth(self.config_path)
+                    if self._profile_auth.list_configured_servers():
+                        print("🔐 Using Databricks profile authentication")
+            return self._profile_auth
+    
+    def _token_from_profile(self, server_name: str, server_config: Dict[str, Any]) -> Optional[str]:
+        """Credential provider: Databricks CLI profile mapped in the config."""
+        if not server_config.get('profile'):
+            return None
+        
+        profile_auth = self._get_profile_auth()
+        if not profile_auth or server_name not in profile_auth.list_configured_servers():
+            return None
+        
+        token = profile_auth.get_token_for_server(server_name)
+        if token:
+            print(f"🔐 Using profile authentication for: {server_name}")
+        return token
+    
+    def _token_from_env(self, server_name: str, server_config: Dict[str, Any]) -> Optional[str]:
+        """Credential provider: MCP_<SERVER_NAME>_TOKEN environment variable."""
+        env_token_name = f"MCP_{server_name.upper().replace('-', '_')}_TOKEN"
+        token = getenv(env_token_name)
+        if token:
+            print(f"🔐 Using token from environment variable: {env_token_name}")
+        return token
+    
+    def _token_from_config(self, server_name: str, server_config: Dict[str, Any]) -> Optional[str]:
+        """Credential provider: Authorization header in the config file."""
+        auth_header = server_config.get('headers', {}).get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return None
+        
+        token = auth_header.replace('Bearer ', '', 1)
+        if token.startswith('${'):
+            print(f"⚠️  Token placeholder {token} found for {server_name}, but it could not be resolved")
+            return None
+        
+        print(f"🔐 Using token from config file for: {server_name}")
+        return token
+    
+    def _resolve_token(self, server_name: str) -> Optional[str]:
+        """
+        Resolve the token for a server, trying each credential provider in order.
+        
+        Tokens from the environment or the config file are memoized per server.
+        Profile tokens can expire, so they are looked up again through the
+        profile token cache after PROFILE_TOKEN_RECHECK seconds. Failed lookups
+        are not memoized and are retried on the next request.
+        
+        Args:
+            server_name: Name of the server from config
+            
+        Returns:
+            Token if any provider supplied one, None otherwise
+        """
+        now = time.monotonic()
+        cached = self._tokens.get(server_name)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        server_config = self.server_configs[server_name]
+        token = None
+        with span("auth.resolve_token", server=server_name):
+            for provider in (self._token_from_profile, self._token_from_env, self._token_from_config):
+                token = provider(server_name, server_config)
+                if token:
+                    set_attributes(provider=provider.__name__[len('_token_from_'):])
+                    break
+        
+        if not token:
+            print(f"❌ No authentication token found for: {server_name}")
+            self._tokens.pop(server_name, None)
+            return None
+        
+        recheck_at = now + PROFILE_TOKEN_RECHECK if provider == self._token_from_profile else float('inf')
+        self._tokens[server_name] = (token, recheck_at)
+        return token
+    
+    def _server_tokens(self, server_name: str) -> Tuple[Tuple[Optional[str], ...], float]:
+        """
+        Resolve the current tokens of a server's endpoints.
+        
+        Returns:
+            Tuple of (token per endpoint, monotonic time at which to check them again)
+        """
+        server_config = self.server_configs[server_name]
+        endpoints = endpoint_configs(server_config)
+        if len(endpoints) > 1:
+            tokens = tuple(self._resolve_endpoint_token(server_name, endpoint) for endpoint in endpoints)
+        else:
+            tokens = (self._resolve_token(server_name),)
+        
+        uses_profile = server_config.get('profile') or any(endpoint.get('profile') for endpoint in endpoints)
+        return tokens, time.monotonic() + PROFILE_TOKEN_RECHECK if uses_profile else float('inf')
+    
+    def get_client(self, server_name: str) -> Optional[MCPClient]:
+        """
+        Get an MCP client by server name, resolving its credentials on first use.
+        
+        Clients of servers authenticated through a Databricks profile check
+        their token every PROFILE_TOKEN_RECHECK seconds and are replaced by a
+        client with the new token once it has been refreshed.
+        
+        Args:
+            server_name: Name of the server from config
+            
+        Returns:
+            MCPClient instance if found and authenticated, None otherwise
+        """
+        client = self.clients.get(server_name)
+        checked = self._client_tokens.get(server_name)
+        if client is not None and checked is not None and checked[1] > time.monotonic():
+            return client
+        if server_name not in self.server_configs:
+            return client
+        
+        with self._server_locks[server_name]:
+            client = self.clients.get(server_name)
+            checked = self._client_tokens.get(server_name)
+            if client is not None and checked is not None:
+                if checked[1] > time.monotonic():
+                    return client
+                tokens, recheck_at = self._server_tokens(server_name)
+                if tokens == checked[0]:
+                    self._client_tokens[server_name] = (tokens, recheck_at)
+                    return client
+                print(f"🔄 Token changed for {server_name}; reconnecting")
+                self._close_client(self.clients.pop(server_name))
+            
+            endpoints = endpoint_configs(self.server_configs[server_name])
+            if len(endpoints) > 1:
+                client = self._create_multi_endpoint_client(server_name, endpoints)
+            else:
+                token = self._resolve_token(server_name)
                 if not token:
-                    auth_header = server_config['headers']['Authorization']
-                    if auth_header.startswith('Bearer '):
-                        token = auth_header.replace('Bearer ', '')
-                        print(f"🔐 Using token from config file for: {server_name}")
-                    elif auth_header == 'Bearer ${PROFILE_TOKEN}':
-                        print(f"⚠️  Profile token placeholder found for {server_name}, but no profile configured")
-                        continue
+                    return None
                 
-                if not token:
-                    print(f"❌ No authentication token found for: {server_name}")
-                    continue
+                url = endpoints[0]['url']
                 
                 # Extract hostname from URL
                 workspace_hostname = url.split('/')[2]  # e.g., "e2-demo-field-eng.cloud.databricks.com"
                 
-                client = MCPClient(workspace_hostname, token, url)
+                client = self._create_client(server_name, workspace_hostname, token, url)
+            
+            if client is not None:
                 self.clients[server_name] = client
-                
+                self._client_tokens[server_name] = self._server_tokens(server_name)
+            return client
+    
+    def _close_client(self, client: MCPClient):
+        """Close a client the manager no longer hands out (overridden by AsyncMCPClientManager)."""
+        try:
+            client.close()
         except Exception as e:
-            raise Exception(f"Error loading MCP config: {e}")
+            print(f"⚠️  Error closing client for {client.server_name}: {e}")
     
-    def get_client(self, server_name: str) -> Optional[MCPClient]:
+    def _resolve_endpoint_token(self, server_name: str, endpoint: Dict[str, Any]) -> Optional[str]:
         """
-        Get an MCP client by server name.
+        Resolve the token for one endpoint of a multi-endpoint server.
+        
+        Endpoints use the server's credentials unless they name their own
+        profile (e.g. a mirror in another workspace) or Authorization header.
+        """
+        profile = endpoint.get('profile')
+        if profile and profile != self.server_configs[server_name].get('profile'):
+            profile_auth = self._get_profile_auth()
+            token = profile_auth.profile_auth.get_token_from_profile(profile) if profile_auth else None
+            if not token:
+                print(f"❌ No token for profile '{profile}' of {server_name} endpoint {endpoint['url']}")
+            return token
+        
+        if endpoint.get('headers'):
+            return self._token_from_config(server_name, endpoint)
+        
+        return self._resolve_token(server_name)
+    
+    def _create_multi_endpoint_client(self, server_name: str,
+                                      endpoints: List[Dict[str, Any]]) -> Optional[MCPClient]:
+        """
+        Create a MultiEndpointClient routing over a server's endpoints.
+        
+        Endpoints without credentials are left out.
         
-        Args:
-            server_name: Name of the server from config
-            
         Returns:
-            MCPClient instance if found, None otherwise
+            The client, or None if no endpoint has a token
         """
-        return self.clients.get(server_name)
+        clients, stats = [], []
+        for index, endpoint in enumerate(endpoints):
+            token = self._resolve_endpoint_token(server_name, endpoint)
+            if not token:
+                continue
+            
+            label = endpoint_label(server_name, index, len(endpoints))
+            url = endpoint['url']
+            clients.append(self._create_client(label, url.split('/')[2], token, url))
+            stats.append(self.endpoint_stats[label])
+        
+        if not clients:
+            return None
+        
+        return MultiEndpointClient(clients, server_name, stats=stats, result_cache=self.result_cache,
+                                   registry=self.registry, retry_policy=self.retry_policy,
+                                   validate=self.validate_parameters)
+    
+    def _create_client(self, server_name: str, workspace_hostname: str, token: str, url: str) -> MCPClient:
+        """Create the client object for a server (overridden by AsyncMCPClientManager)."""
+        return MCPClient(
+            workspace_hostname, token, url,
+            tool_cache=self.tool_cache,
+            tool_cache_mode=self.tool_cache_mode,
+            result_cache=self.result_cache,
+            session_pool=self.session_pool,
+            registry=self.registry,
+            server_name=server_name,
+            retry_policy=self.retry_policy,
+            hedger=self.hedger,
+            health=self.health.get(server_name),
+            validate=self.validate_parameters
+        )
     
     def list_servers(self) -> List[str]:
         """
-        Get list of available server names.
+        Get list of configured server names.
         
         Returns:
             List of server names
         """
-        return list(self.clients.keys())
+        return list(self.server_configs.keys())
     
     def initialize_client(self, server_name: str) -> bool:
         """
@@ -316,23 +1364,112 @@ class MCPClientManager:
         
         return client.initialize()
     
+    def invalidate_tool_cache(self, server_name: Optional[str] = None) -> int:
+        """
+        Drop cached tool catalogs.
+        
+        Args:
+            server_name: Server to invalidate, or None for every cached server
+        
+        Returns:
+            Number of cache entries removed
+        """
+        tool_cache = self.tool_cache or ToolCatalogCache()
+        if server_name is None:
+            return tool_cache.invalidate()
+        
+        server_config = self.server_configs.get(server_name)
+        if not server_config:
+            print(f"❌ Server '{server_name}' not found")
+            return 0
+        return sum(tool_cache.invalidate(endpoint['url']) for endpoint in endpoint_configs(server_config))
+    
+    def probe_servers(self, max_workers: int = 8) -> Dict[str, bool]:
+        """
+        Probe every configured server concurrently (see MCPClient.probe).
+        
+        Args:
+            max_workers: Maximum servers probed at once
+        
+        Returns:
+            Mapping of server name to whether it answered
+        """
+        def probe(server_name: str) -> bool:
+            client = self.get_client(server_name)
+            return client is not None and client.probe()
+        
+        names = self.list_servers()
+        if not names:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+            results = executor.map(propagate_context(probe), names)
+            return dict(zip(names, results))
+    
+    def health_summary(self) -> List[Dict[str, Any]]:
+        """
+        Summarize the health of every configured server endpoint.
+        
+        Returns:
+            One ServerHealth.summary() dict per endpoint, in config order; endpoints of
+            multi-endpoint servers also carry their routing stats under "routing"
+        """
+        summaries = []
+        for label, health in self.health.items():
+            summary = health.summary()
+            if label in self.endpoint_stats:
+                summary['routing'] = self.endpoint_stats[label].to_dict()
+            summaries.append(summary)
+        return summaries
+    
+    def resolve_tool(self, tool_name: str) -> Optional[ToolMatch]:
+        """
+        Find a tool across every initialized server.
+        
+        Args:
+            tool_name: Tool name, or "server/tool" when several servers share it
+        
+        Returns:
+            ToolMatch with the owning server, or None if no initialized server has the tool
+        
+        Raises:
+            ToolCollisionError: If an unqualified name exists on several servers
+        """
+        return self.registry.resolve(tool_name)
+    
+    def close(self):
+        """Close pooled sessions and connections and the hedging executor."""
+        self.session_pool.close()
+        if self.hedger is not None:
+            self.hedger.close()
+    
     def display_servers(self):
         """Display available servers."""
-        print(f"\n🌐 Available MCP Servers ({len(self.clients)} found)")
+        print(f"\n🌐 Available MCP Servers ({len(self.server_configs)} found)")
         print("=" * 50)
         
-        for i, server_name in enumerate(self.clients.keys(), 1):
-            print(f"{i}. {server_name}")
+        for i, (server_name, server_config) in enumerate(self.server_configs.items(), 1):
+            endpoints = endpoint_configs(server_config)
+            if len(endpoints) > 1:
+                print(f"{i}. {server_name} ({len(endpoints)} endpoints)")
+            else:
+                print(f"{i}. {server_name}")
         print()
 
 
-def display_results(result: Any, max_content_length: int = 200):
+def display_results(result: Any, max_content_length: int = 200,
+                    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+                    max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
     """
     Display tool execution results in a formatted way.
     
+    Rows are decoded and printed as they are parsed, so large payloads are
+    never loaded or printed in full (see mcp_render).
+    
     Args:
         result: Tool execution result
         max_content_length: Maximum length for content display
+        max_rows: Maximum number of rows to print (None for unlimited)
+        max_bytes: Maximum bytes of each JSON payload to read (None for unlimited)
     """
     if not result:
         print("❌ No results returned")
@@ -341,48 +1478,22 @@ def display_results(result: Any, max_content_length: int = 200):
     print(f"\n📊 Results")
     print("=" * 50)
     
+    rows = iter_result_rows(result, max_rows=max_rows, max_bytes=max_bytes)
     try:
-        # Handle different result types
-        if hasattr(result, 'content'):
-            content = result.content
-        else:
-            content = result
-        
-        # Try to parse as JSON
-        if isinstance(content, str):
-            try:
-                data = json.loads(content)
-            except json.JSONDecodeError:
-                print(f"Raw content: {content[:max_content_length]}...")
-                return
-        else:
-            data = content
-        
-        # Handle TextContent objects
-        if hasattr(data, 'text'):
-            try:
-                data = json.loads(data.text)
-            except (json.JSONDecodeError, AttributeError):
-                data = str(data)
-        
-        # Handle different data structures
-        if isinstance(data, list):
-            print(f"Found {len(data)} results:")
-            for i, item in enumerate(data, 1):
-                if isinstance(item, dict):
-                    print(f"\n{i}. {item.get('title', 'No title')}")
-                    print(f"   URL: {item.get('url', 'No URL')}")
-                    content_preview = item.get('content', 'No content')[:max_content_length]
-                    print(f"   Content: {content_preview}...")
-                else:
-                    print(f"\n{i}. {str(item)[:max_content_length]}...")
-                print("-" * 30)
-        else:
-            print(f"Result: {json.dumps(data, indent=2)}")
-            
+        with span("result.render"):
+            for index, row in enumerate(rows, 1):
+                render_row(index, row, max_content_length)
+            record_span("result.decode", rows.decode_time, rows=rows.rows, bytes=rows.bytes_read)
     except Exception as e:
         print(f"Error displaying results: {e}")
-        print(f"Raw result: {result}")
+        return
+    
+    if rows.malformed:
+        print(f"⚠️  Result is not valid JSON past the first {rows.rows} results; the rest was skipped")
+    elif rows.truncated:
+        print(f"Showing the first {rows.rows} results (output truncated)")
+    else:
+        print(f"Found {rows.rows} results")
 
 
 def main():
@@ -0,0 +1,311 @@
+"""
+Parsed configuration snapshots
+
+mcp.json and ~/.databrickscfg are each parsed once per process and shared as
+immutable snapshots by MCPClientManager and the profile authentication
+helpers. A snapshot remembers the file's mtime and size; loading the same
+file again returns the cached snapshot until either changes, so long-running
+processes (the daemon, interactive mode) pick up edits by simply asking for
+the current snapshot before each command.
+
+A file modified within RACY_WINDOW_NS of being read could be rewritten
+again within the same mtime tick without changing size, so such snapshots
+are re-read and compared by content digest until the window has passed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from mcp_routing import endpoint_configs
+from mcp_tracing import span
+
+# Default location of the Databricks CLI profiles
+DATABRICKS_CFG_PATH = Path.home() / '.databrickscfg'
+
+# Profile keys kept from ~/.databrickscfg
+PROFILE_KEYS = ('host', 'token', 'username', 'password', 'auth_type')
+
+# Files modified this recently before being read are verified by content
+# (covers filesystems with coarse timestamps)
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class ConfigError(ValueError):
+    """Raised when mcp.json is not a valid MCP configuration."""
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    """Return (mtime_ns, size) of a file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _may_have_changed(path: str, mtime_ns: int, size: int, read_at_ns: int) -> bool:
+    """
+    Check a file against the signature it was read with.
+    
+    Returns:
+        True if the signature differs, the file is gone, or the file was
+        modified so shortly before being read that the signature is not
+        conclusive (the caller then compares content digests)
+    """
+    try:
+        if _file_signature(path) != (mtime_ns, size):
+            return True
+    except OSError:
+        return True
+    return read_at_ns - mtime_ns < RACY_WINDOW_NS
+
+
+def _read_file(path: str) -> Tuple[bytes, str, int]:
+    """Read a file; returns its bytes, their SHA-256 and the read time in ns."""
+    read_at_ns = time.time_ns()
+    with open(path, 'rb') as f:
+        content = f.read()
+    return content, hashlib.sha256(content).hexdigest(), read_at_ns
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Validated, read-only view of one version of mcp.json.
+    
+    Attributes:
+        path: Absolute path of the file
+        mtime_ns: Modification time the snapshot was parsed at
+        size: File size the snapshot was parsed at
+        servers: mcpServers entries (deeply read-only)
+        tools: Discovered tool catalog written by mcp_discovery (read-only view)
+        server_profiles: Databricks CLI profile mapped to each server that has one
+        discovery: Per-server discovery state written by mcp_discovery (read-only view)
+        digest: SHA-256 of the file content
+        read_at_ns: When the file was read
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    servers: Mapping[str, Mapping[str, Any]]
+    tools: Mapping[str, Any]
+    server_profiles: Mapping[str, str]
+    discovery: Mapping[str, Any]
+    digest: str = ''
+    read_at_ns: int = 0
+    
+    def is_stale(self) -> bool:
+        """Check whether the file may have changed (or disappeared) since the snapshot was taken."""
+        return _may_have_changed(self.path, self.mtime_ns, self.size, self.read_at_ns)
+    
+    def endpoints(self, server_name: str) -> list:
+        """Endpoints of a server (see mcp_routing.endpoint_configs)."""
+        return endpoint_configs(self.servers[server_name])
+
+
+def parse_config(path: str, data: Dict[str, Any], signature: Tuple[int, int],
+                 digest: str = '', read_at_ns: int = 0) -> ConfigSnapshot:
+    """
+    Validate parsed mcp.json content and build a snapshot.
+    
+    Args:
+        path: Absolute path of the file
+        data: Parsed JSON
+        signature: (mtime_ns, size) of the file that was parsed
+        digest: SHA-256 of the file content
+        read_at_ns: When the file was read
+    
+    Returns:
+        ConfigSnapshot
+    
+    Raises:
+        ConfigError: If the structure is invalid
+    """
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: expected a JSON object")
+    
+    servers = data.get('mcpServers', {})
+    if not isinstance(servers, dict):
+        raise ConfigError(f"{path}: 'mcpServers' must be an object")
+    
+    for name, server_config in servers.items():
+        if not isinstance(server_config, dict):
+            raise ConfigError(f"{path}: server '{name}' must be an object")
+        try:
+            endpoints = endpoint_configs(server_config)
+        except (ValueError, TypeError) as e:
+            raise ConfigError(f"{path}: server '{name}': {e}")
+        if not endpoints:
+            raise ConfigError(f"{path}: server '{name}' has no url")
+    
+    tools = data.get('tools', {})
+    if not isinstance(tools, dict):
+        raise ConfigError(f"{path}: 'tools' must be an object")
+    
+    discovery = data.get('discovery', {})
+    if not isinstance(discovery, dict):
+        raise ConfigError(f"{path}: 'discovery' must be an object")
+    
+    profiles = {name: cfg['profile'] for name, cfg in servers.items() if cfg.get('profile')}
+    return ConfigSnapshot(
+        path=path,
+        mtime_ns=signature[0],
+        size=signature[1],
+        servers=_freeze(servers),
+        # The tool catalog can be large and is only read by discovery; it is not deep-copied
+        tools=MappingProxyType(tools),
+        server_profiles=MappingProxyType(profiles),
+        discovery=_freeze(discovery),
+        digest=digest,
+        read_at_ns=read_at_ns
+    )
+
+
+_snapshots: Dict[str, ConfigSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def load_config(config_path: str) -> ConfigSnapshot:
+    """
+    Get the current snapshot of an mcp.json file.
+    
+    The file is only re-read when its mtime or size changed since the
+    cached snapshot was taken (or it was modified just before being read).
+    If its content turns out to be unchanged, the cached snapshot's data
+    is reused.
+    
+    Args:
+        config_path: Path to mcp.json
+    
+    Returns:
+        ConfigSnapshot
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ConfigError: If the file is not valid JSON or not a valid configuration
+    """
+    path = os.path.abspath(config_path)
+    
+    with _snapshots_lock:
+        cached = _snapshots.get(path)
+    if cached is not None and not cached.is_stale():
+        return cached
+    
+    with span("config.load", path=path):
+        # The signature taken before reading: if the file changes while it is read,
+        # the next load sees a different signature and parses it again
+        signature = _file_signature(path)
+        content, digest, read_at_ns = _read_file(path)
+        if cached is not None and cached.digest == digest:
+            snapshot = replace(cached, mtime_ns=signature[0], size=signature[1], read_at_ns=read_at_ns)
+        else:
+            try:
+                data = json.loads(content)
+            except ValueError as e:
+                raise ConfigError(f"{path}: invalid JSON: {e}")
+            snapshot = parse_config(path, data, signature, digest, read_at_ns)
+    
+    with _snapshots_lock:
+        _snapshots[path] = snapshot
+    return snapshot
+
+
+@dataclass(frozen=True)
+class ProfilesSnapshot:
+    """
+    Read-only view of one version of ~/.databrickscfg.
+    
+    Attributes:
+        path: Absolute path of the file
+        mtime_ns: Modification time the snapshot was parsed at
+        size: File size the snapshot was parsed at
+        profiles: Profile name to its settings (host, token, username, password, auth_type)
+        digest: SHA-256 of the file content
+        read_at_ns: When the file was read
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    profiles: Mapping[str, Mapping[str, str]]
+    digest: str = ''
+    read_at_ns: int = 0
+    
+    def is_stale(self) -> bool:
+        return _may_have_changed(self.path, self.mtime_ns, self.size, self.read_at_ns)
+
+
+def parse_databricks_cfg(text: str) -> Dict[str, Dict[str, str]]:
+    """
+    Parse the INI-style ~/.databrickscfg format.
+    
+    Args:
+        text: File content
+    
+    Returns:
+        Profile name to the PROFILE_KEYS it sets
+    """
+    profiles: Dict[str, Dict[str, str]] = {}
+    current_profile = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('[') and line.endswith(']'):
+            current_profile = line[1:-1]
+            profiles[current_profile] = {}
+        elif '=' in line and current_profile:
+            key, value = line.split('=', 1)
+            key = key.strip()
+            if key in PROFILE_KEYS:
+                profiles[current_profile][key] = value.strip()
+    return profiles
+
+
+_profile_snapshots: Dict[str, ProfilesSnapshot] = {}
+
+
+def load_databricks_profiles(cfg_path: Optional[Path] = None) -> ProfilesSnapshot:
+    """
+    Get the current snapshot of ~/.databrickscfg, re-reading it only when it changed.
+    
+    Args:
+        cfg_path: Profiles file (default: ~/.databrickscfg)
+    
+    Returns:
+        ProfilesSnapshot
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    path = os.path.abspath(str(cfg_path or DATABRICKS_CFG_PATH))
+    
+    with _snapshots_lock:
+        cached = _profile_snapshots.get(path)
+    if cached is not None and not cached.is_stale():
+        return cached
+    
+    signature = _file_signature(path)
+    content, digest, read_at_ns = _read_file(path)
+    if cached is not None and cached.digest == digest:
+        snapshot = replace(cached, mtime_ns=signature[0], size=signature[1], read_at_ns=read_at_ns)
+    else:
+        profiles = parse_databricks_cfg(content.decode('utf-8'))
+        snapshot = ProfilesSnapshot(path, signature[0], signature[1],
+                                    MappingProxyType({name: MappingProxyType(settings)
+                                                      for name, settings in profiles.items()}),
+                                    digest, read_at_ns)
+    
+    with _snapshots_lock:
+        _profile_snapshots[path] = snapshot
+    return snapshot
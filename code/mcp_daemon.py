@@ -0,0 +1,380 @@
+"""
+Background daemon for the MCP CLI
+
+The daemon keeps initialized MCP clients, pooled sessions and caches warm
+behind a local Unix socket so that each CLI invocation only pays for the
+tool call itself.
+
+Protocol (newline-delimited JSON over the socket):
+    request:   {"argv": [...], "cwd": "...", "env": {...}}  or  {"action": "stop" | "status"}
+    responses: {"stream": "stdout" | "stderr", "data": "..."} frames followed
+               by a final {"exit": <code>} (or {"status": {...}} for status)
+
+"env" carries the caller's forwarded variables (see mcp_env), so a command
+uses the same credentials and cache directory as it would in-process.
+"""
+
+import contextvars
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_cache import get_cache_dir
+from mcp_env import forwarded_env
+
+# Unix domain sockets are not available on every platform
+DAEMON_AVAILABLE = hasattr(socket, 'AF_UNIX')
+
+# Shut the daemon down after this many idle seconds (0 keeps it running)
+DEFAULT_IDLE_TIMEOUT = 1800.0
+
+# Handler that runs one CLI invocation (argv, cwd, forwarded env) and returns its exit code
+CommandHandler = Callable[[List[str], str, Optional[Dict[str, str]]], int]
+
+
+def get_socket_path() -> Path:
+    """Return the daemon socket path (MCP_DAEMON_SOCKET or the cache directory)."""
+    path = os.getenv('MCP_DAEMON_SOCKET')
+    if path:
+        return Path(path).expanduser()
+    return get_cache_dir() / 'daemon.sock'
+
+
+def _send_frame(conn: socket.socket, frame: Dict[str, Any]):
+    conn.sendall((json.dumps(frame) + '\n').encode('utf-8'))
+
+
+class _SocketWriter:
+    """Text stream that forwards complete lines to a client as NDJSON frames."""
+    
+    def __init__(self, conn: socket.socket, stream: str, send_lock: threading.Lock):
+        self.conn = conn
+        self.stream = stream
+        self.send_lock = send_lock
+        self.encoding = 'utf-8'
+        self._buffer = ''
+    
+    def write(self, data: str) -> int:
+        self._buffer += data
+        if '\n' in self._buffer:
+            head, _, self._buffer = self._buffer.rpartition('\n')
+            self._send(head + '\n')
+        return len(data)
+    
+    def flush(self):
+        if self._buffer:
+            data, self._buffer = self._buffer, ''
+            self._send(data)
+    
+    def isatty(self) -> bool:
+        return False
+    
+    def _send(self, data: str):
+        try:
+            with self.send_lock:
+                _send_frame(self.conn, {'stream': self.stream, 'data': data})
+        except OSError:
+            # Client went away; keep running the command to completion
+            pass
+
+
+class ThreadLocalStream:
+    """
+    Replacement for sys.stdout/sys.stderr that writes to a per-request target.
+    
+    Each request thread redirects its own output to the requesting client.
+    The target is a context variable, so worker threads started through
+    mcp_tracing.propagate_context write to the same client; every other
+    thread keeps writing to the daemon's original stream.
+    """
+    
+    def __init__(self, default):
+        self._default = default
+        self._target_var: contextvars.ContextVar = contextvars.ContextVar('mcp_stream_target', default=None)
+    
+    def _target(self):
+        return self._target_var.get() or self._default
+    
+    def redirect(self, target):
+        """Send this request's output to target (None restores the default)."""
+        self._target_var.set(target)
+    
+    def current(self):
+        """Return the stream this thread is currently writing to."""
+        return self._target()
+    
+    def write(self, data: str) -> int:
+        return self._target().write(data)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+
+def _read_line(conn: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one NDJSON message from a socket."""
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    if not data.strip():
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+class MCPDaemon:
+    """Threaded Unix socket server that runs CLI commands in-process."""
+    
+    def __init__(self, handler: CommandHandler, socket_path: Optional[Path] = None,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """
+        Initialize the daemon.
+        
+        Args:
+            handler: Callable running one CLI invocation (argv, cwd, env) -> exit code
+            socket_path: Socket to listen on (default: get_socket_path())
+            idle_timeout: Seconds without requests before shutting down (0 disables)
+        """
+        self.handler = handler
+        self.socket_path = Path(socket_path) if socket_path else get_socket_path()
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stdout = ThreadLocalStream(sys.stdout)
+        self._stderr = ThreadLocalStream(sys.stderr)
+    
+    def serve_forever(self) -> int:
+        """
+        Listen for requests until stopped or idle.
+        
+        Returns:
+            Process exit code
+        """
+        if not DAEMON_AVAILABLE:
+            print("❌ Unix domain sockets are not available on this platform")
+            return 1
+        
+        if is_daemon_running(self.socket_path):
+            print(f"⚠️  Daemon already running on {self.socket_path}")
+            return 1
+        
+        # Remove a stale socket left behind by a crashed daemon
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Create the socket owner-only; chmod after bind would leave a window with default permissions
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(1.0)
+        
+        sys.stdout, sys.stderr = self._stdout, self._stderr
+        print(f"🟢 MCP daemon listening on {self.socket_path} (pid {os.getpid()})")
+        
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    if self._idle_expired():
+                        print(f"💤 Idle for {self.idle_timeout:.0f}s, shutting down")
+                        break
+                    continue
+                
+                with self._lock:
+                    self._active += 1
+                    self._last_activity = time.monotonic()
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            sys.stdout, sys.stderr = self._stdout._default, self._stderr._default
+            print("🛑 MCP daemon stopped")
+        return 0
+    
+    def stop(self):
+        """Ask the accept loop to exit."""
+        self._stopping.set()
+    
+    def status(self) -> Dict[str, Any]:
+        """Return a summary of the daemon state."""
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'socket': str(self.socket_path),
+                'uptime': time.time() - self.started_at,
+                'requests_served': self.requests_served,
+                'active_requests': self._active,
+            }
+    
+    def _idle_expired(self) -> bool:
+        if self.idle_timeout <= 0:
+            return False
+        with self._lock:
+            return self._active == 0 and time.monotonic() - self._last_activity > self.idle_timeout
+    
+    def _handle_connection(self, conn: socket.socket):
+        send_lock = threading.Lock()
+        try:
+            request = _read_line(conn)
+            if not request:
+                return
+            
+            action = request.get('action')
+            if action == 'stop':
+                self.stop()
+                _send_frame(conn, {'exit': 0})
+            elif action == 'status':
+                status = self.status()
+                status['active_requests'] -= 1  # not counting this status request
+                _send_frame(conn, {'status': status})
+            else:
+                exit_code = self._run_command(conn, send_lock, request.get('argv', []),
+                                              request.get('cwd', os.getcwd()), request.get('env'))
+                with send_lock:
+                    _send_frame(conn, {'exit': exit_code})
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Daemon request failed: {e}")
+        finally:
+            conn.close()
+            with self._lock:
+                self._active -= 1
+                self.requests_served += 1
+                self._last_activity = time.monotonic()
+    
+    def _run_command(self, conn: socket.socket, send_lock: threading.Lock,
+                     argv: List[str], cwd: str, env: Optional[Dict[str, str]]) -> int:
+        stdout = _SocketWriter(conn, 'stdout', send_lock)
+        stderr = _SocketWriter(conn, 'stderr', send_lock)
+        self._stdout.redirect(stdout)
+        self._stderr.redirect(stderr)
+        try:
+            return self.handler(argv, cwd, env)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return 1
+        finally:
+            stdout.flush()
+            stderr.flush()
+            self._stdout.redirect(None)
+            self._stderr.redirect(None)
+
+
+def _connect(socket_path: Optional[Path] = None) -> Optional[socket.socket]:
+    """Connect to a running daemon, or return None if none is listening."""
+    if not DAEMON_AVAILABLE:
+        return None
+    
+    path = Path(socket_path) if socket_path else get_socket_path()
+    if not path.exists():
+        return None
+    
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(path))
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def is_daemon_running(socket_path: Optional[Path] = None) -> bool:
+    """Check whether a daemon is accepting connections."""
+    conn = _connect(socket_path)
+    if conn is None:
+        return False
+    conn.close()
+    return True
+
+
+def _iter_frames(conn: socket.socket):
+    """Yield NDJSON frames sent by the daemon until the connection closes."""
+    buffer = b''
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buffer += chunk
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            if line.strip():
+                yield json.loads(line.decode('utf-8'))
+
+
+def run_via_daemon(argv: List[str], cwd: str, socket_path: Optional[Path] = None) -> Optional[int]:
+    """
+    Run a CLI invocation in the daemon, streaming its output locally.
+    
+    Args:
+        argv: CLI arguments (without the program name)
+        cwd: Working directory the command should resolve paths against
+        socket_path: Daemon socket (default: get_socket_path())
+    
+    Returns:
+        The command's exit code, or None when no daemon is running
+    """
+    conn = _connect(socket_path)
+    if conn is None:
+        return None
+    
+    try:
+        _send_frame(conn, {'argv': argv, 'cwd': cwd, 'env': forwarded_env()})
+        for frame in _iter_frames(conn):
+            if 'exit' in frame:
+                return frame['exit']
+            stream = sys.stderr if frame.get('stream') == 'stderr' else sys.stdout
+            stream.write(frame.get('data', ''))
+            stream.flush()
+    except (OSError, ValueError) as e:
+        print(f"❌ Lost connection to MCP daemon: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    
+    # The command may have had side effects, so do not silently re-run it
+    print("❌ MCP daemon closed the connection before the command finished", file=sys.stderr)
+    return 1
+
+
+def send_control(action: str, socket_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send a control request ("stop" or "status") to the daemon.
+    
+    Returns:
+        The daemon's reply, or None when no daemon is running
+    """
+    conn = _connect(socket_path)
+    if conn is None:
+        return None
+    
+    try:
+        _send_frame(conn, {'action': action})
+        for frame in _iter_frames(conn):
+            return frame
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+    return None
@@ -4,13 +4,213 @@ MCP Tool Discovery Script
 
 This script discovers all available tools from MCP servers and updates the mcp.json
 configuration file with tool information, schemas, and descriptions.
+
+Discovery is incremental: mcp.json keeps a "discovery" section with a hash of
+each server's config entry and tool list, and a server is only queried again
+when its entry changed or its tools are older than the discovery TTL.
 """
 
+import hashlib
 import json
 import os
+import queue
+import stat
 import sys
-from typing import Dict, List, Any
-from mcp_client import MCPClientManager
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Mapping, Optional, Tuple
+from mcp_cache import atomic_write_json, file_lock
+from mcp_client import MCPClientManager, ToolInfo, TOOL_CACHE_REFRESH
+from mcp_config import ConfigSnapshot, parse_config
+from mcp_registry import (ToolRegistry, ToolCollisionError, COLLISION_POLICIES, COLLISION_QUALIFY,
+                          QUALIFIED_NAME_SEPARATOR)
+from mcp_tracing import span, set_attributes, propagate_context
+
+# Discovery concurrency and timeouts
+DEFAULT_DISCOVERY_WORKERS = 8
+DEFAULT_SERVER_TIMEOUT = 60.0
+DEFAULT_SLOW_THRESHOLD = 10.0
+
+# Servers whose config entry is unchanged are queried again after this many seconds
+DEFAULT_DISCOVERY_TTL = 24 * 3600.0
+
+# Per-server discovery outcomes
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_CACHED = "cached"    # Tools reused from the previous discovery
+
+
+@dataclass
+class ServerDiscoveryResult:
+    """Outcome of discovering the tools of a single server."""
+    server_name: str
+    status: str
+    duration: float
+    tools: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class ToolDiff:
+    """Tools added, removed and changed (description or schema) on one server."""
+    server_name: str
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+    
+    def summary(self) -> str:
+        return f"+{len(self.added)} added, -{len(self.removed)} removed, ~{len(self.changed)} changed"
+
+
+@dataclass
+class DiscoveryRun:
+    """Outcome of a discovery run, ready to be written with update_mcp_config."""
+    catalog: Dict[str, Any]
+    state: Dict[str, Any]
+    results: List[ServerDiscoveryResult]
+    diffs: List[ToolDiff]
+
+
+def _stable_hash(value: Any) -> str:
+    """SHA-256 of a JSON value, independent of key order."""
+    # Config snapshots hold read-only mappings; they serialize like dicts
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=dict)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def server_config_hash(server_config: Any) -> str:
+    """Hash of a server's mcp.json entry, used to notice when it changed."""
+    return _stable_hash(server_config)
+
+
+def tool_list_hash(tools: Dict[str, Any]) -> str:
+    """Hash of a server's tool names, descriptions and input schemas."""
+    return _stable_hash({
+        name: {"description": info.get("description"), "input_schema": info.get("input_schema")}
+        for name, info in tools.items()
+    })
+
+
+def diff_tools(server_name: str, old: Dict[str, Any], new: Dict[str, Any]) -> ToolDiff:
+    """
+    Compare two tool lists of the same server.
+    
+    Args:
+        server_name: Server the tools belong to
+        old: Previously discovered tools (name -> info)
+        new: Newly discovered tools (name -> info)
+        
+    Returns:
+        ToolDiff with sorted tool names
+    """
+    def signature(info: Dict[str, Any]) -> Tuple[Any, str]:
+        return info.get("description"), _stable_hash(info.get("input_schema"))
+    
+    return ToolDiff(
+        server_name,
+        added=sorted(set(new) - set(old)),
+        removed=sorted(set(old) - set(new)),
+        changed=sorted(name for name in set(old) & set(new) if signature(old[name]) != signature(new[name]))
+    )
+
+
+def _catalog_tools(catalog: Mapping[str, Any], server_name: str) -> Dict[str, Any]:
+    """Tools of a server in a tools section or catalog, keyed by their unqualified name."""
+    prefix = f"{server_name}{QUALIFIED_NAME_SEPARATOR}"
+    tools = {}
+    for exposed, info in catalog.items():
+        if not isinstance(info, dict) or info.get("server") != server_name:
+            continue
+        name = exposed[len(prefix):] if exposed.startswith(prefix) else exposed
+        tools[name] = {"description": info.get("description"), "input_schema": info.get("input_schema"),
+                       "server": server_name}
+    return tools
+
+
+def cached_server_tools(config: ConfigSnapshot, server_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Tools of a server as recorded by the last discovery.
+    
+    Args:
+        config: Current config snapshot
+        server_name: Name of the server
+        
+    Returns:
+        Tool name -> info, or None if the server has no discovery record or the
+        tools section no longer matches it (e.g. it was edited by hand)
+    """
+    state = config.discovery.get(server_name)
+    if not state:
+        return None
+    
+    catalog = _catalog_tools(config.tools, server_name)
+    names = state.get("tools", ())
+    if any(name not in catalog for name in names):
+        return None
+    tools = {name: catalog[name] for name in names}
+    return tools if tool_list_hash(tools) == state.get("tools_hash") else None
+
+
+def plan_discovery(config: ConfigSnapshot, max_age: float = DEFAULT_DISCOVERY_TTL,
+                   now: Optional[float] = None) -> Tuple[List[str], Dict[str, ServerDiscoveryResult]]:
+    """
+    Decide which servers have to be queried.
+    
+    A server is queried when it has no discovery record, its config entry
+    changed since it was discovered, its record is older than max_age, or its
+    tools are missing from the tools section.
+    
+    Args:
+        config: Current config snapshot
+        max_age: Seconds a discovery record stays valid (0 queries every server)
+        now: Current time (defaults to time.time())
+        
+    Returns:
+        Tuple of (servers to query, reused results of the other servers by name)
+    """
+    now = time.time() if now is None else now
+    stale, reused = [], {}
+    for server_name, server_config in config.servers.items():
+        state = config.discovery.get(server_name) or {}
+        tools = None
+        if (state.get("config_hash") == server_config_hash(server_config)
+                and now - state.get("discovered_at", 0) < max_age):
+            tools = cached_server_tools(config, server_name)
+        
+        if tools is None:
+            stale.append(server_name)
+        else:
+            reused[server_name] = ServerDiscoveryResult(server_name, STATUS_CACHED, 0.0, tools)
+    return stale, reused
+
+
+def _discovery_record(server_config: Any, tools: Dict[str, Any], discovered_at: float) -> Dict[str, Any]:
+    """Discovery section entry for one server."""
+    return {
+        "config_hash": server_config_hash(server_config),
+        "tools_hash": tool_list_hash(tools),
+        "tools": sorted(tools),
+        "discovered_at": int(discovered_at)
+    }
+
+
+def _collect_tool_info(client, server_name: str) -> Dict[str, Any]:
+    """Build the tool information dictionary for an initialized client."""
+    tool_info = {}
+    for tool in client.list_tools():
+        tool_info[tool.name] = {
+            "description": tool.description,
+            "input_schema": tool.input_schema,
+            "server": server_name
+        }
+        print(f"  ✅ Found tool: {tool.name}")
+    return tool_info
 
 
 def discover_tools_for_server(client, server_name: str) -> Dict[str, Any]:
@@ -31,53 +231,258 @@ def discover_tools_for_server(client, server_name: str) -> Dict[str, Any]:
             print(f"❌ Failed to initialize client for {server_name}")
             return {}
         
-        tools = client.list_tools()
-        tool_info = {}
+        return _collect_tool_info(client, server_name)
+        
+    except Exception as e:
+        print(f"❌ Error discovering tools for {server_name}: {e}")
+        return {}
+
+
+def _discover_server(manager: MCPClientManager, server_name: str) -> ServerDiscoveryResult:
+    """
+    Resolve credentials, initialize and list tools for one server.
+    
+    Args:
+        manager: MCPClientManager holding the server configuration
+        server_name: Name of the server
+        
+    Returns:
+        ServerDiscoveryResult describing the outcome
+    """
+    print(f"🔍 Discovering tools for server: {server_name}")
+    start = time.monotonic()
+    
+    def result(status: str, tools: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        return ServerDiscoveryResult(server_name, status, time.monotonic() - start, tools or {}, error)
+    
+    try:
+        client = manager.get_client(server_name)
+        if not client:
+            return result(STATUS_FAILED, error="no authentication token")
         
-        for tool in tools:
-            tool_info[tool.name] = {
-                "description": tool.description,
-                "input_schema": tool.input_schema,
-                "server": server_name
-            }
-            print(f"  ✅ Found tool: {tool.name}")
+        if not client.initialize():
+            return result(STATUS_FAILED, error="initialization failed")
         
-        return tool_info
+        return result(STATUS_OK, tools=_collect_tool_info(client, server_name))
         
     except Exception as e:
         print(f"❌ Error discovering tools for {server_name}: {e}")
-        return {}
+        return result(STATUS_FAILED, error=str(e))
 
 
-def update_mcp_config(config_path: str, discovered_tools: Dict[str, Any]):
+def iter_discover_servers(manager: MCPClientManager, servers: List[str],
+                          max_workers: int = DEFAULT_DISCOVERY_WORKERS,
+                          server_timeout: float = DEFAULT_SERVER_TIMEOUT) -> Iterator[ServerDiscoveryResult]:
+    """
+    Discover tools on several servers concurrently, yielding results as servers finish.
+    
+    At most max_workers servers are contacted at once. A server that has not
+    finished within server_timeout seconds of starting is reported with
+    STATUS_TIMEOUT; its worker is a daemon thread and is abandoned, and its
+    slot goes to the next queued server, so a hung server never blocks the
+    other servers or process exit.
+    
+    Args:
+        manager: MCPClientManager holding the server configuration
+        servers: Names of the servers to discover
+        max_workers: Maximum number of servers discovered at the same time
+        server_timeout: Per-server timeout in seconds, measured from when its discovery starts
+        
+    Yields:
+        ServerDiscoveryResult for every server, in completion order
+    """
+    results: "queue.Queue[ServerDiscoveryResult]" = queue.Queue()
+    queued = list(dict.fromkeys(servers))
+    queued.reverse()
+    # Servers being discovered and when they started; abandoned servers leave this
+    running: Dict[str, float] = {}
+    
+    def worker(server_name: str):
+        with span("discovery.server", server=server_name):
+            outcome = _discover_server(manager, server_name)
+            set_attributes(status=outcome.status)
+        results.put(outcome)
+    
+    while queued or running:
+        # Slots are counted here rather than held by the workers, so a timed-out
+        # server's abandoned thread does not keep the next server from starting
+        while queued and len(running) < max(1, max_workers):
+            server_name = queued.pop()
+            running[server_name] = time.monotonic()
+            threading.Thread(
+                target=propagate_context(worker), args=(server_name,), name=f"mcp-discovery-{server_name}", daemon=True
+            ).start()
+        
+        # Wake up at the earliest per-server deadline
+        wait_for = max(0.0, min(running.values()) + server_timeout - time.monotonic())
+        try:
+            result = results.get(timeout=wait_for)
+            if running.pop(result.server_name, None) is not None:
+                yield result
+        except queue.Empty:
+            pass
+        
+        now = time.monotonic()
+        for name, started_at in list(running.items()):
+            if now - started_at >= server_timeout:
+                del running[name]
+                print(f"⏰ Timed out discovering tools for {name} after {server_timeout:.0f}s")
+                yield ServerDiscoveryResult(name, STATUS_TIMEOUT, now - started_at,
+                                            error=f"timed out after {server_timeout:.0f}s")
+
+
+def display_discovery_summary(results: List[ServerDiscoveryResult],
+                              slow_threshold: float = DEFAULT_SLOW_THRESHOLD):
+    """
+    Display per-server discovery timings, highlighting slow and failed servers.
+    
+    Args:
+        results: Discovery results for all servers
+        slow_threshold: Servers taking longer than this many seconds are flagged as slow
+    """
+    if not results:
+        return
+    
+    ok = [r for r in results if r.status == STATUS_OK]
+    print(f"\n⏱️  Discovery Summary ({len(ok)}/{len(results)} servers succeeded)")
+    print("=" * 60)
+    
+    for result in sorted(results, key=lambda r: r.duration, reverse=True):
+        if result.status == STATUS_OK:
+            marker = "🐢" if result.duration > slow_threshold else "✅"
+            detail = f"{len(result.tools)} tools"
+        elif result.status == STATUS_CACHED:
+            marker = "♻️ "
+            detail = f"{len(result.tools)} tools (kept from the previous discovery: {result.error})"
+        else:
+            marker = "⏰" if result.status == STATUS_TIMEOUT else "❌"
+            detail = result.error or result.status
+        print(f"{marker} {result.server_name:<30} {result.duration:6.2f}s  {detail}")
+    
+    slow = [r.server_name for r in ok if r.duration > slow_threshold]
+    failed = [r.server_name for r in results if r.status not in (STATUS_OK, STATUS_CACHED)]
+    if slow:
+        print(f"\n🐢 Slow servers (> {slow_threshold:.0f}s): {', '.join(slow)}")
+    if failed:
+        print(f"❌ Failed servers: {', '.join(failed)}")
+
+
+def display_tool_diffs(diffs: List[ToolDiff]):
+    """
+    Display tools added, removed and changed since the previous discovery.
+    
+    Args:
+        diffs: One diff per queried (or removed) server
+    """
+    if not diffs:
+        return
+    
+    print("\n🔁 Tool Changes")
+    print("=" * 60)
+    
+    changed = [diff for diff in diffs if diff]
+    if not changed:
+        print("✅ No tool changes on the queried servers")
+        return
+    
+    for diff in changed:
+        print(f"📦 {diff.server_name}: {diff.summary()}")
+        for name in diff.added:
+            print(f"   + {name}")
+        for name in diff.removed:
+            print(f"   - {name}")
+        for name in diff.changed:
+            print(f"   ~ {name}")
+
+
+def _refreshes(record: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether a run's discovery record should replace the one in the file.
+    
+    discovered_at is ignored when comparing, so re-querying a server that did
+    not change leaves the file alone, and a record is never replaced by an
+    older one written by a run that started earlier.
+    """
+    if record is None:
+        return False
+    if not current:
+        return True
+    
+    def content(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in state.items() if key != "discovered_at"}
+    
+    return (content(record) != content(current)
+            and record.get("discovered_at", 0) >= current.get("discovered_at", 0))
+
+
+def update_mcp_config(config_path: str, discovered_tools: Dict[str, Any],
+                      discovery_state: Optional[Dict[str, Any]] = None,
+                      collision_policy: str = COLLISION_QUALIFY) -> Optional[bool]:
     """
     Update the mcp.json file with discovered tool information.
     
+    Without discovery_state, the discovered tools are merged into the existing
+    tools section. With it, discovered_tools is the catalog of a discovery run
+    and discovery_state its per-server records, and the merge is per server:
+    only servers whose record this run refreshed take their tools and record
+    from it, every other server keeps what the file holds at write time, and
+    the tools section is rebuilt from the result with collision_policy.
+    
+    The file is re-read and rewritten while holding mcp.json.lock, so
+    concurrent runs never interleave, and replaced atomically, so readers
+    never see a partial file. Other sections (mcpServers, ...) are taken from
+    the file as it is at write time. Nothing is written if nothing changed.
+    
     Args:
         config_path: Path to mcp.json file
         discovered_tools: Dictionary of discovered tools
+        discovery_state: Per-server discovery records (see DiscoveryRun.state)
+        collision_policy: How tool names shared by several servers are handled
+        
+    Returns:
+        True if the file was rewritten, False if it was already up to date,
+        None if it could not be updated
     """
+    path = Path(config_path)
     try:
-        # Read existing config
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
-        # Add tools section if it doesn't exist
-        if 'tools' not in config:
-            config['tools'] = {}
-        
-        # Update with discovered tools
-        for tool_name, tool_info in discovered_tools.items():
-            config['tools'][tool_name] = tool_info
+        with file_lock(path.with_name(path.name + '.lock')):
+            # Read existing config
+            with open(path, 'r') as f:
+                config = json.load(f)
+            
+            updated = dict(config)
+            if discovery_state is None:
+                updated['tools'] = {**config.get('tools', {}), **discovered_tools}
+            else:
+                current = parse_config(str(path), config, (0, 0))
+                file_state = config.get('discovery', {})
+                state, results = {}, []
+                for server_name in current.servers:
+                    record = discovery_state.get(server_name)
+                    if _refreshes(record, file_state.get(server_name)):
+                        tools = _catalog_tools(discovered_tools, server_name)
+                        state[server_name] = record
+                    else:
+                        tools = _catalog_tools(current.tools, server_name)
+                        if server_name in file_state:
+                            state[server_name] = file_state[server_name]
+                    results.append(ServerDiscoveryResult(server_name, STATUS_CACHED, 0.0, tools))
+                
+                updated['tools'] = build_tool_registry(results, collision_policy).as_catalog()
+                updated['discovery'] = state
+            
+            if updated == config:
+                print(f"✅ {config_path} is already up to date")
+                return False
+            
+            atomic_write_json(path, updated, indent=2, mode=stat.S_IMODE(os.stat(path).st_mode))
         
-        # Write updated config
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-        
-        print(f"✅ Updated {config_path} with {len(discovered_tools)} tools")
+        print(f"✅ Updated {config_path} with {len(updated['tools'])} tools")
+        return True
         
     except Exception as e:
         print(f"❌ Error updating config file: {e}")
+        return None
 
 
 def display_discovered_tools(tools: Dict[str, Any]):
@@ -108,47 +513,147 @@ def display_discovered_tools(tools: Dict[str, Any]):
         print("-" * 40)
 
 
-def discover_all_tools(config_path: str = ".cursor/mcp.json") -> Dict[str, Any]:
+def build_tool_registry(results: List[ServerDiscoveryResult],
+                        collision_policy: str = COLLISION_QUALIFY) -> ToolRegistry:
     """
-    Discover all tools from all configured MCP servers.
+    Index the tools of successfully discovered servers.
+    
+    Args:
+        results: Per-server discovery results
+        collision_policy: How tool names shared by several servers are handled
+        
+    Returns:
+        ToolRegistry keyed by (server, tool)
+        
+    Raises:
+        ToolCollisionError: If the policy is "error" and two servers share a tool name
+    """
+    registry = ToolRegistry(collision_policy)
+    for result in results:
+        if result.status not in (STATUS_OK, STATUS_CACHED):
+            continue
+        registry.register_many(result.server_name, (
+            ToolInfo(name, info['description'], info['input_schema'])
+            for name, info in result.tools.items()
+        ))
+    return registry
+
+
+def display_collisions(registry: ToolRegistry):
+    """Report tool names offered by more than one server."""
+    for tool_name, servers in registry.collisions().items():
+        exposed = ', '.join(registry.exposed_name(server, tool_name) for server in servers)
+        print(f"⚠️  Tool '{tool_name}' is offered by {', '.join(servers)} (exposed as {exposed})")
+
+
+def discover_tools_incremental(config_path: str = ".cursor/mcp.json",
+                               max_workers: int = DEFAULT_DISCOVERY_WORKERS,
+                               server_timeout: float = DEFAULT_SERVER_TIMEOUT,
+                               collision_policy: str = COLLISION_QUALIFY,
+                               max_age: float = DEFAULT_DISCOVERY_TTL) -> Optional[DiscoveryRun]:
+    """
+    Discover tools, querying only servers that changed or whose tools are stale.
+    
+    Servers whose config entry is unchanged and whose last discovery is newer
+    than max_age keep their recorded tools. A queried server that fails keeps
+    its previously discovered tools and its old record.
     
     Args:
         config_path: Path to mcp.json configuration file
+        max_workers: Maximum number of servers discovered at the same time
+        server_timeout: Per-server timeout in seconds
+        collision_policy: How tool names shared by several servers are handled
+            (see COLLISION_POLICIES; "qualify" exposes them as "server/tool")
+        max_age: Seconds discovered tools are reused (0 queries every server)
         
     Returns:
-        Dictionary containing all discovered tools
+        DiscoveryRun, or None if discovery could not run
     """
     print("🚀 MCP Tool Discovery")
     print("=" * 50)
     
     if not os.path.exists(config_path):
         print(f"❌ Configuration file not found: {config_path}")
-        return {}
+        return None
     
     try:
         # Create client manager
-        manager = MCPClientManager(config_path)
+        # Always query the servers, refreshing the tool cache as a side effect
+        manager = MCPClientManager(config_path, tool_cache_mode=TOOL_CACHE_REFRESH)
+        config = manager.config
         servers = manager.list_servers()
         
         if not servers:
             print("❌ No MCP servers found in configuration")
-            return {}
+            return None
         
-        print(f"🌐 Found {len(servers)} MCP servers")
-        all_tools = {}
+        stale, reused = plan_discovery(config, max_age)
+        print(f"🌐 Found {len(servers)} MCP servers ({len(stale)} to query, {len(reused)} unchanged)")
         
-        # Discover tools from each server
-        for server_name in servers:
-            client = manager.get_client(server_name)
-            if client:
-                server_tools = discover_tools_for_server(client, server_name)
-                all_tools.update(server_tools)
+        queried: List[ServerDiscoveryResult] = []
+        if stale:
+            with span("discovery", servers=len(stale)):
+                queried = list(iter_discover_servers(manager, stale, max_workers, server_timeout))
         
-        return all_tools
+        now = time.time()
+        state = {name: json.loads(json.dumps(record, default=dict))
+                 for name, record in config.discovery.items() if name in config.servers}
+        results, diffs = list(reused.values()), []
+        for result in queried:
+            previous = _catalog_tools(config.tools, result.server_name)
+            if result.status == STATUS_OK:
+                state[result.server_name] = _discovery_record(config.servers[result.server_name], result.tools, now)
+                diffs.append(diff_tools(result.server_name, previous, result.tools))
+                results.append(result)
+            elif previous:
+                # Keep serving the last known tools of a server that is down
+                results.append(ServerDiscoveryResult(result.server_name, STATUS_CACHED, result.duration,
+                                                     previous, result.error or result.status))
+            else:
+                results.append(result)
+        for name in reused:
+            state[name] = json.loads(json.dumps(config.discovery[name], default=dict))
         
+        # Tools of servers removed from the config
+        known = {info.get("server") for info in config.tools.values() if isinstance(info, dict)}
+        for server_name in sorted((known | set(config.discovery)) - set(config.servers) - {None}):
+            diffs.append(diff_tools(server_name, _catalog_tools(config.tools, server_name), {}))
+        
+        display_discovery_summary([r for r in results if r.server_name not in reused])
+        display_tool_diffs(diffs)
+        
+        # Merge per-server catalogs without letting shared tool names overwrite each other
+        registry = build_tool_registry(results, collision_policy)
+        display_collisions(registry)
+        return DiscoveryRun(registry.as_catalog(), state, results, diffs)
+        
+    except ToolCollisionError as e:
+        print(f"❌ Tool name collision: {e}")
+        return None
     except Exception as e:
         print(f"❌ Error during tool discovery: {e}")
-        return {}
+        return None
+
+
+def discover_all_tools(config_path: str = ".cursor/mcp.json",
+                       max_workers: int = DEFAULT_DISCOVERY_WORKERS,
+                       server_timeout: float = DEFAULT_SERVER_TIMEOUT,
+                       collision_policy: str = COLLISION_QUALIFY) -> Dict[str, Any]:
+    """
+    Discover all tools from all configured MCP servers concurrently.
+    
+    Args:
+        config_path: Path to mcp.json configuration file
+        max_workers: Maximum number of servers discovered at the same time
+        server_timeout: Per-server timeout in seconds
+        collision_policy: How tool names shared by several servers are handled
+            (see COLLISION_POLICIES; "qualify" exposes them as "server/tool")
+        
+    Returns:
+        Dictionary containing all discovered tools
+    """
+    run = discover_tools_incremental(config_path, max_workers, server_timeout, collision_policy, max_age=0)
+    return run.catalog if run else {}
 
 
 def main():
@@ -162,7 +667,8 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
-  %(prog)s                    # Discover all tools and update mcp.json
+  %(prog)s                    # Discover changed or stale servers and update mcp.json
+  %(prog)s --full             # Query every server, ignoring previous discoveries
   %(prog)s --display-only     # Discover tools but don't update config
   %(prog)s --config custom.json  # Use custom config file
         """
@@ -186,6 +692,40 @@ Examples:
         help='Create backup of original config before updating'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_DISCOVERY_WORKERS,
+        help=f'Maximum number of servers discovered concurrently (default: {DEFAULT_DISCOVERY_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=DEFAULT_SERVER_TIMEOUT,
+        help=f'Per-server discovery timeout in seconds (default: {DEFAULT_SERVER_TIMEOUT:.0f})'
+    )
+    
+    parser.add_argument(
+        '--on-collision',
+        choices=COLLISION_POLICIES,
+        default=COLLISION_QUALIFY,
+        help='How to handle a tool name offered by several servers (default: qualify as server/tool)'
+    )
+    
+    parser.add_argument(
+        '--max-age',
+        type=float,
+        default=DEFAULT_DISCOVERY_TTL,
+        help=f'Seconds before an unchanged server is queried again (default: {DEFAULT_DISCOVERY_TTL:.0f})'
+    )
+    
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Query every server, ignoring previous discoveries'
+    )
+    
     args = parser.parse_args()
     
     # Create backup if requested
@@ -196,7 +736,9 @@ Examples:
         print(f"📋 Created backup: {backup_path}")
     
     # Discover tools
-    discovered_tools = discover_all_tools(args.config)
+    run = discover_tools_incremental(args.config, args.workers, args.timeout, args.on_collision,
+                                     max_age=0 if args.full else args.max_age)
+    discovered_tools = run.catalog if run else {}
     
     if not discovered_tools:
         print("❌ No tools discovered")
@@ -207,9 +749,14 @@ Examples:
     
     # Update configuration if not display-only
     if not args.display_only:
-        update_mcp_config(args.config, discovered_tools)
-        print(f"\n✅ Tool discovery complete! Updated {args.config}")
-        print("💡 You can now use the tools with their full information in the config")
+        updated = update_mcp_config(args.config, discovered_tools, run.state, args.on_collision)
+        if updated is None:
+            sys.exit(1)
+        if updated:
+            print(f"\n✅ Tool discovery complete! Updated {args.config}")
+            print("💡 You can now use the tools with their full information in the config")
+        else:
+            print(f"\n✅ Tool discovery complete! {args.config} was already up to date")
     else:
         print(f"\n✅ Tool discovery complete! (Display only mode)")
 
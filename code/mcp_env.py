@@ -0,0 +1,75 @@
+"""
+Per-command environment for the MCP CLI
+
+Commands forwarded to the daemon must see the caller's environment, not the
+daemon's: MCP_<SERVER>_TOKEN, MCP_CACHE_DIR or DATABRICKS_CONFIG_PROFILE can
+differ between shells. The client sends the variables this package reads
+(see forwarded_env) with every request, and the daemon runs the command
+inside env_overlay(), which makes getenv() answer from that copy. The
+overlay is a context variable, so it follows the command into the worker
+threads it starts through mcp_tracing.propagate_context.
+"""
+
+import contextvars
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, Mapping, Optional
+
+# Variables read by this package; everything else comes from the process environment
+FORWARDED_ENV_PREFIXES = ('MCP_',)
+FORWARDED_ENV_NAMES = ('DATABRICKS_CONFIG_PROFILE',)
+
+_overlay: contextvars.ContextVar[Optional[Mapping[str, str]]] = contextvars.ContextVar(
+    'mcp_env_overlay', default=None
+)
+
+
+def is_forwarded(name: str) -> bool:
+    """Check whether a variable is taken from the caller's environment."""
+    return name in FORWARDED_ENV_NAMES or name.startswith(FORWARDED_ENV_PREFIXES)
+
+
+def forwarded_env(environ: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+    """
+    Collect the variables a forwarded command needs.
+    
+    Args:
+        environ: Environment to read (default: os.environ)
+    
+    Returns:
+        The forwarded variables that are set
+    """
+    environ = os.environ if environ is None else environ
+    return {name: value for name, value in environ.items() if is_forwarded(name)}
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Read an environment variable, honoring the current command's overlay.
+    
+    Inside env_overlay(), forwarded variables come only from the overlay
+    (a variable the caller did not set is unset); others use os.environ.
+    """
+    overlay = _overlay.get()
+    if overlay is not None and is_forwarded(name):
+        return overlay.get(name, default)
+    return os.getenv(name, default)
+
+
+@contextmanager
+def env_overlay(env: Optional[Mapping[str, str]]) -> Iterator[None]:
+    """
+    Run a block with a caller's forwarded variables.
+    
+    Args:
+        env: Forwarded variables (None leaves the process environment in effect)
+    """
+    if env is None:
+        yield
+        return
+    
+    token = _overlay.set(dict(env))
+    try:
+        yield
+    finally:
+        _overlay.reset(token)
@@ -0,0 +1,276 @@
+"""
+Per-server health tracking and circuit breakers
+
+Every call to a server records its outcome and latency in a rolling window.
+When the recent error rate (or a run of consecutive failures) crosses a
+threshold, the server's circuit opens and further calls fail immediately
+with CircuitOpenError instead of waiting out another timeout. After a
+cool-down the circuit goes half-open and lets a single trial call through;
+its outcome closes the circuit again or re-opens it.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from mcp_resilience import LatencyWindow, is_transient_error
+
+# Circuit states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+# Outcomes kept for the rolling error rate
+DEFAULT_HEALTH_WINDOW = 50
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit is open."""
+    
+    def __init__(self, server_name: str, retry_in: float):
+        super().__init__(f"Server '{server_name}' is failing; circuit open, next attempt in {retry_in:.0f}s")
+        self.server_name = server_name
+        self.retry_in = retry_in
+
+
+@dataclass
+class CircuitBreakerSettings:
+    """
+    When a circuit opens and how long it stays open.
+    
+    Attributes:
+        failure_rate: Error rate over the window that opens the circuit
+        min_calls: Calls needed in the window before failure_rate is applied
+        consecutive_failures: Failures in a row that open the circuit regardless of the window
+        open_duration: Seconds the circuit stays open before a trial call is allowed
+        max_open_duration: Upper bound of open_duration, which doubles each time a trial call fails
+        window: Number of recent outcomes used for the error rate
+    """
+    failure_rate: float = 0.5
+    min_calls: int = 10
+    consecutive_failures: int = 5
+    open_duration: float = 30.0
+    max_open_duration: float = 300.0
+    window: int = DEFAULT_HEALTH_WINDOW
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state machine over a rolling window of call outcomes."""
+    
+    def __init__(self, settings: Optional[CircuitBreakerSettings] = None):
+        self.settings = settings or CircuitBreakerSettings()
+        self.state = CIRCUIT_CLOSED
+        self.opened_at: Optional[float] = None
+        self.open_duration = self.settings.open_duration
+        self.consecutive_failures = 0
+        self._outcomes: Deque[bool] = deque(maxlen=self.settings.window)
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed calls in the window."""
+        with self._lock:
+            return self._error_rate()
+    
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+    
+    def retry_in(self) -> float:
+        """Seconds until an open circuit allows a trial call (0 when not open)."""
+        with self._lock:
+            if self.state != CIRCUIT_OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.open_duration - time.monotonic())
+    
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go through.
+        
+        An open circuit whose cool-down has passed turns half-open and admits
+        exactly one trial call; everything else is rejected until it finishes.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            
+            if self.state == CIRCUIT_OPEN:
+                if time.monotonic() - self.opened_at < self.open_duration:
+                    return False
+                self.state = CIRCUIT_HALF_OPEN
+                self._trial_in_flight = False
+            
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def would_allow(self) -> bool:
+        """Whether allow_request() would admit a call, without admitting one."""
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_OPEN:
+                return time.monotonic() - self.opened_at >= self.open_duration
+            return not self._trial_in_flight
+    
+    def release(self):
+        """Give back an admitted call that never reached the server."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state == CIRCUIT_HALF_OPEN:
+                # Recovered: start over with a clean window
+                self.state = CIRCUIT_CLOSED
+                self.open_duration = self.settings.open_duration
+                self._outcomes.clear()
+                self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            
+            if self.state == CIRCUIT_HALF_OPEN:
+                # Trial failed: stay away for longer
+                self.open_duration = min(self.settings.max_open_duration, self.open_duration * 2)
+                self._open()
+            elif self.state == CIRCUIT_CLOSED and self._should_open():
+                self._open()
+    
+    def _should_open(self) -> bool:
+        if self.consecutive_failures >= self.settings.consecutive_failures:
+            return True
+        return (len(self._outcomes) >= self.settings.min_calls
+                and self._error_rate() >= self.settings.failure_rate)
+    
+    def _open(self):
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+    
+    def reset(self):
+        """Close the circuit and forget past outcomes."""
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.open_duration = self.settings.open_duration
+            self.consecutive_failures = 0
+            self._outcomes.clear()
+            self._trial_in_flight = False
+
+
+class ServerHealth:
+    """Health of one MCP server: circuit breaker, latencies and last error."""
+    
+    def __init__(self, server_name: str, settings: Optional[CircuitBreakerSettings] = None):
+        """
+        Initialize the health record.
+        
+        Args:
+            server_name: Server the record belongs to
+            settings: Circuit breaker settings (defaults to CircuitBreakerSettings())
+        """
+        self.server_name = server_name
+        self.breaker = CircuitBreaker(settings)
+        self.latencies = LatencyWindow(self.breaker.settings.window)
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def check(self):
+        """
+        Admit a call or fail fast.
+        
+        Raises:
+            CircuitOpenError: If the server's circuit is open
+        """
+        if not self.breaker.allow_request():
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError(self.server_name, self.breaker.retry_in())
+    
+    def available(self) -> bool:
+        """Whether a call would currently be admitted (used to route around failing endpoints)."""
+        return self.breaker.would_allow()
+    
+    def release(self):
+        """Give back a call admitted by check() that did not contact the server."""
+        self.breaker.release()
+    
+    def record_success(self, latency: Optional[float] = None):
+        """Record a call the server answered (error results included)."""
+        with self._lock:
+            self.calls += 1
+        if latency is not None:
+            self.latencies.add(latency)
+        self.breaker.record_success()
+    
+    def record_failure(self, error: BaseException, latency: Optional[float] = None):
+        """Record a call that raised (connection error, timeout, 5xx, ...)."""
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.last_failure_at = time.time()
+        if latency is not None:
+            self.latencies.add(latency)
+        self.breaker.record_failure()
+    
+    def record_error(self, error: BaseException, latency: Optional[float] = None):
+        """
+        Record a call that raised, counting it against the circuit only if transient.
+        
+        Connection errors, timeouts, 429 and 5xx say the server is unhealthy.
+        Anything else (a rejected token, a 4xx for a bad request, a local
+        error) would fail the same way on a healthy server, so it is kept as
+        the last error without moving the circuit towards open.
+        """
+        if is_transient_error(error):
+            self.record_failure(error, latency)
+            return
+        
+        with self._lock:
+            self.calls += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+        if latency is not None:
+            self.latencies.add(latency)
+        self.breaker.release()
+    
+    @property
+    def state(self) -> str:
+        # Reading the state does not move an expired open circuit to half-open
+        return self.breaker.state
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the server's health.
+        
+        Returns:
+            Dict with server, state, calls, failures, rejected, error_rate,
+            p50_ms/p95_ms over the latency window, retry_in and last_error
+        """
+        p50 = self.latencies.percentile(50)
+        p95 = self.latencies.percentile(95)
+        return {
+            'server': self.server_name,
+            'state': self.state,
+            'calls': self.calls,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'error_rate': round(self.breaker.error_rate, 3),
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'retry_in': round(self.breaker.retry_in(), 1),
+            'last_error': self.last_error,
+        }
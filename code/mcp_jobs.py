@@ -0,0 +1,194 @@
+"""
+Background jobs for the interactive mode
+
+Tool calls started from the interactive prompt run on a small thread pool
+so the prompt stays responsive: several searches can be outstanding against
+a slow index at once, and their results are picked up later by job number.
+Completed jobs are announced before the next prompt, like shell job control.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_tracing import propagate_context
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Calls running at the same time; further jobs wait in the queue
+DEFAULT_JOB_WORKERS = 8
+
+# Finished jobs kept for result recall; older ones are forgotten
+DEFAULT_JOB_HISTORY = 100
+
+
+@dataclass
+class Job:
+    """One background command."""
+    job_id: int
+    label: str
+    future: Optional[Future] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancelled: bool = False
+    reported: bool = False
+    
+    @property
+    def state(self) -> str:
+        if self.cancelled:
+            return JOB_CANCELLED
+        if not self.future.done():
+            return JOB_RUNNING if self.started_at is not None else JOB_QUEUED
+        return JOB_FAILED if self.future.exception() is not None else JOB_DONE
+    
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self.future.done()
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds the job has been running (or ran, once finished)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+    
+    @property
+    def result(self) -> Any:
+        """Result of a done job."""
+        return self.future.result()
+    
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Exception of a failed job."""
+        if self.cancelled or not self.future.done():
+            return None
+        return self.future.exception()
+
+
+class JobManager:
+    """Runs commands in the background and keeps their results for recall."""
+    
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS, history: int = DEFAULT_JOB_HISTORY):
+        """
+        Initialize the job manager.
+        
+        Args:
+            max_workers: Jobs running at the same time
+            history: Finished jobs kept before the oldest are forgotten
+        """
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="mcp-job")
+        self._jobs: Dict[int, Job] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+    
+    def submit(self, label: str, fn: Callable[[], Any]) -> Job:
+        """
+        Start a command in the background.
+        
+        Args:
+            label: Description shown in job listings (normally the command line)
+            fn: The call to make
+        
+        Returns:
+            The new Job
+        """
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+        
+        job = Job(job_id, label)
+        
+        def run():
+            job.started_at = time.monotonic()
+            try:
+                return fn()
+            finally:
+                # A cancelled job keeps the time it was cancelled at
+                job.finished_at = job.finished_at or time.monotonic()
+        
+        job.future = self._executor.submit(propagate_context(run))
+        
+        with self._lock:
+            self._jobs[job_id] = job
+            self._forget_old_jobs()
+        return job
+    
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self) -> List[Job]:
+        """All known jobs, oldest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.job_id)
+    
+    def running(self) -> List[Job]:
+        """Jobs that are queued or running."""
+        return [job for job in self.jobs() if not job.finished]
+    
+    def last(self) -> Optional[Job]:
+        """Most recently submitted job."""
+        jobs = self.jobs()
+        return jobs[-1] if jobs else None
+    
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job.
+        
+        A queued job never runs. A running call cannot be interrupted, so its
+        result is discarded when it arrives.
+        
+        Returns:
+            True if the job was still queued or running
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.future.cancel()
+        job.cancelled = True
+        job.reported = True
+        job.finished_at = job.finished_at or time.monotonic()
+        return True
+    
+    def wait(self, jobs: List[Job], timeout: Optional[float] = None) -> bool:
+        """
+        Wait for jobs to finish.
+        
+        Returns:
+            True if every job finished within the timeout
+        """
+        pending = [job.future for job in jobs if not job.finished]
+        if not pending:
+            return True
+        done, not_done = wait(pending, timeout=timeout)
+        return not not_done
+    
+    def take_finished(self) -> List[Job]:
+        """Jobs that finished since the last call (each is reported once)."""
+        finished = []
+        for job in self.jobs():
+            if job.finished and not job.reported:
+                job.reported = True
+                finished.append(job)
+        return finished
+    
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond the history size (lock held)."""
+        finished = [job_id for job_id, job in sorted(self._jobs.items()) if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+    
+    def close(self):
+        """Stop accepting jobs; queued jobs are cancelled and running calls are abandoned."""
+        for job in self.running():
+            job.future.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,381 @@
+"""
+Shared MCP sessions and HTTP connections per Databricks workspace
+
+Every MCP server hosted on the same workspace is reached at the same host
+with the same credential. WorkspaceSessionPool keeps, per (host, credential):
+
+- one HTTP client whose connections the MCP sessions of all servers on that
+  workspace share;
+- one open MCP session per server URL, so a tool call is a single request
+  instead of a new transport and initialize handshake;
+- one requests.Session for plain REST calls such as test_connection().
+
+The sessions live on one event loop in a background thread; the synchronous
+MCPClient submits its calls there, and calls from several threads are
+multiplexed over the same session. A session that ended (the server dropped
+it, or it was closed) is reopened by the next call. Workspaces unused for
+longer than the keep-alive have their sessions and connections closed.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from mcp_env import getenv
+
+# asyncio, mcp and requests are imported when the first session is opened;
+# commands that never contact a server should not pay for them
+if TYPE_CHECKING:
+    import asyncio
+    import requests
+
+# Idle connections kept open per workspace (MCP_SESSION_POOL_SIZE)
+DEFAULT_POOL_SIZE = 10
+
+# Workspaces unused for this many seconds are closed (MCP_SESSION_KEEPALIVE)
+DEFAULT_KEEPALIVE = 300.0
+
+# Seconds close() waits for sessions to shut down
+CLOSE_TIMEOUT = 5.0
+
+
+def normalize_host(host: str) -> str:
+    """Return the workspace host without scheme or trailing slash."""
+    host = host.strip()
+    for scheme in ('https://', 'http://'):
+        if host.startswith(scheme):
+            host = host[len(scheme):]
+    return host.rstrip('/')
+
+
+class EventLoopThread:
+    """An asyncio event loop running in a daemon thread."""
+    
+    def __init__(self, name: str = "mcp-session-loop"):
+        import asyncio
+        
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+    
+    def run(self, coro: Any, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result."""
+        import asyncio
+        
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("EventLoopThread.run() would block its own loop")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+    
+    def stop(self):
+        """Stop the loop and wait for the thread to exit."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(CLOSE_TIMEOUT)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+class PooledMCPSession:
+    """
+    One persistent MCP session to a server, used from synchronous code.
+    
+    Offers the list_tools()/call_tool() interface of DatabricksMCPClient, so
+    MCPClient can use either.
+    """
+    
+    def __init__(self, pool: "WorkspaceSessionPool", workspace: "PooledWorkspace", server_url: str):
+        self.pool = pool
+        self.workspace = workspace
+        self.server_url = server_url
+        self.error: Optional[BaseException] = None
+        self._session: Optional[Any] = None
+        self._task: Optional["asyncio.Task"] = None
+        self._closing: Optional["asyncio.Event"] = None
+        self._open_lock: Optional["asyncio.Lock"] = None
+    
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+    
+    async def _run(self, ready: "asyncio.Future"):
+        """Own the MCP session until it is closed or the connection drops."""
+        import asyncio
+        from mcp_async_client import open_mcp_session
+        
+        try:
+            http_client = self.workspace.http_client(self.pool)
+            async with open_mcp_session(self.server_url, self.workspace.token, http_client) as session:
+                self._session = session
+                ready.set_result(None)
+                await self._closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self._session = None
+    
+    async def _open(self) -> Any:
+        """The open session, (re)connecting first if there is none."""
+        import asyncio
+        
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._session is None:
+                loop = asyncio.get_running_loop()
+                ready = loop.create_future()
+                self._closing = asyncio.Event()
+                self.error = None
+                self._task = loop.create_task(self._run(ready), name=f"mcp-session-{self.server_url}")
+                await ready
+            return self._session
+    
+    async def _list_tools(self) -> List[Any]:
+        session = await self._open()
+        tools: List[Any] = []
+        cursor = None
+        while True:
+            result = await session.list_tools(cursor=cursor) if cursor else await session.list_tools()
+            tools.extend(result.tools)
+            cursor = getattr(result, 'next_cursor', None) or getattr(result, 'nextCursor', None)
+            if not cursor:
+                return tools
+    
+    async def _call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]]) -> Any:
+        session = await self._open()
+        return await session.call_tool(tool_name, arguments or {})
+    
+    async def _aclose(self):
+        task, self._task = self._task, None
+        # The lock belongs to this loop; the pool may start a new one
+        self._open_lock = None
+        if task is None:
+            return
+        if self._closing is not None:
+            self._closing.set()
+        try:
+            await task
+        except BaseException:
+            pass
+    
+    def _use(self):
+        if self.workspace.closed:
+            # Evicted while idle: rejoin the pool, which opens fresh connections
+            self.workspace = self.pool._adopt(self)
+        self.workspace.touch()
+    
+    def list_tools(self) -> List[Any]:
+        """Fetch every page of the server's tool catalog (mcp Tool objects)."""
+        self._use()
+        return self.pool.loop().run(self._list_tools())
+    
+    def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool over the session and return its CallToolResult."""
+        self._use()
+        return self.pool.loop().run(self._call_tool(tool_name, arguments))
+    
+    def close(self):
+        """Close the session; a later call opens a new one."""
+        loop = self.pool.running_loop()
+        if loop is not None and self._task is not None:
+            loop.run(self._aclose(), CLOSE_TIMEOUT)
+
+
+@dataclass
+class PooledWorkspace:
+    """Sessions and connections shared for one (host, credential) pair."""
+    host: str
+    token: str
+    sessions: Dict[str, PooledMCPSession] = field(default_factory=dict)
+    http_session: Optional["requests.Session"] = None
+    last_used: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    closed: bool = False
+    _http_client: Optional[Any] = None
+    
+    @property
+    def idle(self) -> float:
+        """Seconds since the workspace was last used."""
+        return time.monotonic() - self.last_used
+    
+    def touch(self):
+        self.last_used = time.monotonic()
+    
+    def http_client(self, pool: "WorkspaceSessionPool") -> Optional[Any]:
+        """The workspace's shared async HTTP client (created on the loop thread)."""
+        if self._http_client is None:
+            from mcp_async_client import create_http_client
+            self._http_client = create_http_client(self.token, pool.pool_size, pool.keepalive)
+        return self._http_client
+    
+    async def _aclose(self):
+        for session in list(self.sessions.values()):
+            await session._aclose()
+        http_client, self._http_client = self._http_client, None
+        if http_client is not None:
+            await http_client.aclose()
+    
+    def close(self, loop: Optional[EventLoopThread]):
+        """Close the MCP sessions, the shared connections and the REST session."""
+        self.closed = True
+        if loop is not None:
+            try:
+                loop.run(self._aclose(), CLOSE_TIMEOUT)
+            except Exception:
+                pass
+        if self.http_session is not None:
+            self.http_session.close()
+            self.http_session = None
+
+
+class WorkspaceSessionPool:
+    """
+    Pool of MCP sessions and HTTP connections keyed by workspace host and credential.
+    
+    Tokens are only used as keys through their SHA-256 digest. Workspaces idle
+    for longer than the keep-alive are closed the next time the pool is used.
+    """
+    
+    def __init__(self, pool_size: Optional[int] = None, keepalive: Optional[float] = None):
+        """
+        Initialize the pool.
+        
+        Args:
+            pool_size: Idle connections kept open per workspace
+                (default: MCP_SESSION_POOL_SIZE or 10)
+            keepalive: Idle seconds before a workspace's sessions and connections
+                are closed (default: MCP_SESSION_KEEPALIVE or 300; 0 keeps them open)
+        """
+        if pool_size is None:
+            pool_size = int(getenv('MCP_SESSION_POOL_SIZE', DEFAULT_POOL_SIZE))
+        if keepalive is None:
+            keepalive = float(getenv('MCP_SESSION_KEEPALIVE', DEFAULT_KEEPALIVE))
+        self.pool_size = max(1, pool_size)
+        self.keepalive = keepalive
+        self._entries: Dict[Tuple[str, str], PooledWorkspace] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[EventLoopThread] = None
+    
+    @staticmethod
+    def _key(host: str, token: str) -> Tuple[str, str]:
+        return normalize_host(host), hashlib.sha256(token.encode('utf-8')).hexdigest()
+    
+    def loop(self) -> EventLoopThread:
+        """The event loop running the pool's sessions, started on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = EventLoopThread()
+            return self._loop
+    
+    def running_loop(self) -> Optional[EventLoopThread]:
+        """The event loop if it was started."""
+        return self._loop
+    
+    def _acquire(self, host: str, token: str) -> PooledWorkspace:
+        """Return the entry for (host, token), creating it if needed."""
+        key = self._key(host, token)
+        with self._lock:
+            stale = self._take_idle_locked()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = PooledWorkspace(host=key[0], token=token)
+                self._entries[key] = entry
+            entry.touch()
+        for workspace in stale:
+            workspace.close(self._loop)
+        return entry
+    
+    def get_mcp_session(self, host: str, token: str, server_url: str) -> PooledMCPSession:
+        """
+        Get the shared MCP session for a server.
+        
+        The session is opened by its first call.
+        
+        Args:
+            host: Workspace hostname (with or without scheme)
+            token: Authentication token
+            server_url: MCP server URL
+        
+        Returns:
+            PooledMCPSession shared by all callers with the same host, token and URL
+        """
+        entry = self._acquire(host, token)
+        with entry.lock:
+            session = entry.sessions.get(server_url)
+            if session is None:
+                session = PooledMCPSession(self, entry, server_url)
+                entry.sessions[server_url] = session
+            return session
+    
+    def _adopt(self, session: PooledMCPSession) -> PooledWorkspace:
+        """Register a session whose workspace was closed with the current entry."""
+        entry = self._acquire(session.workspace.host, session.workspace.token)
+        with entry.lock:
+            entry.sessions.setdefault(session.server_url, session)
+        return entry
+    
+    def get_http_session(self, host: str, token: str) -> "requests.Session":
+        """
+        Get the shared keep-alive requests.Session for a workspace.
+        
+        Args:
+            host: Workspace hostname (with or without scheme)
+            token: Authentication token, sent as a bearer token with every request
+        
+        Returns:
+            requests.Session shared by all callers with the same host and token
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        entry = self._acquire(host, token)
+        with entry.lock:
+            if entry.http_session is None:
+                session = requests.Session()
+                session.headers['Authorization'] = f'Bearer {token}'
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                entry.http_session = session
+            return entry.http_session
+    
+    def _take_idle_locked(self) -> List[PooledWorkspace]:
+        """Remove and return entries idle for longer than the keep-alive (lock held)."""
+        if self.keepalive <= 0:
+            return []
+        
+        stale = [key for key, entry in self._entries.items() if entry.idle > self.keepalive]
+        return [self._entries.pop(key) for key in stale]
+    
+    def evict_idle(self) -> int:
+        """
+        Close workspaces idle for longer than the keep-alive.
+        
+        Returns:
+            Number of entries closed
+        """
+        with self._lock:
+            stale = self._take_idle_locked()
+        for workspace in stale:
+            workspace.close(self._loop)
+        return len(stale)
+    
+    def close(self):
+        """Close every session and connection and stop the event loop."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            loop, self._loop = self._loop, None
+        for workspace in entries:
+            workspace.close(loop)
+        if loop is not None:
+            loop.stop()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
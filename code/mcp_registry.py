@@ -0,0 +1,349 @@
+"""
+Indexed registry of MCP tools across servers
+
+The registry keys every tool by (server, tool name) for O(1) exact lookup,
+keeps a sorted name index for prefix lookup and a trigram index for fuzzy
+lookup, and makes tool names that appear on more than one server explicit
+instead of letting one server's tool silently replace another's.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# How a tool name that exists on several servers is handled
+COLLISION_QUALIFY = "qualify"  # Keep every tool; colliding names are exposed as "server/tool"
+COLLISION_FIRST = "first"      # Unqualified names resolve to the first server registered
+COLLISION_LAST = "last"        # Unqualified names resolve to the last server registered
+COLLISION_ERROR = "error"      # Registering a colliding name raises ToolCollisionError
+COLLISION_POLICIES = (COLLISION_QUALIFY, COLLISION_FIRST, COLLISION_LAST, COLLISION_ERROR)
+
+# Separator between server and tool in qualified names
+QUALIFIED_NAME_SEPARATOR = "/"
+
+# Name keywords identifying the Wikipedia vector search tool
+WIKIPEDIA_SEARCH_KEYWORDS = ('wikipedia', 'docsearch')
+
+ToolKey = Tuple[str, str]
+
+
+class ToolCollisionError(ValueError):
+    """Raised when a tool name cannot be resolved to a single server."""
+
+
+@dataclass(frozen=True)
+class ToolMatch:
+    """A tool found by a registry lookup."""
+    server: str
+    tool: Any
+    score: float = 1.0
+    
+    @property
+    def qualified_name(self) -> str:
+        return qualify_tool_name(self.server, self.tool.name)
+
+
+def qualify_tool_name(server: str, tool_name: str) -> str:
+    """Return the "server/tool" form of a tool name."""
+    return f"{server}{QUALIFIED_NAME_SEPARATOR}{tool_name}"
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def match_capability(tools: Iterable[Any], keywords: Tuple[str, ...]) -> Optional[Any]:
+    """
+    Find the first tool whose name contains any of the keywords.
+    
+    Args:
+        tools: Tools to scan, in priority order
+        keywords: Lower-case substrings to look for
+    
+    Returns:
+        The matching tool, or None
+    """
+    for tool in tools:
+        name = tool.name.lower()
+        if any(keyword in name for keyword in keywords):
+            return tool
+    return None
+
+
+class ToolRegistry:
+    """
+    Registry of tools keyed by (server, tool name).
+    
+    Tools are any objects with a ``name`` attribute (normally ToolInfo).
+    Capability lookups such as finding the Wikipedia search tool are
+    memoized until the registered tools change.
+    """
+    
+    def __init__(self, collision_policy: str = COLLISION_QUALIFY):
+        """
+        Initialize an empty registry.
+        
+        Args:
+            collision_policy: One of COLLISION_POLICIES
+        """
+        if collision_policy not in COLLISION_POLICIES:
+            raise ValueError(f"Unknown collision policy: {collision_policy}")
+        
+        self.collision_policy = collision_policy
+        self._tools: Dict[ToolKey, Any] = {}
+        self._servers: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._prefix_index: List[Tuple[str, str, str]] = []
+        self._trigram_index: Dict[str, Set[ToolKey]] = {}
+        self._capabilities: Dict[Tuple[Tuple[str, ...], Optional[str]], Optional[ToolMatch]] = {}
+        self._lock = threading.RLock()
+    
+    def register(self, server: str, tool: Any):
+        """
+        Add or replace one tool.
+        
+        Args:
+            server: Server the tool belongs to
+            tool: Tool object with a ``name`` attribute
+        
+        Raises:
+            ToolCollisionError: If the policy is "error" and another server has the same tool name
+        """
+        with self._lock:
+            key = (server, tool.name)
+            if key in self._tools:
+                self._tools[key] = tool
+                self._capabilities.clear()
+                return
+            
+            owners = self._by_name.setdefault(tool.name, [])
+            if owners and self.collision_policy == COLLISION_ERROR:
+                raise ToolCollisionError(
+                    f"Tool '{tool.name}' on server '{server}' collides with server(s) {', '.join(owners)}"
+                )
+            
+            owners.append(server)
+            self._tools[key] = tool
+            self._servers.setdefault(server, []).append(tool.name)
+            insort(self._prefix_index, (tool.name.lower(), server, tool.name))
+            for trigram in _trigrams(tool.name):
+                self._trigram_index.setdefault(trigram, set()).add(key)
+            self._capabilities.clear()
+    
+    def register_many(self, server: str, tools: Iterable[Any]):
+        """Add several tools for one server."""
+        with self._lock:
+            for tool in tools:
+                self.register(server, tool)
+    
+    def replace_server(self, server: str, tools: Iterable[Any]):
+        """Replace every tool of a server with a new catalog."""
+        with self._lock:
+            self.remove_server(server)
+            self.register_many(server, tools)
+    
+    def remove_server(self, server: str) -> int:
+        """
+        Remove every tool of a server.
+        
+        Returns:
+            Number of tools removed
+        """
+        with self._lock:
+            names = self._servers.pop(server, [])
+            for name in names:
+                key = (server, name)
+                del self._tools[key]
+                
+                owners = self._by_name[name]
+                owners.remove(server)
+                if not owners:
+                    del self._by_name[name]
+                
+                entry = (name.lower(), server, name)
+                index = bisect_left(self._prefix_index, entry)
+                if index < len(self._prefix_index) and self._prefix_index[index] == entry:
+                    del self._prefix_index[index]
+                
+                for trigram in _trigrams(name):
+                    keys = self._trigram_index.get(trigram)
+                    if keys:
+                        keys.discard(key)
+                        if not keys:
+                            del self._trigram_index[trigram]
+            
+            if names:
+                self._capabilities.clear()
+            return len(names)
+    
+    def get(self, server: str, tool_name: str) -> Optional[Any]:
+        """Exact O(1) lookup of a tool on a server."""
+        return self._tools.get((server, tool_name))
+    
+    def tools_for_server(self, server: str) -> List[Any]:
+        """Return a server's tools in registration order."""
+        with self._lock:
+            return [self._tools[(server, name)] for name in self._servers.get(server, [])]
+    
+    def servers(self) -> List[str]:
+        """Return the servers that have registered tools."""
+        with self._lock:
+            return list(self._servers)
+    
+    def collisions(self) -> Dict[str, List[str]]:
+        """Return tool names registered by more than one server, with their servers."""
+        with self._lock:
+            return {name: list(owners) for name, owners in self._by_name.items() if len(owners) > 1}
+    
+    def resolve(self, name: str, server: Optional[str] = None) -> Optional[ToolMatch]:
+        """
+        Resolve a tool name to a single tool.
+        
+        Args:
+            name: Tool name, optionally qualified as "server/tool"
+            server: Server to restrict the lookup to
+        
+        Returns:
+            ToolMatch, or None if no server has the tool
+        
+        Raises:
+            ToolCollisionError: If an unqualified name exists on several servers
+                and the policy does not pick one
+        """
+        if server is None and QUALIFIED_NAME_SEPARATOR in name:
+            qualified_server, _, tool_name = name.partition(QUALIFIED_NAME_SEPARATOR)
+            if (qualified_server, tool_name) in self._tools:
+                server, name = qualified_server, tool_name
+        
+        with self._lock:
+            if server is not None:
+                tool = self._tools.get((server, name))
+                return ToolMatch(server, tool) if tool is not None else None
+            
+            owners = self._by_name.get(name)
+            if not owners:
+                return None
+            if len(owners) > 1 and self.collision_policy in (COLLISION_QUALIFY, COLLISION_ERROR):
+                raise ToolCollisionError(
+                    f"Tool '{name}' exists on servers {', '.join(owners)}; "
+                    f"use a qualified name such as '{qualify_tool_name(owners[0], name)}'"
+                )
+            
+            owner = owners[-1] if self.collision_policy == COLLISION_LAST else owners[0]
+            return ToolMatch(owner, self._tools[(owner, name)])
+    
+    def exposed_name(self, server: str, tool_name: str) -> str:
+        """Name a tool is exposed under in merged catalogs (qualified only when needed)."""
+        owners = self._by_name.get(tool_name, [])
+        if len(owners) > 1 and self.collision_policy == COLLISION_QUALIFY:
+            return qualify_tool_name(server, tool_name)
+        return tool_name
+    
+    def search_prefix(self, prefix: str, limit: Optional[int] = None) -> List[ToolMatch]:
+        """
+        Find tools whose name starts with a prefix (case-insensitive).
+        
+        Args:
+            prefix: Name prefix
+            limit: Maximum number of matches
+        
+        Returns:
+            Matches in name order
+        """
+        prefix = prefix.lower()
+        matches = []
+        with self._lock:
+            index = bisect_left(self._prefix_index, (prefix, '', ''))
+            while index < len(self._prefix_index):
+                lowered, server, name = self._prefix_index[index]
+                if not lowered.startswith(prefix):
+                    break
+                matches.append(ToolMatch(server, self._tools[(server, name)]))
+                if limit is not None and len(matches) >= limit:
+                    break
+                index += 1
+        return matches
+    
+    def search_fuzzy(self, query: str, limit: int = 10, min_score: float = 0.1) -> List[ToolMatch]:
+        """
+        Find tools with names similar to a query using trigram similarity.
+        
+        Args:
+            query: Approximate tool name
+            limit: Maximum number of matches
+            min_score: Minimum Jaccard similarity of name trigrams
+        
+        Returns:
+            Matches sorted by descending score
+        """
+        query_trigrams = _trigrams(query)
+        shared: Dict[ToolKey, int] = {}
+        with self._lock:
+            for trigram in query_trigrams:
+                for key in self._trigram_index.get(trigram, ()):
+                    shared[key] = shared.get(key, 0) + 1
+            
+            scored = []
+            for key, count in shared.items():
+                score = count / (len(query_trigrams) + len(_trigrams(key[1])) - count)
+                if score >= min_score:
+                    scored.append(ToolMatch(key[0], self._tools[key], score))
+        
+        scored.sort(key=lambda match: (-match.score, match.server, match.tool.name))
+        return scored[:limit]
+    
+    def find_capability(self, keywords: Tuple[str, ...],
+                        server: Optional[str] = None) -> Optional[ToolMatch]:
+        """
+        Find the first tool whose name contains any keyword (memoized).
+        
+        Args:
+            keywords: Lower-case substrings to look for
+            server: Server to restrict the lookup to (None for all, in registration order)
+        
+        Returns:
+            ToolMatch, or None if no tool matches
+        """
+        cache_key = (tuple(keywords), server)
+        with self._lock:
+            if cache_key in self._capabilities:
+                return self._capabilities[cache_key]
+            
+            match = None
+            for candidate_server in ([server] if server is not None else self._servers):
+                tool = match_capability(self.tools_for_server(candidate_server), keywords)
+                if tool is not None:
+                    match = ToolMatch(candidate_server, tool)
+                    break
+            
+            self._capabilities[cache_key] = match
+            return match
+    
+    def as_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export every tool as a discovery-style catalog.
+        
+        Returns:
+            Dictionary of exposed tool name -> description, input_schema and server
+        """
+        catalog = {}
+        with self._lock:
+            for (server, name), tool in self._tools.items():
+                exposed = self.exposed_name(server, name)
+                # With "first"/"last" only the winning server is exported under the bare name
+                if exposed in catalog and self.collision_policy != COLLISION_LAST:
+                    continue
+                catalog[exposed] = {
+                    "description": getattr(tool, 'description', ''),
+                    "input_schema": getattr(tool, 'input_schema', {}),
+                    "server": server
+                }
+        return catalog
+    
+    def __len__(self) -> int:
+        return len(self._tools)
+    
+    def __contains__(self, key: ToolKey) -> bool:
+        return key in self._tools
@@ -0,0 +1,362 @@
+"""
+Streaming rendering of MCP tool results
+
+Vector search tools can return very large JSON payloads. Instead of parsing
+a whole payload with json.loads() and printing it with json.dumps(), the
+helpers here decode it one row at a time and stop as soon as the row or
+byte limit is reached, so rows past the limit are never turned into Python
+objects. The payload text itself is already in memory: the MCP SDK hands
+over each content item as one complete string.
+"""
+
+import json
+import time
+from typing import Any, Iterable, Iterator, List, Optional, TextIO
+
+# Defaults for display_results
+DEFAULT_MAX_ROWS = 20
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_CONTENT_LENGTH = 200
+
+# Output formats for the CLI
+OUTPUT_TEXT = "text"      # Human-readable, decorated output
+OUTPUT_JSON = "json"      # One JSON array of rows
+OUTPUT_NDJSON = "ndjson"  # One JSON object per line, written as soon as it is available
+OUTPUT_FORMATS = (OUTPUT_TEXT, OUTPUT_JSON, OUTPUT_NDJSON)
+
+# Size of the slices fed to the decoder
+CHUNK_SIZE = 64 * 1024
+
+# Top-level fields describing a result rather than holding its rows
+METADATA_KEYS = {'manifest', 'columns', 'schema'}
+
+_WHITESPACE = ' \t\n\r'
+
+_END = object()
+
+
+class _ByteLimitReached(Exception):
+    """Raised internally when the byte budget of a stream is used up."""
+
+
+def iter_text_chunks(text: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Split a string into slices for incremental decoding."""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+
+class JSONStreamReader:
+    """
+    Incremental JSON reader over a stream of text chunks.
+    
+    The reader's window holds only the unread part of the current value;
+    consumed text is dropped whenever a new chunk is read. A value spanning
+    chunks is decoded again from its start after each chunk is appended, so
+    a single value much larger than CHUNK_SIZE costs several decodes.
+    """
+    
+    def __init__(self, chunks: Iterable[str], max_bytes: Optional[int] = None):
+        """
+        Initialize the reader.
+        
+        Args:
+            chunks: Text chunks making up one JSON document
+            max_bytes: Stop reading after this many bytes (None for unlimited)
+        """
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+    
+    def _fill(self) -> bool:
+        """Append the next chunk to the window; returns False at end of input."""
+        if self._eof:
+            return False
+        if self.max_bytes is not None and self.bytes_read >= self.max_bytes:
+            raise _ByteLimitReached()
+        
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            return False
+        
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        self.bytes_read += len(chunk.encode('utf-8'))
+        return True
+    
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+    
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self._buffer, self._pos)
+        self._pos += 1
+        return char
+    
+    def decode(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending exactly at the window edge may be cut short (e.g. a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+    
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',]') == ']':
+                return
+    
+    def iter_rows(self) -> Iterator[Any]:
+        """
+        Yield the rows of the document.
+        
+        Rows are the elements of the first array found by walking the
+        document depth-first (skipping METADATA_KEYS). A document without
+        any array yields its top-level value as a single row.
+        """
+        if self.peek() not in '[{':
+            yield self.decode()
+            return
+        
+        found, members = yield from self._walk_rows()
+        if not found:
+            yield members
+    
+    def _walk_rows(self):
+        """Stream the first array below the current value; returns (found, members)."""
+        if self.peek() == '[':
+            yield from self.iter_array()
+            return True, None
+        
+        members = {}
+        self.expect('{')
+        while self.peek() != '}':
+            key = self.decode()
+            self.expect(':')
+            if key not in METADATA_KEYS and self.peek() in '[{':
+                found, value = yield from self._walk_rows()
+                if found:
+                    return True, None
+            else:
+                value = self.decode()
+            members[key] = value
+            if self.peek() == ',':
+                self._pos += 1
+        self._pos += 1
+        return False, members
+
+
+class ResultRowStream:
+    """
+    Iterable over the rows of a tool result with row and byte limits.
+    
+    After iteration, ``rows`` holds the number of rows yielded,
+    ``truncated`` tells whether a limit stopped the stream early,
+    ``malformed`` tells whether a payload stopped being valid JSON after
+    some of its rows were yielded (the rest of it is lost) and
+    ``decode_time`` is the time spent decoding (excluding the consumer).
+    """
+    
+    def __init__(self, result: Any, max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 max_raw_length: int = DEFAULT_MAX_CONTENT_LENGTH):
+        """
+        Initialize the stream.
+        
+        Args:
+            result: Tool result (CallToolResult, content list, JSON text or parsed data)
+            max_rows: Maximum rows to yield (None for unlimited)
+            max_bytes: Maximum bytes of JSON text to read per content item (None for unlimited)
+            max_raw_length: Characters of non-JSON text to yield
+        """
+        self.result = result
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_raw_length = max_raw_length
+        self.rows = 0
+        self.bytes_read = 0
+        self.truncated = False
+        self.malformed = False
+        self.decode_time = 0.0
+    
+    def __iter__(self) -> Iterator[Any]:
+        rows = self._iter_all_rows()
+        while True:
+            start = time.perf_counter()
+            row = next(rows, _END)
+            self.decode_time += time.perf_counter() - start
+            if row is _END:
+                return
+            if self.max_rows is not None and self.rows >= self.max_rows:
+                self.truncated = True
+                return
+            self.rows += 1
+            yield row
+    
+    def _iter_all_rows(self) -> Iterator[Any]:
+        content = self.result.content if hasattr(self.result, 'content') else self.result
+        
+        if isinstance(content, (list, tuple)):
+            for item in content:
+                yield from self._iter_item_rows(item)
+        else:
+            yield from self._iter_item_rows(content)
+    
+    def _iter_item_rows(self, item: Any) -> Iterator[Any]:
+        text = getattr(item, 'text', item)
+        if not isinstance(text, str):
+            yield text
+            return
+        
+        reader = JSONStreamReader(iter_text_chunks(text), self.max_bytes)
+        item_rows = 0
+        try:
+            for row in reader.iter_rows():
+                item_rows += 1
+                yield row
+        except _ByteLimitReached:
+            self.truncated = True
+        except json.JSONDecodeError:
+            if item_rows:
+                self.malformed = True
+            else:
+                # Not JSON: show the start of the raw text instead
+                yield text[:self.max_raw_length]
+        finally:
+            self.bytes_read += reader.bytes_read
+
+
+def iter_result_rows(result: Any, max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+                     max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> ResultRowStream:
+    """
+    Stream the rows of a tool result, decoding only the rows that are used.
+    
+    Args:
+        result: Tool result (CallToolResult, content list, JSON text or parsed data)
+        max_rows: Maximum rows to yield (None for unlimited)
+        max_bytes: Maximum bytes of JSON text to read per content item (None for unlimited)
+    
+    Returns:
+        ResultRowStream to iterate; its ``truncated`` flag is set if a limit was hit
+        and its ``malformed`` flag if a payload broke off after some rows
+    """
+    return ResultRowStream(result, max_rows, max_bytes)
+
+
+def _preview(value: Any, max_length: int) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text[:max_length] + ('...' if len(text) > max_length else '')
+
+
+def render_row(index: int, row: Any, max_content_length: int = DEFAULT_MAX_CONTENT_LENGTH):
+    """Print one result row."""
+    if isinstance(row, dict) and ('title' in row or 'url' in row or 'content' in row):
+        print(f"\n{index}. {row.get('title', 'No title')}")
+        print(f"   URL: {row.get('url', 'No URL')}")
+        print(f"   Content: {_preview(row.get('content', 'No content'), max_content_length)}")
+    else:
+        print(f"\n{index}. {_preview(row, max_content_length)}")
+    print("-" * 30)
+
+
+def parse_fields(spec: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated --fields value (None when no projection is requested)."""
+    if not spec:
+        return None
+    fields = [field.strip() for field in spec.split(',') if field.strip()]
+    return fields or None
+
+
+def _lookup(value: Any, path: str) -> Any:
+    for part in path.split('.'):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def project_fields(row: Any, fields: Optional[List[str]]) -> Any:
+    """
+    Keep only the requested fields of a row.
+    
+    Args:
+        row: Result row (dicts are looked up by key, lists by index)
+        fields: Dotted field paths such as "title" or "metadata.score" (None keeps the row)
+    
+    Returns:
+        Dictionary of field -> value, or the row unchanged if it is a scalar
+    """
+    if not fields or not isinstance(row, (dict, list, tuple)):
+        return row
+    return {field: _lookup(row, field) for field in fields}
+
+
+class MachineWriter:
+    """
+    Writes rows as JSON or NDJSON.
+    
+    Each row is written and flushed as soon as it is passed in; in JSON mode
+    the rows are streamed as the elements of a single array.
+    """
+    
+    def __init__(self, output: str, stream: TextIO, fields: Optional[List[str]] = None):
+        """
+        Initialize the writer.
+        
+        Args:
+            output: OUTPUT_JSON or OUTPUT_NDJSON
+            stream: Stream receiving the data (normally the real stdout)
+            fields: Optional field projection applied to every row
+        """
+        if output not in (OUTPUT_JSON, OUTPUT_NDJSON):
+            raise ValueError(f"Not a machine-readable output format: {output}")
+        
+        self.output = output
+        self.stream = stream
+        self.fields = fields
+        self.rows = 0
+    
+    def write(self, row: Any):
+        """Write one row."""
+        line = json.dumps(project_fields(row, self.fields), default=str, ensure_ascii=False)
+        if self.output == OUTPUT_NDJSON:
+            self.stream.write(line + '\n')
+        else:
+            self.stream.write(('[\n' if self.rows == 0 else ',\n') + line)
+        self.stream.flush()
+        self.rows += 1
+    
+    def close(self):
+        """Finish the output (closes the JSON array)."""
+        if self.output == OUTPUT_JSON:
+            self.stream.write('[]\n' if self.rows == 0 else '\n]\n')
+            self.stream.flush()
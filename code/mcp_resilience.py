@@ -0,0 +1,385 @@
+"""
+Retries and request hedging for MCP tool calls
+
+A single transient failure (a 5xx, a dropped connection) or one slow replica
+otherwise lands directly in the caller's tail latency. RetryPolicy retries
+transient failures of idempotent tools with exponential backoff, full jitter
+and a retry budget that stops retries from amplifying an outage. HedgePolicy
+sends a duplicate call when the first one is slower than the recent p95 and
+uses whichever answer arrives first, with a budget of its own.
+"""
+
+import contextvars
+import fnmatch
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Tools treated as idempotent by default: read-only vector search lookups
+DEFAULT_IDEMPOTENT_TOOLS = ('*docsearch*', '*search*', '*wikipedia*')
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Exception class names (httpx, httpcore, requests, builtins) that indicate a transient failure
+TRANSIENT_ERROR_NAMES = {
+    'ConnectError', 'ConnectTimeout', 'ReadTimeout', 'WriteTimeout', 'PoolTimeout',
+    'ReadError', 'WriteError', 'RemoteProtocolError', 'NetworkError', 'TimeoutException',
+    'ConnectionError', 'Timeout', 'ChunkedEncodingError', 'TimeoutError', 'ClosedResourceError',
+}
+
+# Rolling latency window size
+DEFAULT_LATENCY_WINDOW = 200
+
+# Worker threads for the first copy of hedged calls
+DEFAULT_HEDGE_WORKERS = 64
+
+
+def is_transient_error(error: BaseException, _depth: int = 0) -> bool:
+    """
+    Decide whether a failed call is worth retrying.
+    
+    Looks at HTTP status codes, well-known network/timeout exception types,
+    exception groups raised by anyio task groups, and chained causes.
+    
+    Args:
+        error: Exception raised by the call
+    
+    Returns:
+        True for transient failures (5xx, 429, timeouts, connection errors)
+    """
+    if _depth > 5:
+        return False
+    
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'status_code', None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUS_CODES
+    
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    
+    # ExceptionGroup from anyio task groups
+    for inner in getattr(error, 'exceptions', None) or ():
+        if is_transient_error(inner, _depth + 1):
+            return True
+    
+    cause = error.__cause__ or error.__context__
+    return cause is not None and is_transient_error(cause, _depth + 1)
+
+
+def matches_tool(tool_name: str, patterns: Tuple[str, ...]) -> bool:
+    """Check a tool name against glob patterns (case-insensitive)."""
+    name = tool_name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in patterns)
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of calls.
+    
+    Every call deposits ``ratio`` tokens and every retry withdraws one, so
+    when a server is failing outright retries add at most ``ratio`` extra
+    load instead of multiplying it by the number of attempts. HedgePolicy
+    caps hedges with one in the same way.
+    """
+    
+    def __init__(self, ratio: float = 0.2, initial: float = 10.0, cap: float = 100.0):
+        """
+        Initialize the budget.
+        
+        Args:
+            ratio: Retries allowed per call, on average
+            initial: Tokens available before any call (allows retries on a cold start)
+            cap: Maximum tokens that can be saved up
+        """
+        self.ratio = ratio
+        self.cap = cap
+        self._tokens = initial
+        self._lock = threading.Lock()
+    
+    def deposit(self):
+        """Record a call."""
+        with self._lock:
+            self._tokens = min(self.cap, self._tokens + self.ratio)
+    
+    def withdraw(self) -> bool:
+        """Take one retry token; returns False when the budget is exhausted."""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+    
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry transient failures of idempotent tools.
+    
+    Attributes:
+        max_attempts: Total attempts per call, including the first
+        base_delay: Backoff before the first retry, in seconds
+        max_delay: Upper bound of any single backoff
+        multiplier: Backoff growth per attempt
+        idempotent_tools: Glob patterns of tools that are safe to call twice
+        budget: Shared retry budget (None for unlimited retries)
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    multiplier: float = 2.0
+    idempotent_tools: Tuple[str, ...] = DEFAULT_IDEMPOTENT_TOOLS
+    budget: Optional[RetryBudget] = field(default_factory=RetryBudget)
+    
+    def is_idempotent(self, tool_name: str) -> bool:
+        return matches_tool(tool_name, self.idempotent_tools)
+    
+    def backoff(self, retry: int) -> float:
+        """
+        Delay before a retry, with full jitter.
+        
+        Args:
+            retry: Retry number (1 for the first retry)
+        
+        Returns:
+            Seconds drawn uniformly from [0, min(max_delay, base_delay * multiplier ** (retry - 1))]
+        """
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return random.uniform(0, ceiling)
+    
+    def should_retry(self, tool_name: str, error: BaseException, attempt: int) -> bool:
+        """
+        Decide whether a failed attempt is retried (consumes budget when it is).
+        
+        Args:
+            tool_name: Tool that was called
+            error: Exception raised by the attempt
+            attempt: Number of the attempt that failed (1-based)
+        """
+        if attempt >= self.max_attempts or not self.is_idempotent(tool_name):
+            return False
+        if not is_transient_error(error):
+            return False
+        return self.budget is None or self.budget.withdraw()
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies with percentile lookup."""
+    
+    def __init__(self, size: int = DEFAULT_LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile in seconds, or None without samples."""
+        with self._lock:
+            if not self._samples:
+                return None
+            values = sorted(self._samples)
+        index = min(len(values) - 1, int(round((len(values) - 1) * p / 100)))
+        return values[index]
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Send a second copy of a slow call and use the first answer.
+    
+    The hedge delay is the given percentile of the tool's recent latencies,
+    so only the slowest few percent of calls are duplicated. Until enough
+    samples exist, ``initial_delay`` is used.
+    
+    Attributes:
+        percentile: Latency percentile after which a hedge is sent
+        min_delay: Lower bound of the hedge delay
+        initial_delay: Delay used before min_samples latencies were seen
+        min_samples: Samples needed before the percentile is trusted
+        idempotent_tools: Glob patterns of tools that may be hedged
+        budget: Shared hedge budget (None for unlimited hedges). When a server
+            slows down as a whole, every call crosses the stale p95 and would
+            be sent twice; the budget keeps hedges near 10% of calls.
+    """
+    percentile: float = 95.0
+    min_delay: float = 0.05
+    initial_delay: float = 1.0
+    min_samples: int = 20
+    idempotent_tools: Tuple[str, ...] = DEFAULT_IDEMPOTENT_TOOLS
+    budget: Optional[RetryBudget] = field(default_factory=lambda: RetryBudget(ratio=0.1))
+    _windows: Dict[str, LatencyWindow] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    
+    def window(self, key: str) -> LatencyWindow:
+        """Latency window for a key (normally "server/tool")."""
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = LatencyWindow()
+            return window
+    
+    def delay(self, key: str) -> float:
+        """Seconds to wait before sending a hedge."""
+        window = self.window(key)
+        if len(window) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, window.percentile(self.percentile))
+    
+    def is_idempotent(self, tool_name: str) -> bool:
+        return matches_tool(tool_name, self.idempotent_tools)
+
+
+class HedgeExecutor:
+    """
+    Runs hedged calls.
+    
+    The first copy of a call runs on a bounded pool of reused threads. When
+    every worker is busy the call runs unhedged on the caller's thread
+    instead of queueing, so a first copy never waits for a worker and its
+    latency sample never includes queueing delay. A hedge starts on its own
+    thread, so it never queues behind other callers' first copies; hedges
+    are rare and capped by the policy's budget.
+    """
+    
+    def __init__(self, policy: HedgePolicy, max_workers: int = DEFAULT_HEDGE_WORKERS):
+        """
+        Initialize the executor.
+        
+        Args:
+            policy: When to hedge and which latencies to use
+            max_workers: Calls whose first copy runs in the background at once
+        """
+        self.policy = policy
+        self.max_workers = max_workers
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-hedge-primary")
+    
+    @staticmethod
+    def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+        started = time.monotonic()
+        value = fn()
+        return value, time.monotonic() - started
+    
+    def _run_primary(self, context: contextvars.Context, fn: Callable[[], Any]) -> Tuple[Any, float]:
+        try:
+            return self._timed(lambda: context.run(fn))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def _submit(self, fn: Callable[[], Any]) -> Optional["Future"]:
+        """
+        Start the first copy of a call on a worker, or return None when all are busy.
+        
+        The future's result is (value, seconds the copy ran). The copy runs
+        in a copy of the caller's context (tracing spans).
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._run_primary, contextvars.copy_context(), fn)
+        except RuntimeError:
+            # Shut down: the call still runs, unhedged
+            with self._lock:
+                self._in_flight -= 1
+            return None
+    
+    def _start(self, fn: Callable[[], Any], name: str) -> "Future":
+        """Start a hedge on a new thread; same result as _submit's future."""
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        context = contextvars.copy_context()
+        
+        def run():
+            try:
+                future.set_result(self._timed(lambda: context.run(fn)))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name=name, daemon=True).start()
+        return future
+    
+    @staticmethod
+    def _record(window: LatencyWindow, future: "Future"):
+        if not future.cancelled() and future.exception() is None:
+            window.add(future.result()[1])
+    
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, sending one duplicate if it has not finished after the hedge delay.
+        
+        The first successful answer wins; an error is only raised once both
+        copies have failed. The losing copy is left to finish in the
+        background. No hedge is sent when the budget is exhausted or every
+        worker is busy; the call then simply waits for its first copy.
+        
+        Args:
+            key: Latency window to use, normally "server/tool"
+            fn: The call to make
+        
+        Returns:
+            Result of the first copy to succeed
+        """
+        window = self.policy.window(key)
+        budget = self.policy.budget
+        if budget is not None:
+            budget.deposit()
+        
+        primary = self._submit(fn)
+        if primary is None:
+            result, duration = self._timed(fn)
+            window.add(duration)
+            return result
+        
+        done, _ = wait([primary], timeout=self.policy.delay(key))
+        if done or (budget is not None and not budget.withdraw()):
+            result, duration = primary.result()
+            window.add(duration)
+            return result
+        
+        with self._lock:
+            self.hedges_sent += 1
+        # The first copy's latency is recorded when it finishes, even after
+        # the hedge won: recording only winners would drop the slow tail
+        # and drag the hedge delay down until nearly every call is hedged
+        primary.add_done_callback(lambda future: self._record(window, future))
+        hedge = self._start(fn, "mcp-hedge")
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    result, _ = future.result()
+                    if future is hedge:
+                        with self._lock:
+                            self.hedges_won += 1
+                    return result
+                error = future.exception()
+        raise error
+    
+    def close(self):
+        """Stop the workers once they are idle; copies still running finish in the background."""
+        self._executor.shutdown(wait=False)
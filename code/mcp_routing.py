@@ -0,0 +1,140 @@
+"""
+Latency-aware routing across equivalent endpoints
+
+A logical server in mcp.json can list several endpoints serving the same
+index (e.g. mirrors in other workspaces or regions). Each call goes to the
+endpoint with the lowest expected cost, where cost is the endpoint's
+exponentially weighted moving average (EWMA) latency scaled by the calls
+it already has in flight. Rather than scanning every endpoint, the router
+samples two at random and takes the cheaper one ("power of two choices"),
+which spreads load nearly as well as a full scan and avoids every caller
+piling onto the same endpoint at once.
+
+Config forms accepted for an mcpServers entry:
+    "url": "https://..."                                   (single endpoint)
+    "urls": ["https://...", "https://..."]
+    "endpoints": [{"url": "https://...", "profile": "other-workspace"}, ...]
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Weight of the newest latency sample in the EWMA
+DEFAULT_EWMA_ALPHA = 0.3
+
+# After this many seconds without a sample, an endpoint's EWMA decays back towards
+# zero so that a once-slow endpoint is tried again
+DEFAULT_EWMA_DECAY = 60.0
+
+
+def endpoint_configs(server_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    List the endpoints of a server entry.
+    
+    Args:
+        server_config: One entry of mcpServers
+    
+    Returns:
+        One dict per endpoint, each with at least a "url" key (empty if none is configured)
+    
+    Raises:
+        ValueError: If an endpoint has no URL
+    """
+    if 'endpoints' in server_config:
+        endpoints = [{'url': e} if isinstance(e, str) else dict(e) for e in server_config['endpoints']]
+    elif 'urls' in server_config:
+        endpoints = [{'url': url} for url in server_config['urls']]
+    elif server_config.get('url'):
+        endpoints = [{'url': server_config['url']}]
+    else:
+        endpoints = []
+    
+    for endpoint in endpoints:
+        if not endpoint.get('url'):
+            raise ValueError(f"Endpoint without a url: {endpoint}")
+    return endpoints
+
+
+def endpoint_label(server_name: str, index: int, count: int) -> str:
+    """Name of an endpoint in health reports: the server name, or server[i] for multi-endpoint servers."""
+    return server_name if count == 1 else f"{server_name}[{index}]"
+
+
+class EndpointStats:
+    """Load and latency of one endpoint, as seen by this process."""
+    
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA, decay: float = DEFAULT_EWMA_DECAY):
+        self.alpha = alpha
+        self.decay = decay
+        self.ewma: Optional[float] = None
+        self.outstanding = 0
+        self.calls = 0
+        self._last_sample = 0.0
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Record a call being sent."""
+        with self._lock:
+            self.outstanding += 1
+    
+    def finish(self, latency: float, failed: bool = False):
+        """
+        Record a finished call.
+        
+        Args:
+            latency: Seconds the call took
+            failed: Whether the call raised; failures count as at least the current EWMA
+                    so that an endpoint failing fast does not look attractive
+        """
+        with self._lock:
+            self.outstanding = max(0, self.outstanding - 1)
+            self.calls += 1
+            if failed and self.ewma is not None:
+                latency = max(latency, self.ewma * 2)
+            if self.ewma is None:
+                self.ewma = latency
+            else:
+                self.ewma = self.alpha * latency + (1 - self.alpha) * self.ewma
+            self._last_sample = time.monotonic()
+    
+    def cost(self) -> float:
+        """Expected cost of one more call: EWMA latency times (outstanding calls + 1)."""
+        with self._lock:
+            if self.ewma is None:
+                # Unmeasured endpoints are tried first
+                return 0.0
+            ewma = self.ewma
+            idle = time.monotonic() - self._last_sample
+            if idle > self.decay:
+                ewma *= self.decay / idle
+            return ewma * (self.outstanding + 1)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ewma_ms': round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            'outstanding': self.outstanding,
+            'calls': self.calls,
+        }
+
+
+def pick_two_choices(stats: Sequence[EndpointStats], rng: Optional[random.Random] = None) -> int:
+    """
+    Choose an endpoint by power of two choices.
+    
+    Args:
+        stats: Stats of the candidate endpoints
+        rng: Random source (module random if None)
+    
+    Returns:
+        Index into stats of the chosen endpoint
+    """
+    if not stats:
+        raise ValueError("No endpoints to choose from")
+    if len(stats) == 1:
+        return 0
+    
+    rng = rng or random
+    first, second = rng.sample(range(len(stats)), 2)
+    return first if stats[first].cost() <= stats[second].cost() else second
@@ -0,0 +1,180 @@
+"""
+Client-side validation of tool parameters
+
+Parameters are validated against the tool's input_schema before a call is
+sent: a malformed argument fails immediately instead of after a round trip
+(or, in a batch, thousands of them), and defaults declared in the schema are
+filled in.
+
+Validation uses jsonschema (installed with the mcp package), for the draft
+the schema declares (2020-12 when it declares none). A validator is built
+once per tool and kept with the tool's ToolInfo. jsonschema is imported when
+the first validator is built, because its ~60 ms of imports would otherwise
+be paid by commands that never call a tool. A pattern Python cannot compile
+is dropped from the schema, and a schema jsonschema rejects (or a missing
+jsonschema) leaves the parameters unchecked, for the server to enforce.
+"""
+
+import copy
+import re
+from typing import Any, Dict, List, Optional
+
+# Path shown for errors on the parameters object itself
+ROOT_PATH = "parameters"
+
+# Keywords whose values are data, not subschemas
+_DATA_KEYWORDS = ('enum', 'const', 'default', 'examples')
+
+# Nesting followed when filling in defaults (bounds recursive $refs)
+_MAX_DEFAULTS_DEPTH = 32
+
+
+class ToolValidationError(ValueError):
+    """Raised when tool parameters do not match the tool's input schema."""
+    
+    def __init__(self, tool_name: str, errors: List[str]):
+        super().__init__(f"Invalid parameters for tool '{tool_name}': {'; '.join(errors)}")
+        self.tool_name = tool_name
+        self.errors = errors
+
+
+def _child(path: str, key: Any) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return key if path == ROOT_PATH else f"{path}.{key}"
+
+
+def _is_valid_regex(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return True
+
+
+def _drop_invalid_patterns(schema: Any) -> Any:
+    """Copy of a schema without pattern/patternProperties regexes that do not compile."""
+    if isinstance(schema, list):
+        return [_drop_invalid_patterns(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    
+    result = {}
+    for key, value in schema.items():
+        if key in _DATA_KEYWORDS:
+            result[key] = value
+        elif key == 'pattern' and isinstance(value, str):
+            if _is_valid_regex(value):
+                result[key] = value
+        elif key == 'patternProperties' and isinstance(value, dict):
+            result[key] = {regex: _drop_invalid_patterns(sub) for regex, sub in value.items()
+                           if _is_valid_regex(regex)}
+        else:
+            result[key] = _drop_invalid_patterns(value)
+    return result
+
+
+def _resolve(root: Any, ref: str) -> Any:
+    """Resolve a local JSON pointer ("#/$defs/Filter"); anything else resolves to None."""
+    if not ref.startswith('#'):
+        return None
+    node = root
+    for part in ref[1:].split('/'):
+        if not part:
+            continue
+        part = part.replace('~1', '/').replace('~0', '~')
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def _with_defaults(schema: Any, value: Any, root: Any, depth: int = 0) -> Any:
+    """
+    Fill in property defaults, following properties, items, allOf and local $refs.
+    
+    Returns a new value where anything was added; the caller's value is never modified.
+    """
+    if not isinstance(schema, dict) or depth > _MAX_DEFAULTS_DEPTH:
+        return value
+    
+    if isinstance(schema.get('$ref'), str):
+        value = _with_defaults(_resolve(root, schema['$ref']), value, root, depth + 1)
+    for sub in schema.get('allOf') or ():
+        value = _with_defaults(sub, value, root, depth + 1)
+    
+    properties = schema.get('properties')
+    if isinstance(value, dict) and isinstance(properties, dict):
+        value = dict(value)
+        for name, sub in properties.items():
+            if name in value:
+                value[name] = _with_defaults(sub, value[name], root, depth + 1)
+            elif isinstance(sub, dict) and 'default' in sub:
+                # Mutable defaults are copied so calls never share them
+                value[name] = copy.deepcopy(sub['default'])
+    elif isinstance(value, list) and isinstance(schema.get('items'), dict):
+        value = [_with_defaults(schema['items'], item, root, depth + 1) for item in value]
+    return value
+
+
+def _build_validator(schema: Dict[str, Any]) -> Any:
+    """jsonschema validator for a schema, or None if it cannot be checked client-side."""
+    try:
+        from jsonschema.exceptions import SchemaError
+        from jsonschema.validators import validator_for
+    except ImportError:
+        return None
+    
+    validator_class = validator_for(schema)
+    try:
+        validator_class.check_schema(schema)
+    except SchemaError:
+        return None
+    return validator_class(schema)
+
+
+class ToolValidator:
+    """Validator built from one tool's input schema."""
+    
+    def __init__(self, tool_name: str, schema: Optional[Dict[str, Any]]):
+        """
+        Build a validator.
+        
+        Args:
+            tool_name: Tool the schema belongs to (used in error messages)
+            schema: The tool's input_schema (None accepts any parameters object)
+        """
+        self.tool_name = tool_name
+        self.schema = schema
+        self._schema = _drop_invalid_patterns(schema) if isinstance(schema, dict) else {}
+        self._validator = _build_validator(self._schema)
+    
+    def validate(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check parameters and fill in defaults.
+        
+        Args:
+            parameters: Parameters for a call of the tool
+        
+        Returns:
+            A copy of the parameters with schema defaults applied
+        
+        Raises:
+            ToolValidationError: Listing every problem found
+        """
+        if not isinstance(parameters, dict):
+            raise ToolValidationError(self.tool_name, [f"{ROOT_PATH}: expected object, got {type(parameters).__name__}"])
+        
+        result = _with_defaults(self._schema, dict(parameters), self._schema)
+        if self._validator is None:
+            return result
+        
+        errors = []
+        for error in self._validator.iter_errors(result):
+            path = ROOT_PATH
+            for key in error.absolute_path:
+                path = _child(path, key)
+            errors.append(f"{path}: {error.message}")
+        if errors:
+            raise ToolValidationError(self.tool_name, sorted(errors))
+        return result
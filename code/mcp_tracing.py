@@ -0,0 +1,310 @@
+"""
+Lightweight tracing for the MCP client and CLI
+
+Spans time the phases of a command (config load, auth, client init,
+discovery, tool call, decode, render) so that a slow command can be
+attributed to a phase. The active tracer and the current span live in
+context variables: concurrent daemon requests each trace into their own
+file, and spans cost next to nothing when tracing is off.
+
+Spans are written one per line as JSON in the shape of OTLP/JSON spans
+(traceId, spanId, parentSpanId, name, startTimeUnixNano, endTimeUnixNano,
+attributes, status), so they can be loaded by OpenTelemetry tooling or
+inspected with jq.
+"""
+
+import contextvars
+import json
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from mcp_env import getenv
+
+# Environment variable naming a trace file to append spans to
+TRACE_FILE_ENV = "MCP_TRACE_FILE"
+
+SERVICE_NAME = "mcp-unity-catalog"
+
+# OpenTelemetry status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP/JSON AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+@dataclass
+class Span:
+    """One timed phase."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+    
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (0 while the span is open)."""
+        return max(0, self.end_ns - self.start_ns) / 1e9
+    
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+    
+    def set_error(self, error: BaseException):
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+    
+    def to_otel(self) -> Dict[str, Any]:
+        """Convert to an OTLP/JSON span, with the resource inlined."""
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)}
+                           for key, value in self.attributes.items()],
+            "status": {"code": self.status_code},
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]}
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+
+class Tracer:
+    """Collects finished spans and appends them to a JSONL trace file."""
+    
+    def __init__(self, trace_file: Optional[str] = None, collect: bool = False):
+        """
+        Initialize the tracer.
+        
+        Args:
+            trace_file: File to append one JSON span per line to (None to skip)
+            collect: Keep finished spans in memory (for a timings summary)
+        """
+        self.trace_file = trace_file
+        self.collect = collect
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span):
+        """Record a finished span."""
+        with self._lock:
+            if self.collect:
+                self.spans.append(span)
+            if self.trace_file:
+                if self._file is None:
+                    self._file = open(self.trace_file, 'a', encoding='utf-8')
+                self._file.write(json.dumps(span.to_otel()) + '\n')
+    
+    def close(self):
+        """Flush and close the trace file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_current_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar('mcp_tracer', default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('mcp_span', default=None)
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the tracer active in this context, if any."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def tracing(trace_file: Optional[str] = None, collect: bool = False) -> Iterator[Optional[Tracer]]:
+    """
+    Activate a tracer for the code inside the block.
+    
+    Args:
+        trace_file: JSONL file to append spans to (None to skip)
+        collect: Keep spans in memory for summarize_spans()
+    
+    Yields:
+        The Tracer, or None when neither option is set (tracing stays off)
+    """
+    if not trace_file and not collect:
+        yield None
+        return
+    
+    tracer = Tracer(trace_file, collect)
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+        tracer.close()
+
+
+def _new_span(tracer: Tracer, name: str, start_ns: int, attributes: Dict[str, Any]) -> Span:
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent else tracer.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id if parent else None,
+        start_ns=start_ns,
+        attributes={key: value for key, value in attributes.items() if value is not None}
+    )
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the code inside the block as a child of the current span.
+    
+    Exceptions mark the span as failed and are re-raised.
+    
+    Args:
+        name: Phase name, e.g. "client.initialize"
+        **attributes: Span attributes (None values are dropped)
+    
+    Yields:
+        The Span, or None when tracing is off
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    
+    current = _new_span(tracer, name, time.time_ns(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        tracer.export(current)
+
+
+def set_attributes(**attributes: Any):
+    """Add attributes to the current span (no-op when tracing is off)."""
+    current = _current_span.get()
+    if current is not None:
+        for key, value in attributes.items():
+            current.set_attribute(key, value)
+
+
+def record_span(name: str, duration: float, **attributes: Any):
+    """
+    Record an already finished child span ending now.
+    
+    Used for phases interleaved with other work, e.g. decoding rows while
+    they are being rendered.
+    
+    Args:
+        name: Phase name
+        duration: Total seconds spent in the phase
+        **attributes: Span attributes
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return
+    
+    end_ns = time.time_ns()
+    finished = _new_span(tracer, name, end_ns - int(duration * 1e9), attributes)
+    finished.end_ns = end_ns
+    tracer.export(finished)
+
+
+def propagate_context(fn: Callable) -> Callable:
+    """
+    Bind fn to a copy of the current context.
+    
+    New threads start with an empty context; wrapping the target lets spans
+    created in worker threads join the caller's trace. Each invocation runs
+    in its own copy, so the wrapper can be called from several threads at once.
+    """
+    context = contextvars.copy_context()
+    
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def summarize_spans(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    Aggregate spans by name.
+    
+    Args:
+        spans: Finished spans
+    
+    Returns:
+        One dict per phase (name, depth, count, total, max), ordered by first start
+    """
+    by_id = {s.span_id: s for s in spans}
+    
+    def depth(s: Span) -> int:
+        level = 0
+        while s.parent_span_id in by_id:
+            s = by_id[s.parent_span_id]
+            level += 1
+        return level
+    
+    phases: Dict[str, Dict[str, Any]] = {}
+    for s in sorted(spans, key=lambda s: s.start_ns):
+        phase = phases.setdefault(s.name, {
+            "name": s.name, "depth": depth(s), "count": 0, "total": 0.0, "max": 0.0, "errors": 0
+        })
+        phase["count"] += 1
+        phase["total"] += s.duration
+        phase["max"] = max(phase["max"], s.duration)
+        if s.status_code == STATUS_ERROR:
+            phase["errors"] += 1
+    return list(phases.values())
+
+
+def display_timings(spans: List[Span], stream: Optional[TextIO] = None):
+    """
+    Print a per-phase timing summary.
+    
+    Args:
+        spans: Finished spans
+        stream: Output stream (default: stderr, so data on stdout is untouched)
+    """
+    stream = stream or sys.stderr
+    print("\n⏱️  Timings", file=stream)
+    print(f"{'phase':<36} {'count':>5} {'total ms':>10} {'max ms':>10}", file=stream)
+    print("-" * 64, file=stream)
+    for phase in summarize_spans(spans):
+        label = "  " * phase["depth"] + phase["name"]
+        if phase["errors"]:
+            label += f" ({phase['errors']} failed)"
+        print(f"{label:<36} {phase['count']:>5} {phase['total'] * 1000:>10.1f} {phase['max'] * 1000:>10.1f}",
+              file=stream)
+
+
+def default_trace_file() -> Optional[str]:
+    """Return the trace file named by MCP_TRACE_FILE, if set."""
+    return getenv(TRACE_FILE_ENV) or None
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Offline MCP client benchmark
+
+Starts a local fake MCP server (see fake_mcp_server.py) and measures the
+latency of the client's hot paths at several concurrency levels:
+    
+    initialize   MCPClient.initialize() against a fresh client (pooled session)
+    list_tools   Fetching the tool catalog from the server
+    call_tool    MCPClient.call_tool() on the search tool
+    discovery    Concurrent discovery of --servers servers (concurrency = discovery workers)
+    render       display_results() on a search result (output discarded)
+
+Each operation reports p50/p95/p99 latency and throughput. Results can be
+saved with --save and compared against an earlier run with --baseline.
+
+Usage:
+    python scripts/benchmark_mcp.py
+    python scripts/benchmark_mcp.py --latency 0.05 --payload-rows 200 --concurrency 1,8,32
+    python scripts/benchmark_mcp.py --save before.json
+    python scripts/benchmark_mcp.py --baseline before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'code'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_mcp_server import FakeMCPServer, FakeServerSettings, SEARCH_TOOL_NAME
+from mcp_client import MCPClient, MCPClientManager, TOOL_CACHE_OFF, display_results, is_error_result
+from mcp_discovery import STATUS_OK, iter_discover_servers, build_tool_registry
+from mcp_pool import WorkspaceSessionPool
+
+OPERATIONS = ('initialize', 'list_tools', 'call_tool', 'discovery', 'render')
+DEFAULT_CONCURRENCY = "1,4,16"
+DEFAULT_ITERATIONS = 50
+DEFAULT_WARMUP = 2
+BENCH_TOKEN = "bench-token"
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency statistics of one operation at one concurrency level."""
+    operation: str
+    concurrency: int
+    iterations: int
+    errors: int
+    wall_time: float
+    latencies: List[float] = field(default_factory=list, repr=False)
+    
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile latency in seconds (linear interpolation)."""
+        if not self.latencies:
+            return 0.0
+        values = sorted(self.latencies)
+        rank = (len(values) - 1) * p / 100
+        lower = int(rank)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+    
+    @property
+    def throughput(self) -> float:
+        """Completed operations per second."""
+        return self.iterations / self.wall_time if self.wall_time > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data['latencies']
+        data.update(
+            p50=self.percentile(50),
+            p95=self.percentile(95),
+            p99=self.percentile(99),
+            throughput=self.throughput
+        )
+        return data
+
+
+def run_concurrent(operation: str, fn: Callable[[int], Any], iterations: int,
+                   concurrency: int, warmup: int = DEFAULT_WARMUP) -> BenchmarkResult:
+    """
+    Run fn(i) iterations times on concurrency threads, timing each call.
+    
+    Args:
+        operation: Operation name for the result
+        fn: Callable receiving the iteration number; raising counts as an error
+        iterations: Number of measured calls
+        concurrency: Number of calls in flight at once
+        warmup: Unmeasured calls made first
+    
+    Returns:
+        BenchmarkResult
+    """
+    for i in range(warmup):
+        try:
+            fn(-1 - i)
+        except Exception:
+            pass
+    
+    def timed(i: int):
+        start = time.perf_counter()
+        try:
+            fn(i)
+            return time.perf_counter() - start, False
+        except Exception:
+            return time.perf_counter() - start, True
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, range(iterations)))
+    wall_time = time.perf_counter() - start
+    
+    return BenchmarkResult(
+        operation=operation,
+        concurrency=concurrency,
+        iterations=iterations,
+        errors=sum(1 for _, failed in outcomes if failed),
+        wall_time=wall_time,
+        latencies=[latency for latency, _ in outcomes]
+    )
+
+
+class _LocalClientManager(MCPClientManager):
+    """Manager that keeps the http:// scheme of the fake server's URLs."""
+    
+    def _create_client(self, server_name: str, workspace_hostname: str, token: str, url: str) -> MCPClient:
+        # The base class drops the scheme, which makes the SDK probe https://
+        workspace_hostname = url.split('/api/', 1)[0]
+        return super()._create_client(server_name, workspace_hostname, token, url)
+
+
+class MCPBenchmark:
+    """Benchmark operations against one fake server."""
+    
+    def __init__(self, server: FakeMCPServer, server_count: int, work_dir: str):
+        """
+        Initialize the benchmark.
+        
+        Args:
+            server: Running fake MCP server
+            server_count: Number of servers configured for the discovery benchmark
+            work_dir: Directory for the generated mcp.json
+        """
+        self.server = server
+        self.session_pool = WorkspaceSessionPool()
+        self.client = MCPClient(server.host, BENCH_TOKEN, server.url, session_pool=self.session_pool)
+        if not self.client.initialize():
+            raise RuntimeError(f"Could not initialize a client against {server.url}")
+        
+        self.search_result = self.client.call_tool(SEARCH_TOOL_NAME, {"query": "benchmark"}, verbose=False)
+        
+        self.config_path = os.path.join(work_dir, "mcp.json")
+        servers = {
+            f"bench-{index}": {"url": server.url, "headers": {"Authorization": f"Bearer {BENCH_TOKEN}"}}
+            for index in range(server_count)
+        }
+        with open(self.config_path, 'w') as f:
+            json.dump({"mcpServers": servers}, f)
+    
+    def initialize(self, i: int):
+        client = MCPClient(self.server.host, BENCH_TOKEN, self.server.url, session_pool=self.session_pool)
+        if not client.initialize():
+            raise RuntimeError("initialize failed")
+    
+    def list_tools(self, i: int):
+        self.client._fetch_tools()
+    
+    def call_tool(self, i: int):
+        result = self.client.call_tool(SEARCH_TOOL_NAME, {"query": f"query {i}"}, verbose=False)
+        if is_error_result(result):
+            raise RuntimeError("tool returned an error result")
+    
+    def render(self, i: int):
+        display_results(self.search_result)
+    
+    def run(self, operation: str, concurrency: int, iterations: int, warmup: int) -> BenchmarkResult:
+        """Run one operation at one concurrency level."""
+        if operation == 'discovery':
+            return self._run_discovery(concurrency, iterations, warmup)
+        return run_concurrent(operation, getattr(self, operation), iterations, concurrency, warmup)
+    
+    def _run_discovery(self, workers: int, iterations: int, warmup: int) -> BenchmarkResult:
+        # Discovery is concurrent internally, so runs are sequential and the
+        # concurrency level is the number of discovery workers
+        def discover(i: int):
+            manager = _LocalClientManager(self.config_path, tool_cache_mode=TOOL_CACHE_OFF,
+                                         session_pool=self.session_pool)
+            results = list(iter_discover_servers(manager, manager.list_servers(), max_workers=workers))
+            build_tool_registry(results)
+            if any(result.status != STATUS_OK for result in results):
+                raise RuntimeError("discovery failed for some servers")
+        
+        result = run_concurrent('discovery', discover, iterations, 1, warmup)
+        result.concurrency = workers
+        return result
+    
+    def close(self):
+        self.session_pool.close()
+
+
+def display_report(results: List[BenchmarkResult], baseline: Optional[Dict[str, Dict[str, Any]]] = None):
+    """Print a latency table, with changes against a baseline run if given."""
+    header = f"{'operation':<12} {'conc':>4} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>8}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header)
+    print("-" * len(header))
+    
+    for result in results:
+        line = (f"{result.operation:<12} {result.concurrency:>4} {result.iterations:>5} {result.errors:>4} "
+                f"{result.percentile(50) * 1000:>9.2f} {result.percentile(95) * 1000:>9.2f} "
+                f"{result.percentile(99) * 1000:>9.2f} {result.throughput:>8.1f}")
+        if baseline:
+            previous = baseline.get(f"{result.operation}@{result.concurrency}")
+            for p in (50, 95):
+                if previous and previous.get(f"p{p}"):
+                    change = (result.percentile(p) - previous[f"p{p}"]) / previous[f"p{p}"] * 100
+                    line += f" {change:>+7.1f}%"
+                else:
+                    line += f" {'n/a':>8}"
+        print(line)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load a file written by --save, keyed by "operation@concurrency"."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {f"{result['operation']}@{result['concurrency']}": result for result in data.get('results', [])}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the MCP client against a local fake MCP server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:", 1)[1]
+    )
+    parser.add_argument('--operations', default=",".join(OPERATIONS),
+                        help=f"Comma-separated operations to run (default: {','.join(OPERATIONS)})")
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY,
+                        help=f"Comma-separated concurrency levels (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help=f"Measured calls per operation and level (default: {DEFAULT_ITERATIONS})")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f"Unmeasured calls before each measurement (default: {DEFAULT_WARMUP})")
+    parser.add_argument('--servers', type=int, default=5,
+                        help='Servers configured for the discovery benchmark (default: 5)')
+    
+    server_group = parser.add_argument_group('fake server')
+    server_group.add_argument('--tools', type=int, default=10, help='Tools in the catalog (default: 10)')
+    server_group.add_argument('--latency', type=float, default=0.0, help='Seconds added to every tool call')
+    server_group.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    server_group.add_argument('--payload-rows', type=int, default=10, help='Rows returned by the search tool')
+    server_group.add_argument('--row-bytes', type=int, default=500, help='Approximate size of each row')
+    server_group.add_argument('--error-rate', type=float, default=0.0, help='Fraction of tool calls that fail (0-1)')
+    server_group.add_argument('--seed', type=int, default=0, help='Random seed for jitter and errors (default: 0)')
+    
+    parser.add_argument('--save', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    
+    operations = [op.strip() for op in args.operations.split(',') if op.strip()]
+    unknown = [op for op in operations if op not in OPERATIONS]
+    if unknown:
+        print(f"❌ Unknown operation(s): {', '.join(unknown)}")
+        return 1
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    
+    # Keep per-request HTTP logging out of the measurements and the report
+    for name in ('httpx', 'httpx2', 'mcp', 'databricks'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    
+    settings = FakeServerSettings(
+        tool_count=args.tools,
+        latency=args.latency,
+        jitter=args.jitter,
+        payload_rows=args.payload_rows,
+        row_bytes=args.row_bytes,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    
+    print("⏱️  MCP Client Benchmark")
+    print("=" * 50)
+    print(f"Fake server: {settings.tool_count} tools, {settings.latency * 1000:.0f}ms latency "
+          f"(+{settings.jitter * 1000:.0f}ms jitter), {settings.payload_rows} rows x {settings.row_bytes}B, "
+          f"{settings.error_rate:.0%} errors")
+    
+    results: List[BenchmarkResult] = []
+    with FakeMCPServer(settings) as server, tempfile.TemporaryDirectory() as work_dir:
+        with open(os.devnull, 'w') as devnull:
+            with redirect_stdout(devnull):
+                benchmark = MCPBenchmark(server, args.servers, work_dir)
+            try:
+                for operation in operations:
+                    for level in levels:
+                        print(f"🏃 {operation} (concurrency {level})...")
+                        with redirect_stdout(devnull):
+                            results.append(benchmark.run(operation, level, args.iterations, args.warmup))
+            except KeyboardInterrupt:
+                print("⚠️  Interrupted, reporting completed measurements")
+            finally:
+                benchmark.close()
+    
+    print()
+    display_report(results, baseline)
+    
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                "created_at": time.time(),
+                "settings": asdict(settings),
+                "iterations": args.iterations,
+                "results": [result.to_dict() for result in results]
+            }, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for CLI startup
+
+Runs lightweight mcp_cli.py commands under ``python -X importtime`` and
+fails when one of them imports a heavy dependency (the Databricks SDK,
+databricks_mcp, requests, mcp, ...) or spends more than the budget on
+imports. These commands never contact a server, so they should only pay
+for the standard library and the small mcp_* modules.
+
+Each command runs in a temporary directory with a minimal .cursor/mcp.json
+and --no-daemon, so the check needs no credentials or network access.
+
+Usage:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 200 --repeat 5
+    python scripts/check_import_time.py --verbose
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CLI_PATH = Path(__file__).resolve().parent.parent / 'code' / 'mcp_cli.py'
+
+# Commands that must start without any heavy import
+LIGHT_COMMANDS = [
+    ['--help'],
+    ['list-servers'],
+    ['--output', 'json', 'list-servers'],
+    ['health'],
+]
+
+# Top-level packages that only code paths contacting a server may import
+HEAVY_MODULES = ('databricks', 'databricks_mcp', 'requests', 'mcp', 'mlflow', 'httpx', 'httpx2', 'anyio')
+
+# Import time allowed per command, in milliseconds (interpreter startup excluded)
+DEFAULT_BUDGET_MS = 150.0
+
+SAMPLE_CONFIG = {
+    "mcpServers": {
+        "wikipedia-search": {
+            "type": "streamable-http",
+            "url": "https://example.cloud.databricks.com/api/2.0/mcp/vector-search/catalog/schema",
+            "headers": {"Authorization": "Bearer placeholder"}
+        }
+    }
+}
+
+
+@dataclass
+class ImportProfile:
+    """Imports made by one command."""
+    total_us: int = 0
+    modules: Dict[str, int] = field(default_factory=dict)
+    
+    @property
+    def total_ms(self) -> float:
+        return self.total_us / 1000
+    
+    def heavy_modules(self) -> List[str]:
+        """Heavy top-level packages that were imported."""
+        return sorted({name.split('.')[0] for name in self.modules} & set(HEAVY_MODULES))
+    
+    def slowest(self, count: int = 10) -> List[tuple]:
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def parse_importtime(stderr: str) -> ImportProfile:
+    """
+    Parse ``-X importtime`` output.
+    
+    Modules imported by ``site`` during interpreter startup are excluded,
+    since no change to this repository affects them.
+    
+    Args:
+        stderr: Standard error of a ``python -X importtime`` run
+    
+    Returns:
+        ImportProfile with the summed self time and per-module cumulative times
+    """
+    profile = ImportProfile()
+    pending: List[tuple] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip(' ')) - 1) // 2
+        
+        # Children are reported before their parent; drop everything site pulled in
+        pending.append((depth, name, self_us, cumulative_us))
+        if depth == 0:
+            if name != 'site':
+                for _, child, child_self, child_cumulative in pending:
+                    profile.total_us += child_self
+                    profile.modules[child] = child_cumulative
+            pending = []
+    return profile
+
+
+def profile_command(argv: List[str], cwd: str) -> ImportProfile:
+    """Run one CLI command under -X importtime and profile its imports."""
+    env = {**os.environ, 'MLFLOW_DISABLE_AGENT_HINT': '1', 'MCP_CACHE_DIR': os.path.join(cwd, 'cache')}
+    env.pop('MCP_TRACE_FILE', None)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(CLI_PATH), '--no-daemon', *argv],
+        cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    return parse_importtime(completed.stderr)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check that lightweight CLI commands start without heavy imports",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:", 1)[1]
+    )
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'Import time allowed per command in ms (default: {DEFAULT_BUDGET_MS:.0f})')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per command; the fastest counts, to filter out noise (default: 3)')
+    parser.add_argument('--verbose', action='store_true', help='Show the slowest imports of every command')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, '.cursor'))
+        with open(os.path.join(workdir, '.cursor', 'mcp.json'), 'w') as f:
+            json.dump(SAMPLE_CONFIG, f)
+        
+        print(f"⏱️  Import budget: {args.budget_ms:.0f} ms per command")
+        for command in LIGHT_COMMANDS:
+            runs = [profile_command(command, workdir) for _ in range(max(1, args.repeat))]
+            profile = min(runs, key=lambda run: run.total_us)
+            heavy = sorted({module for run in runs for module in run.heavy_modules()})
+            label = ' '.join(command)
+            
+            if heavy:
+                failures += 1
+                print(f"❌ {label}: imports {', '.join(heavy)} ({profile.total_ms:.0f} ms)")
+            elif profile.total_ms > args.budget_ms:
+                failures += 1
+                print(f"❌ {label}: {profile.total_ms:.0f} ms of imports, over budget")
+            else:
+                print(f"✅ {label}: {profile.total_ms:.0f} ms of imports")
+            
+            if args.verbose or heavy or profile.total_ms > args.budget_ms:
+                for name, cumulative_us in profile.slowest():
+                    print(f"     {cumulative_us / 1000:8.1f} ms  {name}")
+    
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
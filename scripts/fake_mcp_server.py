@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Databricks MCP server
+
+Serves a streamable-http MCP endpoint on 127.0.0.1 that looks like a
+Databricks vector search server (a "wikipedia_docsearch" tool plus any
+number of filler tools), with configurable latency, payload size and error
+injection. It also answers the workspace's /.well-known/databricks-config
+probe so that the real MCPClient (WorkspaceClient + DatabricksMCPClient)
+can talk to it without any network access.
+
+Usage:
+    python scripts/fake_mcp_server.py --port 8765 --latency 0.05 --payload-rows 50
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import anyio
+import uvicorn
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+# mcp 2.x renamed FastMCP to MCPServer
+try:
+    from mcp.server.mcpserver import MCPServer
+    from mcp.server.mcpserver.exceptions import ToolError
+    MCP_V2 = True
+except ImportError:
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp.exceptions import ToolError
+    MCP_V2 = False
+
+# Path of the MCP endpoint, shaped like a Databricks vector search URL
+DEFAULT_MCP_PATH = "/api/2.0/mcp/vector-search/bench/wikipedia"
+
+SEARCH_TOOL_NAME = "bench__wikipedia__docsearch"
+
+
+@dataclass
+class FakeServerSettings:
+    """Behaviour of the fake server."""
+    tool_count: int = 10
+    latency: float = 0.0
+    jitter: float = 0.0
+    payload_rows: int = 10
+    row_bytes: int = 500
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+    path: str = DEFAULT_MCP_PATH
+
+
+def make_search_payload(query: str, rows: int, row_bytes: int) -> str:
+    """
+    Build a vector-search-like JSON payload.
+    
+    Args:
+        query: Search query echoed in the rows
+        rows: Number of result rows
+        row_bytes: Approximate size of each row's content
+    
+    Returns:
+        JSON text with a manifest and a list of {title, url, content, score} rows
+    """
+    filler = ("lorem ipsum dolor sit amet " * (row_bytes // 27 + 1))[:row_bytes]
+    return json.dumps({
+        "manifest": {"columns": [{"name": "title"}, {"name": "url"}, {"name": "content"}, {"name": "score"}]},
+        "result": [
+            {
+                "title": f"{query} ({index})",
+                "url": f"https://en.wikipedia.org/wiki/Bench_{index}",
+                "content": filler,
+                "score": round(1.0 - index / max(rows, 1), 4)
+            }
+            for index in range(rows)
+        ]
+    })
+
+
+def build_app(settings: FakeServerSettings):
+    """
+    Build the ASGI app of the fake server.
+    
+    Args:
+        settings: Server behaviour
+    
+    Returns:
+        Starlette application serving the MCP endpoint and the workspace probe
+    """
+    rng = random.Random(settings.seed)
+    
+    async def delay():
+        seconds = settings.latency + rng.uniform(0, settings.jitter)
+        if seconds > 0:
+            await anyio.sleep(seconds)
+    
+    def maybe_fail(tool_name: str):
+        if settings.error_rate and rng.random() < settings.error_rate:
+            # ToolError is returned to the client as an error result without a server-side traceback
+            raise ToolError(f"Injected failure in {tool_name}")
+    
+    async def docsearch(query: str, num_results: int = 0) -> str:
+        """Search Wikipedia articles (fake)."""
+        await delay()
+        maybe_fail(SEARCH_TOOL_NAME)
+        return make_search_payload(query, num_results or settings.payload_rows, settings.row_bytes)
+    
+    def make_filler_tool(index: int):
+        async def filler(value: str = "") -> str:
+            await delay()
+            maybe_fail(f"tool_{index}")
+            return json.dumps({"tool": index, "value": value})
+        return filler
+    
+    if MCP_V2:
+        server = MCPServer("fake-databricks-mcp")
+    else:
+        server = FastMCP("fake-databricks-mcp", stateless_http=True, json_response=True,
+                         streamable_http_path=settings.path)
+    
+    server.add_tool(docsearch, name=SEARCH_TOOL_NAME, description="Search Wikipedia articles (fake)")
+    for index in range(max(0, settings.tool_count - 1)):
+        server.add_tool(make_filler_tool(index), name=f"bench__tool_{index}",
+                        description=f"Filler tool {index} for catalog size benchmarks")
+    
+    @server.custom_route("/.well-known/databricks-config", methods=["GET"])
+    async def databricks_config(request: Request):
+        # Empty workspace metadata: the SDK falls back to the explicit host/token
+        return JSONResponse({})
+    
+    if MCP_V2:
+        return server.streamable_http_app(streamable_http_path=settings.path,
+                                          stateless_http=True, json_response=True)
+    return server.streamable_http_app()
+
+
+class FakeMCPServer:
+    """
+    Fake MCP server running on a background thread.
+    
+    Usage:
+        with FakeMCPServer(FakeServerSettings(latency=0.05)) as server:
+            client = MCPClient(server.host, "token", server.url)
+    """
+    
+    def __init__(self, settings: Optional[FakeServerSettings] = None, port: int = 0):
+        """
+        Initialize the server.
+        
+        Args:
+            settings: Server behaviour (defaults to FakeServerSettings())
+            port: Port to listen on (0 picks a free port)
+        """
+        self.settings = settings or FakeServerSettings()
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def host(self) -> str:
+        """Workspace host (with scheme) to pass to MCPClient."""
+        return f"http://127.0.0.1:{self.port}"
+    
+    @property
+    def url(self) -> str:
+        """MCP endpoint URL."""
+        return f"{self.host}{self.settings.path}"
+    
+    def start(self, timeout: float = 10.0):
+        """Start serving and wait until the port is bound."""
+        config = uvicorn.Config(build_app(self.settings), host="127.0.0.1", port=self.port,
+                                log_level="warning", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-mcp-server", daemon=True)
+        self._thread.start()
+        
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake MCP server failed to start")
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+    
+    def stop(self):
+        """Stop serving."""
+        if self._server:
+            self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10)
+    
+    def __enter__(self) -> "FakeMCPServer":
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a local fake Databricks MCP server")
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--tools', type=int, default=10, help='Number of tools in the catalog (default: 10)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every tool call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--payload-rows', type=int, default=10, help='Rows returned by the search tool')
+    parser.add_argument('--row-bytes', type=int, default=500, help='Approximate size of each row')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of tool calls that fail (0-1)')
+    parser.add_argument('--seed', type=int, help='Random seed for latency jitter and errors')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    settings = FakeServerSettings(
+        tool_count=args.tools,
+        latency=args.latency,
+        jitter=args.jitter,
+        payload_rows=args.payload_rows,
+        row_bytes=args.row_bytes,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    
+    server = FakeMCPServer(settings, port=args.port)
+    server.start()
+    print(f"🟢 Fake MCP server listening on {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print("🛑 Fake MCP server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,95 +3,165 @@
 Vector Search URL Finder
 
 This script helps users find their Databricks vector search URLs
-by using the Databricks CLI to list catalogs, schemas, and indexes.
+by using the Databricks REST API to list catalogs, schemas, and indexes.
 """
 
+import argparse
 import json
-import subprocess
+import os
 import sys
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Tuple
 
-def run_databricks_command(cmd: List[str]) -> Optional[Dict]:
-    """Run a databricks CLI command and return JSON output."""
-    try:
-        result = subprocess.run(
-            ['databricks'] + cmd + ['--output', 'JSON'],
-            capture_output=True, text=True, timeout=30
-        )
-        
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            print(f"❌ Command failed: {' '.join(cmd)}")
-            print(f"Error: {result.stderr}")
-            return None
-    except subprocess.TimeoutExpired:
-        print(f"⏰ Command timed out: {' '.join(cmd)}")
-        return None
-    except json.JSONDecodeError:
-        print(f"❌ Invalid JSON response from: {' '.join(cmd)}")
-        return None
-    except FileNotFoundError:
-        print("❌ Databricks CLI not found. Please install it first:")
-        print("   pip install databricks-cli")
-        return None
-
-def get_workspace_url() -> Optional[str]:
-    """Get the current workspace URL from Databricks CLI."""
-    try:
-        result = subprocess.run(
-            ['databricks', 'workspace', 'list', '--output', 'JSON'],
-            capture_output=True, text=True, timeout=10
-        )
-        
-        if result.returncode == 0:
-            # Try to extract workspace URL from the command
-            config_result = subprocess.run(
-                ['databricks', 'config', 'get', '--output', 'JSON'],
-                capture_output=True, text=True, timeout=10
-            )
+import requests
+from requests.adapters import HTTPAdapter
+
+# Reuse the profile authentication (and its token cache) from the client code
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'code'))
+
+DEFAULT_PARALLELISM = 8
+REQUEST_TIMEOUT = 30
+PAGE_SIZE = 1000
+
+
+class WorkspaceAPI:
+    """Minimal Databricks REST client sharing one pooled HTTP session."""
+    
+    def __init__(self, host: str, token: str, pool_size: int = DEFAULT_PARALLELISM):
+        self.host = host.rstrip('/')
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def paginate(self, path: str, items_key: str, params: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield items from a paginated GET endpoint, following next_page_token."""
+        params = dict(params or {})
+        while True:
+            response = self.session.get(f"{self.host}{path}", params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+            yield from data.get(items_key, [])
             
-            if config_result.returncode == 0:
-                config = json.loads(config_result.stdout)
-                return config.get('host')
-        
-        return None
-    except:
-        return None
+            page_token = data.get('next_page_token')
+            if not page_token:
+                return
+            params['page_token'] = page_token
+    
+    def list_all(self, path: str, items_key: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Collect every item from a paginated endpoint, reporting errors instead of raising."""
+        try:
+            return list(self.paginate(path, items_key, params))
+        except requests.HTTPError as e:
+            print(f"❌ Request failed: {path} {params or ''}")
+            print(f"Error: {e.response.status_code} {e.response.text[:200]}")
+        except json.JSONDecodeError:
+            print(f"❌ Invalid JSON response from: {path}")
+        except requests.RequestException as e:
+            print(f"❌ Request failed: {path}: {e}")
+        return []
 
-def list_catalogs() -> List[Dict]:
+
+def get_workspace_credentials(profile_name: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get the workspace URL and token for the REST calls.
+    
+    DATABRICKS_HOST/DATABRICKS_TOKEN take precedence; otherwise the Databricks
+    CLI profile is used.
+    """
+    host = os.getenv('DATABRICKS_HOST')
+    token = os.getenv('DATABRICKS_TOKEN')
+    if host and token:
+        return (host if host.startswith('http') else f"https://{host}"), token
+    
+    try:
+        from databricks_profile_auth import DatabricksProfileAuth
+    except ImportError:
+        return None, None
+    
+    profile_auth = DatabricksProfileAuth(profile_name)
+    hostname = profile_auth.get_workspace_hostname()
+    if not hostname:
+        return None, None
+    
+    return f"https://{hostname}", profile_auth.get_token_from_profile()
+
+
+def list_catalogs(api: WorkspaceAPI) -> List[Dict]:
     """List all catalogs."""
     print("🔍 Finding catalogs...")
-    result = run_databricks_command(['unity-catalog', 'catalogs', 'list'])
-    
-    if result and 'catalogs' in result:
-        return result['catalogs']
-    return []
+    return api.list_all('/api/2.1/unity-catalog/catalogs', 'catalogs', {'max_results': PAGE_SIZE})
 
-def list_schemas(catalog_name: str) -> List[Dict]:
+
+def list_schemas(api: WorkspaceAPI, catalog_name: str) -> List[Dict]:
     """List schemas in a catalog."""
-    print(f"🔍 Finding schemas in catalog '{catalog_name}'...")
-    result = run_databricks_command([
-        'unity-catalog', 'schemas', 'list',
-        '--catalog-name', catalog_name
-    ])
-    
-    if result and 'schemas' in result:
-        return result['schemas']
-    return []
-
-def list_vector_indexes(catalog_name: str, schema_name: str) -> List[Dict]:
-    """List vector search indexes in a schema."""
-    print(f"🔍 Finding vector indexes in '{catalog_name}.{schema_name}'...")
-    result = run_databricks_command([
-        'ml', 'vector-search', 'indexes', 'list',
-        '--catalog-name', catalog_name,
-        '--schema-name', schema_name
-    ])
-    
-    if result and 'indexes' in result:
-        return result['indexes']
-    return []
+    return api.list_all('/api/2.1/unity-catalog/schemas', 'schemas',
+                        {'catalog_name': catalog_name, 'max_results': PAGE_SIZE})
+
+
+def list_vector_search_endpoints(api: WorkspaceAPI) -> List[Dict]:
+    """List vector search endpoints."""
+    return api.list_all('/api/2.0/vector-search/endpoints', 'endpoints')
+
+
+def list_vector_indexes(api: WorkspaceAPI, endpoint_name: str) -> List[Dict]:
+    """
+    List vector search indexes served by an endpoint.
+    
+    Index names are fully qualified (catalog.schema.index); the catalog and
+    schema are split out so the result matches the Unity Catalog hierarchy.
+    """
+    indexes = []
+    for index in api.list_all('/api/2.0/vector-search/indexes', 'vector_indexes',
+                              {'endpoint_name': endpoint_name}):
+        parts = index.get('name', '').split('.')
+        if len(parts) != 3:
+            continue
+        indexes.append(dict(index, catalog_name=parts[0], schema_name=parts[1], name=parts[2]))
+    return indexes
+
+
+def crawl_vector_indexes(api: WorkspaceAPI, catalog_names: List[str],
+                         parallelism: int = DEFAULT_PARALLELISM) -> Dict[Tuple[str, str], List[Dict]]:
+    """
+    Crawl schemas and vector indexes concurrently.
+    
+    Schemas are listed per catalog and indexes per vector search endpoint, all
+    on one bounded thread pool sharing the same HTTP connection pool.
+    
+    Returns:
+        Indexes grouped by (catalog, schema), restricted to visible schemas
+    """
+    schemas = set()
+    indexes: List[Dict] = []
+    
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        endpoints_future = pool.submit(list_vector_search_endpoints, api)
+        futures = {pool.submit(list_schemas, api, name): ('schemas', name) for name in catalog_names}
+        
+        endpoints = endpoints_future.result()
+        print(f"🔍 Listing indexes on {len(endpoints)} vector search endpoints...")
+        for endpoint in endpoints:
+            if endpoint.get('name'):
+                futures[pool.submit(list_vector_indexes, api, endpoint['name'])] = ('indexes', endpoint['name'])
+        
+        for future in as_completed(futures):
+            kind, name = futures[future]
+            if kind == 'schemas':
+                catalog_schemas = future.result()
+                print(f"📂 Catalog '{name}': {len(catalog_schemas)} schemas")
+                schemas.update((name, schema['name']) for schema in catalog_schemas if schema.get('name'))
+            else:
+                indexes.extend(future.result())
+    
+    grouped: Dict[Tuple[str, str], List[Dict]] = {}
+    for index in indexes:
+        key = (index['catalog_name'], index['schema_name'])
+        if key in schemas:
+            grouped.setdefault(key, []).append(index)
+    return grouped
 
 def generate_mcp_config(workspace_url: str, indexes: List[Dict]) -> Dict:
     """Generate MCP configuration from found indexes."""
@@ -118,12 +188,18 @@ def generate_mcp_config(workspace_url: str, indexes: List[Dict]) -> Dict:
 
 def main():
     """Main function to find vector search URLs."""
+    parser = argparse.ArgumentParser(description="Find Databricks vector search MCP URLs")
+    parser.add_argument('--profile', help='Databricks CLI profile (default: DATABRICKS_CONFIG_PROFILE or DEFAULT)')
+    parser.add_argument('--parallelism', type=int, default=DEFAULT_PARALLELISM,
+                        help=f'Maximum concurrent API requests (default: {DEFAULT_PARALLELISM})')
+    args = parser.parse_args()
+    
     print("🚀 Vector Search URL Finder")
     print("=" * 50)
     
     # Get workspace URL
-    workspace_url = get_workspace_url()
-    if not workspace_url:
+    workspace_url, token = get_workspace_credentials(args.profile)
+    if not workspace_url or not token:
         print("❌ Could not determine workspace URL.")
         print("Please ensure you have configured Databricks CLI:")
         print("   databricks configure --profile your-profile")
@@ -132,8 +208,10 @@ def main():
     print(f"🏢 Workspace: {workspace_url}")
     print()
     
+    api = WorkspaceAPI(workspace_url, token, pool_size=args.parallelism)
+    
     # Find catalogs
-    catalogs = list_catalogs()
+    catalogs = list_catalogs(api)
     if not catalogs:
         print("❌ No catalogs found or no access to Unity Catalog.")
         print("Please ensure you have Unity Catalog access.")
@@ -145,29 +223,17 @@ def main():
     print()
     
     # Find schemas and indexes
-    all_indexes = []
+    catalog_names = [catalog['name'] for catalog in catalogs if catalog.get('name')]
+    indexes_by_schema = crawl_vector_indexes(api, catalog_names, args.parallelism)
+    print()
     
-    for catalog in catalogs:
-        catalog_name = catalog.get('name')
-        if not catalog_name:
-            continue
-            
-        schemas = list_schemas(catalog_name)
-        
-        for schema in schemas:
-            schema_name = schema.get('name')
-            if not schema_name:
-                continue
-                
-            indexes = list_vector_indexes(catalog_name, schema_name)
-            
-            if indexes:
-                print(f"✅ Found {len(indexes)} vector indexes in {catalog_name}.{schema_name}:")
-                for index in indexes:
-                    index_name = index.get('name', 'unknown')
-                    print(f"   - {index_name}")
-                    all_indexes.append(index)
-                print()
+    all_indexes = []
+    for (catalog_name, schema_name), indexes in sorted(indexes_by_schema.items()):
+        print(f"✅ Found {len(indexes)} vector indexes in {catalog_name}.{schema_name}:")
+        for index in indexes:
+            print(f"   - {index.get('name', 'unknown')}")
+            all_indexes.append(index)
+        print()
     
     if not all_indexes:
         print("❌ No vector search indexes found.")
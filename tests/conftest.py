@@ -0,0 +1,8 @@
+"""Make the modules in code/ and scripts/ (the fake MCP server) importable from the tests."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(ROOT, 'code'))
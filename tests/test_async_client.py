@@ -0,0 +1,41 @@
+"""Tests for AsyncMCPClient sessions, against the fake MCP server."""
+
+import asyncio
+
+import pytest
+
+from fake_mcp_server import FakeMCPServer, SEARCH_TOOL_NAME
+from mcp_async_client import AsyncMCPClient
+from mcp_cache import TOOL_CACHE_OFF
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeMCPServer() as fake:
+        yield fake
+
+
+def test_call_reconnects_after_the_session_drops(server):
+    async def run():
+        async with AsyncMCPClient(server.host, 'token', server.url, tool_cache_mode=TOOL_CACHE_OFF) as client:
+            await client.call_tool(SEARCH_TOOL_NAME, {'query': 'first'})
+            
+            # End the session task as a dropped connection would
+            client._closing.set()
+            await client._session_task
+            assert client._session is None
+            
+            return await client.call_tool(SEARCH_TOOL_NAME, {'query': 'second'})
+    
+    assert asyncio.run(run()).content
+
+
+def test_closed_client_does_not_reconnect(server):
+    async def run():
+        client = AsyncMCPClient(server.host, 'token', server.url, tool_cache_mode=TOOL_CACHE_OFF)
+        assert await client.initialize()
+        await client.aclose()
+        with pytest.raises(RuntimeError, match='not initialized'):
+            await client.call_tool(SEARCH_TOOL_NAME, {'query': 'closed'})
+    
+    asyncio.run(run())
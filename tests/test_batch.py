@@ -0,0 +1,18 @@
+"""Tests for batch search argument checks."""
+
+import io
+
+import pytest
+
+from mcp_batch import run_batch_search
+from mcp_cli import build_parser
+
+
+def test_checkpoint_every_below_one_rejected():
+    with pytest.raises(ValueError):
+        run_batch_search(None, 'search', [], io.StringIO(), checkpoint_every=0)
+
+
+def test_cli_rejects_zero_checkpoint_every():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['batch-search', '--input', '-', '--checkpoint-every', '0'])
@@ -0,0 +1,38 @@
+"""Tests for the result cache disk tier."""
+
+import os
+import stat
+
+import mcp_cache
+from mcp_cache import ResultCache
+
+
+def test_disk_tier_tightens_permissive_directory(tmp_path):
+    disk_dir = tmp_path / 'results'
+    disk_dir.mkdir(mode=0o777)
+    os.chmod(disk_dir, 0o777)
+    
+    cache = ResultCache(disk_dir=disk_dir)
+    
+    assert cache.disk_dir == disk_dir
+    assert stat.S_IMODE(os.stat(disk_dir).st_mode) == 0o700
+
+
+def test_disk_tier_disabled_for_foreign_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1)
+    
+    cache = ResultCache(disk_dir=tmp_path / 'results')
+    
+    assert cache.disk_dir is None
+
+
+def test_failed_disk_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = ResultCache(disk_dir=tmp_path)
+    
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(mcp_cache.os, 'replace', fail_replace)
+    cache.put(ResultCache.make_key('url', 'tool', {}), 'tool', {'rows': [1, 2, 3]})
+    
+    assert list(tmp_path.iterdir()) == []
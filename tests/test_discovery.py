@@ -0,0 +1,86 @@
+"""Tests for concurrent tool discovery."""
+
+import json
+import threading
+import time
+
+import mcp_discovery
+from mcp_discovery import (STATUS_OK, STATUS_TIMEOUT, ServerDiscoveryResult, iter_discover_servers,
+                           update_mcp_config)
+
+
+def test_hung_server_does_not_block_queued_servers(monkeypatch):
+    release = threading.Event()
+    
+    def fake_discover(manager, server_name):
+        if server_name == 'hung':
+            release.wait()
+        return ServerDiscoveryResult(server_name, STATUS_OK, 0.0)
+    
+    monkeypatch.setattr(mcp_discovery, '_discover_server', fake_discover)
+    try:
+        start = time.monotonic()
+        results = list(iter_discover_servers(None, ['hung', 'ok'], max_workers=1, server_timeout=0.2))
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+    
+    assert [(result.server_name, result.status) for result in results] == [('hung', STATUS_TIMEOUT), ('ok', STATUS_OK)]
+    assert elapsed < 2.0
+
+
+def test_every_server_is_reported_once(monkeypatch):
+    monkeypatch.setattr(mcp_discovery, '_discover_server',
+                        lambda manager, server_name: ServerDiscoveryResult(server_name, STATUS_OK, 0.0))
+    
+    servers = [f"server-{index}" for index in range(10)]
+    results = list(iter_discover_servers(None, servers, max_workers=3, server_timeout=5.0))
+    
+    assert sorted(result.server_name for result in results) == servers
+
+
+def _tool(server, description):
+    return {"description": description, "input_schema": {}, "server": server}
+
+
+def _record(tools, discovered_at):
+    return {"config_hash": "h", "tools_hash": json.dumps(tools), "tools": sorted(tools),
+            "discovered_at": discovered_at}
+
+
+def _write_config(path, tools, discovery):
+    servers = {name: {"url": f"https://example.com/{name}"} for name in ('a', 'b')}
+    path.write_text(json.dumps({"mcpServers": servers, "tools": tools, "discovery": discovery}))
+
+
+def test_update_keeps_servers_refreshed_by_another_run(tmp_path):
+    config_path = tmp_path / 'mcp.json'
+    # Another run refreshed server b after this run read the file
+    _write_config(config_path, {"a_search": _tool('a', 'old'), "b_search": _tool('b', 'newer')},
+                  {"a": _record({"a_search": 'old'}, 100), "b": _record({"b_search": 'newer'}, 200)})
+    
+    catalog = {"a_search": _tool('a', 'new'), "b_search": _tool('b', 'older')}
+    state = {"a": _record({"a_search": 'new'}, 150), "b": _record({"b_search": 'older'}, 100)}
+    assert update_mcp_config(str(config_path), catalog, state)
+    
+    config = json.loads(config_path.read_text())
+    assert config['tools'] == {"a_search": _tool('a', 'new'), "b_search": _tool('b', 'newer')}
+    assert config['discovery']['a']['discovered_at'] == 150
+    assert config['discovery']['b']['discovered_at'] == 200
+
+
+def test_unchanged_refresh_does_not_rewrite(tmp_path):
+    config_path = tmp_path / 'mcp.json'
+    tools = {"a_search": _tool('a', 'same')}
+    _write_config(config_path, tools, {"a": _record({"a_search": 'same'}, 100)})
+    before = config_path.read_text()
+    
+    assert update_mcp_config(str(config_path), tools, {"a": _record({"a_search": 'same'}, 999)}) is False
+    assert config_path.read_text() == before
+
+
+def test_unreadable_config_is_not_reported_as_up_to_date(tmp_path):
+    config_path = tmp_path / 'mcp.json'
+    config_path.write_text('{not json')
+    
+    assert update_mcp_config(str(config_path), {"a_search": _tool('a', 'new')}) is None
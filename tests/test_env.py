@@ -0,0 +1,33 @@
+"""Tests for the per-command environment overlay used by the daemon."""
+
+import threading
+
+from mcp_env import env_overlay, forwarded_env, getenv
+from mcp_tracing import propagate_context
+
+
+def test_forwarded_env_keeps_only_package_variables():
+    environ = {'MCP_WIKI_TOKEN': 't', 'DATABRICKS_CONFIG_PROFILE': 'dev', 'HOME': '/home/me'}
+    
+    assert forwarded_env(environ) == {'MCP_WIKI_TOKEN': 't', 'DATABRICKS_CONFIG_PROFILE': 'dev'}
+
+
+def test_overlay_replaces_forwarded_variables(monkeypatch):
+    monkeypatch.setenv('MCP_CACHE_DIR', '/daemon/cache')
+    monkeypatch.setenv('MCP_DAEMON_ONLY', 'x')
+    
+    with env_overlay({'MCP_CACHE_DIR': '/caller/cache'}):
+        assert getenv('MCP_CACHE_DIR') == '/caller/cache'
+        assert getenv('MCP_DAEMON_ONLY') is None
+        assert getenv('HOME') is not None
+    assert getenv('MCP_CACHE_DIR') == '/daemon/cache'
+
+
+def test_overlay_follows_propagated_worker_threads():
+    seen = []
+    with env_overlay({'MCP_WIKI_TOKEN': 'caller'}):
+        worker = threading.Thread(target=propagate_context(lambda: seen.append(getenv('MCP_WIKI_TOKEN'))))
+        worker.start()
+        worker.join()
+    
+    assert seen == ['caller']
@@ -0,0 +1,24 @@
+"""Tests for circuit breaker accounting."""
+
+from mcp_health import CIRCUIT_CLOSED, CIRCUIT_OPEN, CircuitBreakerSettings, ServerHealth
+
+
+def test_non_transient_errors_do_not_open_circuit():
+    health = ServerHealth('server', CircuitBreakerSettings())
+    
+    for _ in range(20):
+        health.check()
+        health.record_error(ValueError('bad parameters'))
+    
+    assert health.state == CIRCUIT_CLOSED
+    assert health.last_error == 'ValueError: bad parameters'
+
+
+def test_transient_errors_open_circuit():
+    health = ServerHealth('server', CircuitBreakerSettings())
+    
+    for _ in range(5):
+        health.check()
+        health.record_error(TimeoutError('read timed out'))
+    
+    assert health.state == CIRCUIT_OPEN
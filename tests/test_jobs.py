@@ -0,0 +1,88 @@
+"""Tests for background jobs of the interactive mode."""
+
+import threading
+
+import pytest
+
+from mcp_jobs import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobManager
+
+
+@pytest.fixture
+def manager():
+    jobs = JobManager(max_workers=1)
+    yield jobs
+    jobs.close()
+
+
+def blocker():
+    """A job body that runs until released, and an event set once it started."""
+    started, release = threading.Event(), threading.Event()
+    
+    def run():
+        started.set()
+        release.wait(5)
+        return 'late'
+    
+    return run, started, release
+
+
+def test_cancelled_queued_job_never_runs(manager):
+    run, started, release = blocker()
+    first = manager.submit('first', run)
+    started.wait(5)
+    ran = []
+    queued = manager.submit('second', lambda: ran.append(True))
+    assert queued.state == JOB_QUEUED
+    
+    assert manager.cancel(queued.job_id)
+    release.set()
+    manager.wait([first])
+    
+    assert queued.state == JOB_CANCELLED
+    assert ran == []
+    assert not manager.cancel(queued.job_id)
+
+
+def test_cancelled_running_job_discards_its_result(manager):
+    run, started, release = blocker()
+    job = manager.submit('slow', run)
+    started.wait(5)
+    assert job.state == JOB_RUNNING
+    
+    assert manager.cancel(job.job_id)
+    release.set()
+    job.future.result(5)
+    
+    assert job.state == JOB_CANCELLED
+    assert job.error is None
+    assert manager.take_finished() == []
+
+
+def test_finished_jobs_are_reported_once(manager):
+    done = manager.submit('ok', lambda: 42)
+    failed = manager.submit('boom', lambda: 1 / 0)
+    assert manager.wait([done, failed], timeout=5)
+    
+    assert manager.take_finished() == [done, failed]
+    assert manager.take_finished() == []
+    assert (done.state, done.result) == (JOB_DONE, 42)
+    assert failed.state == JOB_FAILED
+    assert isinstance(failed.error, ZeroDivisionError)
+
+
+def test_history_keeps_the_newest_finished_jobs():
+    manager = JobManager(max_workers=1, history=2)
+    try:
+        jobs = [manager.submit(f"job {i}", lambda i=i: i) for i in range(4)]
+        manager.wait(jobs, timeout=5)
+        # Unfinished jobs are never forgotten
+        run, started, release = blocker()
+        latest = manager.submit('latest', run)
+        
+        kept = [job.job_id for job in manager.jobs()]
+        assert kept == [jobs[2].job_id, jobs[3].job_id, latest.job_id]
+        assert manager.get(jobs[0].job_id) is None
+        assert manager.last() is latest
+        release.set()
+    finally:
+        manager.close()
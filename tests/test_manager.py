@@ -0,0 +1,82 @@
+"""Tests for client replacement in the client managers."""
+
+import asyncio
+import json
+
+from mcp_async_client import AsyncMCPClient, AsyncMCPClientManager
+from mcp_cache import TOOL_CACHE_OFF
+from mcp_client import MCPClient, MCPClientManager
+
+URL = 'https://example.cloud.databricks.com/api/2.0/mcp/vector-search/main/wiki'
+
+
+def write_config(path, servers):
+    path.write_text(json.dumps({'mcpServers': servers}))
+    return str(path)
+
+
+def expire_token(manager, server_name, monkeypatch, token):
+    """Make the manager find a new token on its next check."""
+    monkeypatch.setenv(f"MCP_{server_name.upper()}_TOKEN", token)
+    manager._tokens.pop(server_name, None)
+    manager._client_tokens[server_name] = (manager._client_tokens[server_name][0], 0.0)
+
+
+def test_client_replaced_after_token_change_is_closed(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(MCPClient, 'close', lambda client: closed.append(client))
+    monkeypatch.setenv('MCP_SEARCH_TOKEN', 'old')
+    manager = MCPClientManager(write_config(tmp_path / 'mcp.json', {'search': {'url': URL}}),
+                               tool_cache_mode=TOOL_CACHE_OFF)
+    
+    old = manager.get_client('search')
+    assert manager.get_client('search') is old
+    
+    expire_token(manager, 'search', monkeypatch, 'new')
+    new = manager.get_client('search')
+    
+    assert new is not old and new.token == 'new'
+    assert closed == [old]
+    manager.close()
+
+
+def test_async_client_replaced_after_token_change_is_closed(tmp_path, monkeypatch):
+    closed = []
+    
+    async def aclose(client):
+        closed.append(client)
+    
+    monkeypatch.setattr(AsyncMCPClient, 'aclose', aclose)
+    monkeypatch.setenv('MCP_SEARCH_TOKEN', 'old')
+    manager = AsyncMCPClientManager(write_config(tmp_path / 'mcp.json', {'search': {'url': URL}}),
+                                    tool_cache_mode=TOOL_CACHE_OFF)
+    
+    async def replace():
+        old = await manager.aget_client('search')
+        expire_token(manager, 'search', monkeypatch, 'new')
+        new = await manager.aget_client('search')
+        return old, new
+    
+    old, new = asyncio.run(replace())
+    
+    assert new is not old
+    assert closed == [old]
+    manager.close()
+
+
+def test_reload_closes_clients_of_changed_servers(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(MCPClient, 'close', lambda client: closed.append(client))
+    monkeypatch.setenv('MCP_SEARCH_TOKEN', 'token')
+    monkeypatch.setenv('MCP_OTHER_TOKEN', 'token')
+    config_path = tmp_path / 'mcp.json'
+    manager = MCPClientManager(write_config(config_path, {'search': {'url': URL}, 'other': {'url': URL}}),
+                               tool_cache_mode=TOOL_CACHE_OFF)
+    search, other = manager.get_client('search'), manager.get_client('other')
+    
+    write_config(config_path, {'search': {'url': URL + '-v2'}, 'other': {'url': URL}})
+    assert manager.refresh_config()
+    
+    assert closed == [search]
+    assert manager.get_client('other') is other
+    manager.close()
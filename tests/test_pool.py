@@ -0,0 +1,68 @@
+"""Tests for the persistent sessions in mcp_pool, against the fake MCP server."""
+
+import pytest
+
+from fake_mcp_server import FakeMCPServer, SEARCH_TOOL_NAME
+from mcp_pool import WorkspaceSessionPool
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeMCPServer() as fake:
+        yield fake
+
+
+def test_session_is_reused_across_calls(server):
+    pool = WorkspaceSessionPool()
+    try:
+        session = pool.get_mcp_session(server.host, 'token', server.url)
+        assert pool.get_mcp_session(server.host, 'token', server.url) is session
+        
+        session.call_tool(SEARCH_TOOL_NAME, {'query': 'first'})
+        opened = session._session
+        result = session.call_tool(SEARCH_TOOL_NAME, {'query': 'second'})
+        
+        assert result.content
+        assert session._session is opened
+        assert len(pool) == 1
+    finally:
+        pool.close()
+
+
+def test_closed_session_reconnects_on_next_call(server):
+    pool = WorkspaceSessionPool()
+    try:
+        session = pool.get_mcp_session(server.host, 'token', server.url)
+        assert any(tool.name == SEARCH_TOOL_NAME for tool in session.list_tools())
+        
+        session.close()
+        assert not session.connected
+        
+        result = session.call_tool(SEARCH_TOOL_NAME, {'query': 'again'})
+        assert result.content
+        assert session.connected
+    finally:
+        pool.close()
+
+
+def test_credentials_get_separate_entries(server):
+    pool = WorkspaceSessionPool()
+    try:
+        first = pool.get_mcp_session(server.host, 'token-a', server.url)
+        second = pool.get_mcp_session(server.host, 'token-b', server.url)
+        assert first is not second
+        assert len(pool) == 2
+    finally:
+        pool.close()
+
+
+def test_http_session_is_shared():
+    pool = WorkspaceSessionPool(pool_size=3)
+    try:
+        http = pool.get_http_session('https://example.cloud.databricks.com/', 'token')
+        assert pool.get_http_session('example.cloud.databricks.com', 'token') is http
+        assert http.headers['Authorization'] == 'Bearer token'
+        assert http.get_adapter('https://example.cloud.databricks.com')._pool_maxsize == 3
+    finally:
+        pool.close()
+    assert len(pool) == 0
@@ -0,0 +1,107 @@
+"""Tests for tool lookups in the tool registry."""
+
+import pytest
+
+from mcp_client import ToolInfo
+from mcp_registry import (
+    COLLISION_ERROR, COLLISION_FIRST, COLLISION_LAST, COLLISION_QUALIFY,
+    WIKIPEDIA_SEARCH_KEYWORDS, ToolCollisionError, ToolRegistry,
+)
+
+
+def tools(*names):
+    return [ToolInfo(name, f"{name} tool") for name in names]
+
+
+def registry_with_collision(policy):
+    registry = ToolRegistry(policy)
+    registry.register_many('alpha', tools('search', 'lookup'))
+    registry.register_many('beta', tools('search'))
+    return registry
+
+
+def test_qualify_policy_requires_qualified_names():
+    registry = registry_with_collision(COLLISION_QUALIFY)
+    
+    with pytest.raises(ToolCollisionError, match='alpha/search'):
+        registry.resolve('search')
+    assert registry.resolve('beta/search').server == 'beta'
+    assert registry.resolve('lookup').server == 'alpha'
+    assert registry.exposed_name('alpha', 'search') == 'alpha/search'
+    assert set(registry.as_catalog()) == {'alpha/search', 'beta/search', 'lookup'}
+    assert registry.collisions() == {'search': ['alpha', 'beta']}
+
+
+def test_first_and_last_policies_pick_a_server():
+    assert registry_with_collision(COLLISION_FIRST).resolve('search').server == 'alpha'
+    assert registry_with_collision(COLLISION_LAST).resolve('search').server == 'beta'
+    assert registry_with_collision(COLLISION_LAST).as_catalog()['search']['server'] == 'beta'
+
+
+def test_error_policy_rejects_colliding_registration():
+    registry = ToolRegistry(COLLISION_ERROR)
+    registry.register_many('alpha', tools('search'))
+    
+    with pytest.raises(ToolCollisionError):
+        registry.register('beta', ToolInfo('search', 'search tool'))
+    assert registry.resolve('search').server == 'alpha'
+    assert ('beta', 'search') not in registry
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        ToolRegistry('random')
+
+
+def test_prefix_search_is_case_insensitive_and_ordered():
+    registry = ToolRegistry()
+    registry.register_many('alpha', tools('Search_docs', 'search_tables', 'list_tables'))
+    registry.register_many('beta', tools('searcher'))
+    
+    names = [match.tool.name for match in registry.search_prefix('SEARCH')]
+    
+    assert names == ['Search_docs', 'search_tables', 'searcher']
+    assert len(registry.search_prefix('search', limit=2)) == 2
+    assert registry.search_prefix('missing') == []
+
+
+def test_fuzzy_search_ranks_closest_name_first():
+    registry = ToolRegistry()
+    registry.register_many('alpha', tools('wikipedia_docsearch', 'list_tables', 'get_table_schema'))
+    
+    matches = registry.search_fuzzy('wikipedia_docserch')
+    
+    assert matches[0].tool.name == 'wikipedia_docsearch'
+    assert all(match.tool.name != 'list_tables' for match in matches)
+    assert matches == sorted(matches, key=lambda match: -match.score)
+
+
+def test_removed_tools_leave_the_indexes():
+    registry = ToolRegistry()
+    registry.register_many('alpha', tools('search_docs'))
+    
+    assert registry.remove_server('alpha') == 1
+    
+    assert registry.search_prefix('search') == []
+    assert registry.search_fuzzy('search_docs') == []
+    assert registry.resolve('search_docs') is None
+
+
+def test_capability_memo_follows_replace_and_remove():
+    registry = ToolRegistry()
+    registry.register_many('alpha', tools('list_tables'))
+    registry.register_many('beta', tools('wikipedia_docsearch'))
+    
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS).server == 'beta'
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, 'alpha') is None
+    
+    registry.replace_server('beta', tools('list_tables'))
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS) is None
+    
+    registry.replace_server('alpha', tools('docsearch'))
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS).server == 'alpha'
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, 'alpha').tool.name == 'docsearch'
+    
+    registry.remove_server('alpha')
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS) is None
+    assert registry.find_capability(WIKIPEDIA_SEARCH_KEYWORDS, 'alpha') is None
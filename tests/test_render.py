@@ -0,0 +1,35 @@
+"""Tests for streaming result rows."""
+
+import json
+
+from mcp_render import CHUNK_SIZE, iter_result_rows
+
+
+def test_rows_are_streamed_across_chunks():
+    rows = [{'id': i, 'text': 'x' * 100} for i in range(2000)]
+    stream = iter_result_rows(json.dumps({'manifest': {}, 'result': {'data_array': rows}}), max_rows=None)
+    
+    assert list(stream) == rows
+    assert stream.bytes_read > CHUNK_SIZE
+    assert not stream.truncated and not stream.malformed
+
+
+def test_row_limit_truncates():
+    stream = iter_result_rows(json.dumps(list(range(50))), max_rows=10)
+    
+    assert list(stream) == list(range(10))
+    assert stream.truncated
+
+
+def test_payload_breaking_off_after_rows_is_malformed():
+    stream = iter_result_rows('[{"id": 1}, {"id": 2}, {"id": ', max_rows=None)
+    
+    assert list(stream) == [{'id': 1}, {'id': 2}]
+    assert stream.malformed
+
+
+def test_text_that_is_not_json_is_shown_raw():
+    stream = iter_result_rows('No results found', max_rows=None)
+    
+    assert list(stream) == ['No results found']
+    assert not stream.malformed
@@ -0,0 +1,94 @@
+"""Tests for hedged calls."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_resilience import HedgeExecutor, HedgePolicy, RetryBudget
+
+
+def test_hedged_calls_are_not_capped_by_a_shared_pool():
+    hedger = HedgeExecutor(HedgePolicy(initial_delay=0.05, budget=None))
+    
+    def slow():
+        time.sleep(0.3)
+        return 'ok'
+    
+    # 32 callers, each with a primary and a hedge in flight
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=32) as callers:
+        results = list(callers.map(lambda _: hedger.call('server/search', slow), range(32)))
+    elapsed = time.monotonic() - start
+    
+    assert results == ['ok'] * 32
+    assert hedger.hedges_sent == 32
+    assert elapsed < 0.6
+    hedger.close()
+
+
+def test_latency_sample_is_the_call_duration():
+    policy = HedgePolicy(initial_delay=1.0)
+    hedger = HedgeExecutor(policy)
+    
+    hedger.call('server/search', lambda: time.sleep(0.1))
+    
+    assert 0.1 <= policy.window('server/search').percentile(50) < 0.2
+    hedger.close()
+
+
+def test_slow_primary_is_recorded_when_the_hedge_wins():
+    policy = HedgePolicy(initial_delay=0.05, budget=None)
+    hedger = HedgeExecutor(policy)
+    calls = []
+    primary_done = threading.Event()
+    
+    def first_slow():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.3)
+            primary_done.set()
+            return 'primary'
+        return 'hedge'
+    
+    assert hedger.call('server/search', first_slow) == 'hedge'
+    assert hedger.hedges_won == 1
+    
+    primary_done.wait(1)
+    time.sleep(0.05)
+    window = policy.window('server/search')
+    # Only the primary's own latency: the fast hedge would hide the slow tail
+    assert len(window) == 1
+    assert window.percentile(50) >= 0.3
+    hedger.close()
+
+
+def test_budget_caps_hedges():
+    policy = HedgePolicy(initial_delay=0.01, budget=RetryBudget(ratio=0.0, initial=2.0))
+    hedger = HedgeExecutor(policy)
+    
+    for _ in range(5):
+        assert hedger.call('server/search', lambda: time.sleep(0.05) or 'ok') == 'ok'
+    
+    assert hedger.hedges_sent == 2
+    hedger.close()
+
+
+def test_busy_workers_run_the_call_on_the_callers_thread():
+    hedger = HedgeExecutor(HedgePolicy(initial_delay=0.01, budget=None), max_workers=1)
+    release = threading.Event()
+    threads = []
+    
+    def blocking():
+        threads.append(threading.current_thread())
+        release.wait(1)
+        return 'ok'
+    
+    background = threading.Thread(target=hedger.call, args=('server/search', blocking))
+    background.start()
+    while not threads:
+        time.sleep(0.01)
+    
+    assert hedger.call('server/search', lambda: threading.current_thread()) is threading.current_thread()
+    release.set()
+    background.join()
+    hedger.close()
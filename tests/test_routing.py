@@ -0,0 +1,103 @@
+"""Tests for endpoint parsing and latency-aware routing."""
+
+import random
+from collections import Counter
+
+import pytest
+
+import mcp_routing
+from mcp_routing import EndpointStats, endpoint_configs, endpoint_label, pick_two_choices
+
+
+class Clock:
+    """Settable stand-in for time.monotonic."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(mcp_routing.time, 'monotonic', fake)
+    return fake
+
+
+def measured(latency: float, outstanding: int = 0) -> EndpointStats:
+    stats = EndpointStats()
+    stats.finish(latency)
+    stats.outstanding = outstanding
+    return stats
+
+
+def test_endpoint_config_forms():
+    assert endpoint_configs({'url': 'https://a'}) == [{'url': 'https://a'}]
+    assert endpoint_configs({'urls': ['https://a', 'https://b']}) == [{'url': 'https://a'}, {'url': 'https://b'}]
+    assert endpoint_configs({'endpoints': ['https://a', {'url': 'https://b', 'profile': 'eu'}]}) == [
+        {'url': 'https://a'}, {'url': 'https://b', 'profile': 'eu'}]
+    assert endpoint_configs({}) == []
+
+
+def test_endpoints_take_precedence_over_url():
+    assert endpoint_configs({'url': 'https://a', 'endpoints': ['https://b']}) == [{'url': 'https://b'}]
+
+
+def test_endpoint_without_url_rejected():
+    with pytest.raises(ValueError):
+        endpoint_configs({'endpoints': [{'profile': 'eu'}]})
+
+
+def test_endpoint_labels():
+    assert endpoint_label('search', 0, 1) == 'search'
+    assert endpoint_label('search', 1, 3) == 'search[1]'
+
+
+def test_cost_scales_with_outstanding_calls(clock):
+    assert EndpointStats().cost() == 0.0
+    assert measured(0.1).cost() == pytest.approx(0.1)
+    assert measured(0.1, outstanding=2).cost() == pytest.approx(0.3)
+
+
+def test_cost_decays_while_idle(clock):
+    stats = measured(0.2)
+    
+    clock.now += stats.decay
+    assert stats.cost() == pytest.approx(0.2)
+    
+    clock.now += stats.decay
+    assert stats.cost() == pytest.approx(0.1)
+
+
+def test_failure_counts_as_at_least_twice_the_ewma(clock):
+    stats = measured(0.1)
+    stats.start()
+    stats.finish(0.001, failed=True)
+    
+    assert stats.ewma == pytest.approx(0.3 * 0.2 + 0.7 * 0.1)
+    assert stats.outstanding == 0
+    assert stats.calls == 2
+
+
+def test_two_choices_picks_the_cheaper_of_the_pair(clock):
+    stats = [measured(0.1), measured(0.5)]
+    
+    assert all(pick_two_choices(stats, random.Random(seed)) == 0 for seed in range(20))
+
+
+def test_two_choices_never_picks_the_most_expensive_endpoint(clock):
+    stats = [measured(0.1), measured(0.2), measured(0.3), measured(5.0)]
+    rng = random.Random(42)
+    
+    picks = Counter(pick_two_choices(stats, rng) for _ in range(1000))
+    
+    assert 3 not in picks
+    assert picks[0] > picks[1] > picks[2]
+
+
+def test_two_choices_edge_cases():
+    assert pick_two_choices([EndpointStats()]) == 0
+    with pytest.raises(ValueError):
+        pick_two_choices([])
@@ -0,0 +1,40 @@
+"""Tests for tool parameter validation."""
+
+import pytest
+
+from mcp_schema import ToolValidationError, ToolValidator
+
+SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "minLength": 1},
+        "num_results": {"type": "integer", "minimum": 1, "maximum": 100, "default": 10},
+    },
+    "required": ["query"],
+    "additionalProperties": False,
+}
+
+
+def test_defaults_are_filled_in():
+    validator = ToolValidator('search', SEARCH_SCHEMA)
+    
+    assert validator.validate({"query": "python"}) == {"query": "python", "num_results": 10}
+
+
+def test_every_problem_is_reported():
+    validator = ToolValidator('search', SEARCH_SCHEMA)
+    
+    with pytest.raises(ToolValidationError) as raised:
+        validator.validate({"num_results": 0, "extra": True})
+    
+    assert len(raised.value.errors) == 3
+    assert any(error.startswith("num_results:") for error in raised.value.errors)
+
+
+def test_invalid_pattern_is_skipped():
+    schema = {"type": "object", "properties": {"query": {"type": "string", "pattern": "(unclosed"}}}
+    validator = ToolValidator('search', schema)
+    
+    assert validator.validate({"query": "anything"}) == {"query": "anything"}
+    with pytest.raises(ToolValidationError):
+        validator.validate({"query": 1})
@@ -0,0 +1,46 @@
+"""Tests for paginated search."""
+
+from mcp_client import MCPClient, ToolInfo
+
+ROWS = [{"id": index} for index in range(25)]
+
+
+def _client(monkeypatch, properties):
+    client = MCPClient('https://example.com', 'token', 'https://example.com/api/2.0/mcp', server_name='server')
+    client.registry.register('server', ToolInfo('docsearch', 'Search', {"type": "object", "properties": properties}))
+    client._initialized = True
+    calls = []
+    
+    def call_tool(tool_name, parameters, verbose=True):
+        calls.append(parameters)
+        start = parameters.get('offset', 0)
+        return ROWS[start:start + parameters.get('num_results', 5)]
+    
+    monkeypatch.setattr(client, 'call_tool', call_tool)
+    return client, calls
+
+
+def test_pages_with_offset(monkeypatch):
+    client, calls = _client(monkeypatch, {"query": {}, "num_results": {}, "offset": {}})
+    
+    rows = list(client.iter_search("python", page_size=10))
+    
+    assert rows == ROWS
+    assert [(call['offset'], call['num_results']) for call in calls] == [(0, 10), (10, 10), (20, 10)]
+
+
+def test_single_bounded_call_without_offset(monkeypatch, capsys):
+    client, calls = _client(monkeypatch, {"query": {}, "num_results": {}})
+    
+    assert list(client.iter_search("python", max_results=20)) == ROWS[:20]
+    assert calls == [{"query": "python", "num_results": 20}]
+    
+    assert list(client.iter_search("python", page_size=10)) == ROWS[:10]
+    assert "no offset parameter" in capsys.readouterr().out
+
+
+def test_undeclared_size_parameter_is_not_sent(monkeypatch):
+    client, calls = _client(monkeypatch, {"query": {}})
+    
+    assert list(client.iter_search("python", max_results=3)) == ROWS[:3]
+    assert calls == [{"query": "python"}]
@@ -0,0 +1,102 @@
+"""Tests for the CLI token cache in databricks_profile_auth."""
+
+import contextlib
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import databricks_profile_auth
+from databricks_profile_auth import (
+    DEFAULT_TOKEN_LIFETIME, DatabricksProfileAuth, TokenCache, _parse_token_expiry,
+)
+
+
+class FakeCLI:
+    """Stand-in for subprocess.run answering `databricks auth token`."""
+    
+    def __init__(self, token='fresh', expiry='2099-01-01T00:00:00Z'):
+        self.token = token
+        self.expiry = expiry
+        self.calls = 0
+    
+    def __call__(self, args, **kwargs):
+        self.calls += 1
+        stdout = json.dumps({'access_token': f"{self.token}-{self.calls}", 'expiry': self.expiry})
+        return subprocess.CompletedProcess(args, 0, stdout=stdout, stderr='')
+
+
+def write_entry(cache, key, token, expires_at):
+    cache.cache_path.write_text(json.dumps({key: {'access_token': token, 'expires_at': expires_at}}))
+
+
+def test_valid_token_is_served_without_refresh(tmp_path):
+    cache = TokenCache(tmp_path / 'tokens.json', refresh_margin=300)
+    write_entry(cache, 'p@host', 'cached', time.time() + 3600)
+    
+    def fetch():
+        raise AssertionError("refreshed a valid token")
+    
+    assert cache.get_or_refresh('p@host', fetch) == 'cached'
+
+
+def test_token_inside_the_margin_is_refreshed(tmp_path):
+    cache = TokenCache(tmp_path / 'tokens.json', refresh_margin=300)
+    write_entry(cache, 'p@host', 'stale', time.time() + 100)
+    expires_at = time.time() + 3600
+    
+    assert cache.get_or_refresh('p@host', lambda: ('new', expires_at)) == 'new'
+    assert cache.get('p@host') == 'new'
+
+
+def test_refresh_by_another_process_is_used_after_the_lock(tmp_path, monkeypatch):
+    cache = TokenCache(tmp_path / 'tokens.json')
+    
+    @contextlib.contextmanager
+    def contended_lock(lock_path):
+        # Another process refreshed the token while this one waited for the lock
+        write_entry(cache, 'p@host', 'theirs', time.time() + 3600)
+        yield
+    
+    monkeypatch.setattr(databricks_profile_auth, 'file_lock', contended_lock)
+    
+    def fetch():
+        raise AssertionError("refreshed although another process already had")
+    
+    assert cache.get_or_refresh('p@host', fetch) == 'theirs'
+
+
+def test_expiry_with_nanoseconds():
+    expected = datetime(2026, 10, 17, 12, 0, 0, 123456, tzinfo=timezone.utc).timestamp()
+    
+    assert _parse_token_expiry('2026-10-17T12:00:00.123456789Z') == expected
+
+
+def test_expiry_with_offset():
+    expected = datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc).timestamp()
+    
+    assert _parse_token_expiry('2026-10-17T12:00:00+02:00') == expected
+
+
+def test_missing_or_invalid_expiry_uses_default_lifetime():
+    for expiry in (None, '', 'soon'):
+        remaining = _parse_token_expiry(expiry) - time.time()
+        assert DEFAULT_TOKEN_LIFETIME - 5 < remaining <= DEFAULT_TOKEN_LIFETIME
+
+
+def test_cli_runs_once_while_the_cached_token_is_valid(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    (tmp_path / '.databrickscfg').write_text(
+        "[dev]\nhost = https://example.cloud.databricks.com\nauth_type = databricks-cli\n")
+    cli = FakeCLI()
+    monkeypatch.setattr(databricks_profile_auth.subprocess, 'run', cli)
+    
+    auth = DatabricksProfileAuth('dev', use_token_cache=False)
+    auth.token_cache = TokenCache(tmp_path / 'tokens.json')
+    
+    assert auth.get_token_from_profile() == 'fresh-1'
+    assert auth.get_token_from_profile() == 'fresh-1'
+    assert cli.calls == 1
+    
+    auth.token_cache.invalidate()
+    assert auth.get_token_from_profile() == 'fresh-2'